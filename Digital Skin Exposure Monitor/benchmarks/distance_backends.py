@@ -0,0 +1,181 @@
+"""
+Distance Backend Benchmark
+Runs every registered distance backend on the same frames and compares
+latency, detection rate and agreement with a reference backend.
+
+Usage:
+    python benchmarks/distance_backends.py recording.mp4
+    python benchmarks/distance_backends.py frames_folder/ --frames 500 --json results.json
+    python benchmarks/distance_backends.py --camera --frames 200
+    python benchmarks/distance_backends.py recording.mp4 --backends facemesh_refined --roi
+"""
+
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import time
+
+import cv2
+
+# Allow running from the project root or the benchmarks folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inputs.distance import FOCAL_LENGTH
+from inputs.distance_backends import available_backends, create_backend
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def load_frames(source, max_frames, use_camera=False):
+    """Load up to max_frames BGR frames from a video, an image folder or the webcam."""
+    frames = []
+    if source and os.path.isdir(source):
+        names = sorted(n for n in os.listdir(source) if n.lower().endswith(IMAGE_EXTENSIONS))
+        for name in names[:max_frames]:
+            frame = cv2.imread(os.path.join(source, name))
+            if frame is not None:
+                frames.append(frame)
+        return frames
+
+    cap = cv2.VideoCapture(0 if use_camera else source)
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_backend(name, frames, warmup=5, roi_tracking=None):
+    """
+    Run one backend over all frames.
+
+    Args:
+        roi_tracking (bool): Force ROI-cropped tracking on or off (None = backend default)
+
+    Returns:
+        tuple: (list of distances or None per frame, list of latencies in ms)
+    """
+    backend = create_backend(name)
+    try:
+        if roi_tracking is not None:
+            if not hasattr(backend, "roi_tracking"):
+                raise ValueError("no ROI tracking")
+            backend.roi_tracking = roi_tracking
+        for frame in frames[:warmup]:
+            backend.locate_eyes(frame)
+        backend.reset()
+
+        distances = []
+        latencies = []
+        for frame in frames:
+            eyes = backend.locate_eyes(frame)
+            latencies.append(backend.last_latency_ms)
+            if eyes is None:
+                distances.append(None)
+                continue
+            pixel_dist = math.dist(eyes[0], eyes[1])
+            distances.append((backend.reference_span_cm * FOCAL_LENGTH) / pixel_dist if pixel_dist else None)
+        return distances, latencies
+    finally:
+        backend.close()
+
+
+def compare(distances, reference):
+    """Mean absolute percentage difference to the reference where both detected a face."""
+    errors = [
+        abs(d - r) / r * 100
+        for d, r in zip(distances, reference)
+        if d is not None and r is not None and r > 0
+    ]
+    return (statistics.mean(errors), len(errors)) if errors else (None, 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare distance backends on the same frames")
+    parser.add_argument("source", nargs="?", help="Video file or image folder")
+    parser.add_argument("--camera", action="store_true", help="Record frames from the webcam instead")
+    parser.add_argument("--frames", type=int, default=300, help="Maximum number of frames (default: 300)")
+    parser.add_argument("--backends", nargs="*", default=None, help="Backends to run (default: all)")
+    parser.add_argument("--reference", default="facemesh_refined", help="Backend used as accuracy reference")
+    parser.add_argument("--roi", action="store_true",
+                        help="Also run each backend with ROI-cropped tracking (listed as <backend>+roi)")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    if not args.source and not args.camera:
+        parser.error("give a video/image folder or use --camera")
+
+    frames = load_frames(args.source, args.frames, args.camera)
+    if not frames:
+        print("No frames loaded")
+        return 1
+    h, w = frames[0].shape[:2]
+    print(f"Loaded {len(frames)} frames ({w}x{h})")
+
+    names = args.backends or available_backends()
+    if args.reference not in names:
+        names = [args.reference] + names
+
+    variants = [(name, name, None) for name in names]
+    if args.roi:
+        variants += [(f"{name}+roi", name, True) for name in names]
+
+    runs = {}
+    for label, name, roi_tracking in variants:
+        try:
+            runs[label] = run_backend(name, frames, roi_tracking=roi_tracking)
+        except Exception as e:
+            print(f"Skipping {label}: {e}")
+
+    reference = runs.get(args.reference, (None, None))[0]
+    results = []
+    for name, (distances, latencies) in runs.items():
+        detected = sum(d is not None for d in distances)
+        error, compared = compare(distances, reference) if reference and name != args.reference else (None, 0)
+        results.append({
+            "backend": name,
+            "frames": len(frames),
+            "detection_rate": round(detected / len(frames), 4),
+            "mean_ms": round(statistics.mean(latencies), 3),
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+            "fps": round(1000 / statistics.mean(latencies), 1) if statistics.mean(latencies) else None,
+            "mean_abs_pct_diff": round(error, 2) if error is not None else None,
+            "compared_frames": compared
+        })
+
+    print(f"\n{'Backend':<22}{'Detect':>8}{'Mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'FPS':>8}{'Diff %':>9}")
+    for r in results:
+        diff = f"{r['mean_abs_pct_diff']:.2f}" if r["mean_abs_pct_diff"] is not None else "ref" if r["backend"] == args.reference else "-"
+        print(f"{r['backend']:<22}{r['detection_rate']:>8.1%}{r['mean_ms']:>10.2f}{r['p50_ms']:>10.2f}"
+              f"{r['p95_ms']:>10.2f}{r['fps'] or 0:>8.1f}{diff:>9}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({
+                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "source": "camera" if args.camera else args.source,
+                "resolution": [w, h],
+                "reference": args.reference,
+                "results": results
+            }, f, indent=2)
+        print(f"\nResults written to {args.json_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
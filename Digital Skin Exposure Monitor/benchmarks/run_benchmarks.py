@@ -0,0 +1,419 @@
+"""
+Benchmark Suite
+Repeatable performance benchmarks for the monitoring pipeline:
+
+    distance  estimate_distance() and get_distance() throughput on recorded or
+              synthetic frames, and capture thread throughput
+    scoring   scalar vs batch blue light / thermal scoring
+    logging   log_data() rows/sec (CSV and SQLite backends)
+    history   HistoryView.load_data() time at 10k/100k/1M rows (the log index
+              is always measured; the window itself needs a display)
+
+Results are printed and can be written as JSON, and compared with a previous run.
+
+Usage:
+    python benchmarks/run_benchmarks.py --frames recording.mp4 --json results.json
+    python benchmarks/run_benchmarks.py --only scoring logging --compare baseline.json
+    python benchmarks/run_benchmarks.py --synthetic 300 --backend marker --quick
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FACE_DISTANCE_DIR = os.path.join(os.path.dirname(PROJECT_DIR), "Face Distance Detection")
+
+# Allow running from the project root or the benchmarks folder
+sys.path.insert(0, PROJECT_DIR)
+
+from benchmarks.distance_backends import load_frames, percentile
+from core.log_writer import LOG_COLUMNS
+
+BENCHMARKS = ("distance", "scoring", "logging", "history")
+
+
+def timed_runs(func, repeat, warmup=0):
+    """
+    Call func() repeat times (after warmup untimed calls).
+
+    Returns:
+        list: Durations in seconds
+    """
+    for _ in range(warmup):
+        func()
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def latency_result(name, latencies_ms, **extra):
+    """Result entry with mean/p50/p95 latency and throughput."""
+    mean = sum(latencies_ms) / len(latencies_ms)
+    result = {
+        "name": name,
+        "calls": len(latencies_ms),
+        "mean_ms": round(mean, 3),
+        "p50_ms": round(percentile(latencies_ms, 50), 3),
+        "p95_ms": round(percentile(latencies_ms, 95), 3),
+        "per_s": round(1000 / mean, 1) if mean else None
+    }
+    result.update(extra)
+    return result
+
+
+class ReplayCamera:
+    """Stands in for the shared CameraCapture, serving recorded frames in a loop."""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.frame_id = 0
+
+    def read_latest(self):
+        frame = self.frames[self.frame_id % len(self.frames)]
+        self.frame_id += 1
+        return self.frame_id, time.time(), frame
+
+    def wait_for_frame(self, after_id=0, timeout=1.0):
+        return self.read_latest()
+
+    def stop(self):
+        pass
+
+
+def synthetic_frames(count):
+    """Deterministic synthetic face frames (see inputs/frame_sources.py)."""
+    from inputs.frame_sources import SyntheticFaceSource
+
+    source = SyntheticFaceSource(fps=None, distance_amplitude=15, sway_px=20, frame_count=count)
+    frames = []
+    while True:
+        ok, frame = source.read()
+        if not ok:
+            return frames
+        frames.append(frame)
+
+
+def bench_capture(seconds=1.0):
+    """Frames per second the capture thread sustains on an unthrottled synthetic source."""
+    from inputs.camera import CameraCapture
+    from inputs.frame_sources import SyntheticFaceSource
+
+    capture = CameraCapture(source=SyntheticFaceSource(fps=None)).start()
+    try:
+        capture.wait_for_frame(0, timeout=2.0)
+        first_id = capture.read_latest()[0]
+        time.sleep(seconds)
+        frames = capture.read_latest()[0] - first_id
+    finally:
+        capture.stop()
+    return {"name": "capture[synthetic, unthrottled]", "frames": frames, "per_s": round(frames / seconds, 1)}
+
+
+def bench_distance(args):
+    """estimate_distance() and get_distance() on recorded or synthetic frames."""
+    if args.frames:
+        frames = load_frames(args.frames, args.max_frames)
+    elif args.synthetic:
+        frames = synthetic_frames(args.synthetic)
+    else:
+        return [], "no --frames or --synthetic source given"
+    if not frames:
+        return [], f"no frames loaded from {args.frames}"
+
+    results = [bench_capture()]
+
+    # Standalone estimator of the Face Distance Detection project
+    try:
+        sys.path.insert(0, FACE_DISTANCE_DIR)
+        from distance_estimator import estimate_distance
+        for frame in frames[:5]:
+            estimate_distance(frame)
+        latencies = []
+        for frame in frames:
+            start = time.perf_counter()
+            estimate_distance(frame)
+            latencies.append((time.perf_counter() - start) * 1000)
+        results.append(latency_result("estimate_distance", latencies))
+    except Exception as e:
+        print(f"Skipping estimate_distance(): {e}")
+
+    try:
+        import inputs.camera as camera
+        import inputs.distance as distance
+
+        if args.backend:
+            distance.set_distance_backend(args.backend)
+        previous = camera._camera
+        try:
+            for gating in (False, True):
+                camera._camera = ReplayCamera(frames)
+                distance.set_motion_gating(gating)
+                distance.reset_motion_gate_stats()
+                distance.get_backend().reset()
+                latencies = [d * 1000 for d in timed_runs(distance.get_distance, len(frames))]
+                stats = distance.get_motion_gate_stats()
+                results.append(latency_result(
+                    f"get_distance[{distance.get_distance_backend_name()}, gating={'on' if gating else 'off'}]",
+                    latencies,
+                    gate_hit_rate=stats["hit_rate"]
+                ))
+        finally:
+            camera._camera = previous
+            distance.set_motion_gating(True)
+    except Exception as e:
+        print(f"Skipping get_distance(): {e}")
+
+    return results, None
+
+
+def bench_scoring(args):
+    """Scalar vs batch scoring of the same samples."""
+    from exposure.blue_light import blue_light_score, blue_light_score_batch, blue_light_risk, blue_light_risk_batch
+    from exposure.thermal import thermal_score, thermal_score_batch, thermal_risk, thermal_risk_batch
+
+    rng = random.Random(42)
+    n = args.scoring_rows
+    brightness = [rng.uniform(0, 100) for _ in range(n)]
+    duration = [rng.randint(0, 240) for _ in range(n)]
+    distance = [rng.uniform(20, 120) for _ in range(n)]
+
+    def scalar():
+        for b, t, d in zip(brightness, duration, distance):
+            blue_light_risk(blue_light_score(b, t, d))
+            thermal_risk(thermal_score(t, d))
+
+    def batch():
+        blue_light_risk_batch(blue_light_score_batch(brightness, duration, distance))
+        thermal_risk_batch(thermal_score_batch(duration, distance))
+
+    scalar_s = min(timed_runs(scalar, args.repeat, warmup=1))
+    batch_s = min(timed_runs(batch, args.repeat, warmup=1))
+    return [
+        {"name": "scoring_scalar", "rows": n, "seconds": round(scalar_s, 4), "rows_per_s": round(n / scalar_s)},
+        {"name": "scoring_batch", "rows": n, "seconds": round(batch_s, 4), "rows_per_s": round(n / batch_s),
+         "speedup": round(scalar_s / batch_s, 1)}
+    ], None
+
+
+def bench_logging(args):
+    """log_data() throughput for each storage backend (run inside a scratch directory)."""
+    import core.controller as controller
+
+    results = []
+    n = args.log_rows
+    for backend in ("csv", "sqlite"):
+        controller.set_storage_backend(backend)
+        controller.clear_log()
+
+        start = time.perf_counter()
+        for i in range(n):
+            controller.log_data(55.5, 70, 12.3, 4.5, "LOW", "LOW")
+        enqueue_s = time.perf_counter() - start
+        controller.flush_log()
+        total_s = time.perf_counter() - start
+
+        results.append({
+            "name": f"log_data[{backend}]",
+            "rows": n,
+            "enqueue_rows_per_s": round(n / enqueue_s),
+            "written_rows_per_s": round(n / total_s),
+            "seconds": round(total_s, 4)
+        })
+        controller.shutdown()
+    controller.set_storage_backend("csv")
+    return results, None
+
+
+def write_log(path, rows):
+    """Write a synthetic CSV exposure log with the given number of rows."""
+    rng = random.Random(7)
+    start = time.mktime((2025, 1, 1, 8, 0, 0, 0, 0, -1))
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(LOG_COLUMNS)
+        chunk = []
+        for i in range(rows):
+            chunk.append([
+                time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(start + i * 5)),
+                round(rng.uniform(30, 90), 2), 70,
+                round(rng.uniform(0, 100), 2), round(rng.uniform(0, 100), 2),
+                rng.choice(("LOW", "MODERATE", "HIGH")), rng.choice(("LOW", "MODERATE", "HIGH"))
+            ])
+            if len(chunk) >= 10000:
+                writer.writerows(chunk)
+                chunk = []
+        writer.writerows(chunk)
+
+
+def bench_history(args):
+    """History loading at several log sizes (run inside a scratch directory)."""
+    from core.log_index import CsvLogIndex
+
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        root.withdraw()
+    except Exception as e:
+        print(f"No display, measuring the log index only ({e})")
+        root = None
+
+    results = []
+    note = None if root is not None else "HistoryView skipped (no display)"
+    os.makedirs("data", exist_ok=True)
+    try:
+        for rows in args.history_rows:
+            write_log("data/exposure_log.csv", rows)
+            size_mb = os.path.getsize("data/exposure_log.csv") / 1e6
+
+            def scan_index():
+                # First open: no sidecar yet, the whole log is scanned
+                index = CsvLogIndex("data/exposure_log.csv")
+                index.rebuild()
+                index.read_rows(0, 40)
+
+            def load_index():
+                # Later opens reuse the sidecar written by the first one
+                index = CsvLogIndex("data/exposure_log.csv")
+                index.build()
+                index.read_rows(0, 40)
+
+            scan_s = min(timed_runs(scan_index, args.repeat))
+            index_s = min(timed_runs(load_index, args.repeat))
+            result = {"name": "history_load", "rows": rows, "log_mb": round(size_mb, 1),
+                      "index_scan_ms": round(scan_s * 1000, 2),
+                      "index_build_ms": round(index_s * 1000, 2)}
+
+            if root is not None:
+                from ui.history import HistoryView
+                start = time.perf_counter()
+                view = HistoryView(root)
+                view.update_idletasks()
+                result["open_window_ms"] = round((time.perf_counter() - start) * 1000, 2)
+                result["load_data_ms"] = round(min(timed_runs(view.load_data, args.repeat)) * 1000, 2)
+                view.on_close()
+            results.append(result)
+    finally:
+        if root is not None:
+            root.destroy()
+    return results, note
+
+
+def git_revision():
+    """Current git commit of the project, if available."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_DIR,
+            capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def compare_runs(current, baseline):
+    """Print how the numbers changed against a previous results file."""
+    previous = {(r["benchmark"], r["name"], r.get("rows")): r for r in baseline.get("results", [])}
+    print(f"\nCompared with {baseline.get('timestamp')} ({baseline.get('git_revision')}):")
+    for result in current:
+        old = previous.get((result["benchmark"], result["name"], result.get("rows")))
+        if old is None:
+            continue
+        for key, value in result.items():
+            if not isinstance(value, (int, float)) or key in ("rows", "calls") or not old.get(key):
+                continue
+            change = (value - old[key]) / old[key] * 100
+            print(f"  {result['name']:<40}{key:<22}{old[key]:>12} -> {value:<12} ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the monitoring pipeline benchmarks")
+    parser.add_argument("--only", nargs="*", choices=BENCHMARKS, help="Benchmarks to run (default: all)")
+    parser.add_argument("--frames", help="Video file or image folder for the distance benchmarks")
+    parser.add_argument("--max-frames", type=int, default=300, help="Frames used from --frames (default: 300)")
+    parser.add_argument("--synthetic", type=int, metavar="N", help="Use N synthetic face frames instead of --frames")
+    parser.add_argument("--backend", help="Distance backend for get_distance() (e.g. marker for synthetic frames)")
+    parser.add_argument("--scoring-rows", type=int, default=100000, help="Samples scored (default: 100000)")
+    parser.add_argument("--log-rows", type=int, default=100000, help="Rows logged (default: 100000)")
+    parser.add_argument("--history-rows", type=int, nargs="*", default=[10000, 100000, 1000000],
+                        help="Log sizes for the history benchmark (default: 10000 100000 1000000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions, best time is reported (default: 3)")
+    parser.add_argument("--quick", action="store_true", help="Smaller sizes for a fast smoke run")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Previous results JSON to compare against")
+    args = parser.parse_args()
+
+    if args.quick:
+        args.scoring_rows = min(args.scoring_rows, 10000)
+        args.log_rows = min(args.log_rows, 10000)
+        args.history_rows = [r for r in args.history_rows if r <= 100000] or [10000]
+        args.max_frames = min(args.max_frames, 50)
+        args.synthetic = args.synthetic and min(args.synthetic, 50)
+        args.repeat = 1
+
+    if args.frames:
+        args.frames = os.path.abspath(args.frames)
+
+    runners = {"distance": bench_distance, "scoring": bench_scoring,
+               "logging": bench_logging, "history": bench_history}
+    selected = args.only or BENCHMARKS
+
+    # Logging and history write files; keep them out of the real data folder
+    workdir = tempfile.mkdtemp(prefix="dsem-bench-")
+    original_dir = os.getcwd()
+    os.chdir(workdir)
+
+    results = []
+    skipped = {}
+    try:
+        for name in selected:
+            print(f"Running {name}...")
+            try:
+                entries, note = runners[name](args)
+            except Exception as e:
+                entries, note = [], f"failed: {e}"
+            if note:
+                skipped[name] = note
+                print(f"  {note}")
+            for entry in entries:
+                entry["benchmark"] = name
+                results.append(entry)
+                print("  " + ", ".join(f"{k}={v}" for k, v in entry.items() if k != "benchmark"))
+    finally:
+        os.chdir(original_dir)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+        "notes": skipped
+    }
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            compare_runs(results, json.load(f))
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.json_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,18 +6,47 @@ Orchestrates the monitoring system, calculates exposure scores, logs data, and t
 import time
 import csv
 import os
+import sys
 from datetime import datetime
 
-from inputs.distance import get_distance, initialize_camera, release_camera
-from inputs.brightness import get_brightness
-from exposure.blue_light import blue_light_score, blue_light_risk, get_blue_light_recommendations
-from exposure.thermal import thermal_score, thermal_risk, get_thermal_recommendations
-from ui.alert_popup import show_alert
+from core.log_writer import CsvLogWriter, LOG_COLUMNS, FACE_LOG_COLUMNS
+from core.log_rotation import RotationPolicy, clear_segments, iter_rows
+from core.sqlite_store import SQLiteLogWriter
+from core.rollups import RollupStore
+from exposure.accumulator import ExposureAccumulator
+from core.instrumentation import stage, count, flush_trace
+from core.startup import mark
+
+# inputs.distance (OpenCV, face model) is imported on first use so that the
+# dashboard can be drawn before the heavy imports run
+from inputs.brightness import get_brightness, release_brightness
+from exposure.blue_light import (
+    blue_light_dose_score, blue_light_risk, get_blue_light_recommendations,
+    blue_light_risk_batch
+)
+from exposure.thermal import (
+    thermal_dose_score, thermal_risk, get_thermal_recommendations,
+    thermal_risk_batch
+)
 
 # Configuration
 LOG_FILE = "data/exposure_log.csv"
+DB_FILE = "data/exposure_log.db"
+ROLLUP_FILE = "data/exposure_rollups.json"
+ACCUMULATOR_FILE = "data/exposure_accumulator.json"  # checkpoint of the running exposure doses
+SEGMENT_DIR = "data/segments"  # compressed segments of the rotated CSV log
+FACE_LOG_FILE = "data/face_exposure_log.csv"  # per-face rows in multi-face mode
+FACE_SEGMENT_DIR = "data/segments/faces"
+STORAGE_BACKEND = "csv"  # "csv" (LOG_FILE) or "sqlite" (DB_FILE)
 MONITORING_INTERVAL = 5  # seconds between monitoring cycles (can be updated via settings)
 ALERT_COOLDOWN = 300  # seconds between same alert type (5 minutes, can be updated via settings)
+LOG_FLUSH_ROWS = 50  # flush the log once this many rows are buffered
+LOG_FLUSH_INTERVAL = 5.0  # ... or at least this often (seconds)
+LOG_FSYNC = False  # fsync after every flushed batch (group commit)
+LOG_ROTATE_BYTES = 10 * 1024 * 1024  # rotate the CSV log once it reaches this size
+LOG_ROTATE_SECONDS = 7 * 86400  # ... or once its oldest row is this old
+LOG_COMPRESSION = "gzip"  # segment compression: "gzip" or "zstd"
+SESSION_RESUME_GAP = 1800  # a restart within this many seconds continues the checkpointed session
 
 def get_monitoring_interval():
     """Get current monitoring interval."""
@@ -37,37 +66,230 @@ def set_alert_cooldown(seconds):
     global ALERT_COOLDOWN
     ALERT_COOLDOWN = max(0, int(seconds))  # Minimum 0 seconds
 
+def get_storage_backend():
+    """Get current storage backend ("csv" or "sqlite")."""
+    return STORAGE_BACKEND
+
+def set_storage_backend(name):
+    """Set storage backend ("csv" or "sqlite"); takes effect for the next rows logged."""
+    global STORAGE_BACKEND, log_writer
+    if name not in ("csv", "sqlite"):
+        raise ValueError(f"Unknown storage backend: {name}")
+    if name != STORAGE_BACKEND and log_writer is not None:
+        log_writer.close()
+        log_writer = None
+    STORAGE_BACKEND = name
+
 # Global state
 session_start_time = None
+session_id = None
 last_blue_alert_time = 0
 last_thermal_alert_time = 0
 
+# Buffered exposure log writer (opened by initialize_session)
+log_writer = None
+face_log_writer = None  # per-face log, opened on first multi-face sample
 
-def initialize_session():
-    """Initialize a new monitoring session."""
-    global session_start_time
+# Minute/hour/day aggregates and the time of the last aggregated sample
+rollups = None
+last_sample_time = None
+
+# Running blue light/thermal doses (see exposure/accumulator.py)
+accumulator = None
+
+# Alert handler, e.g. the dashboard's AlertManager.notify (None = print to the console)
+alert_handler = None
+
+
+def set_alert_handler(handler):
+    """
+    Set the function used to raise alerts.
+
+    Args:
+        handler (callable): Called with (title, message); must not block.
+            None prints alerts to the console.
+    """
+    global alert_handler
+    alert_handler = handler
+
+
+def raise_alert(title, message):
+    """Raise an alert through the configured handler (never waits for the user)."""
+    if alert_handler is not None:
+        alert_handler(title, message)
+    else:
+        print(f"[ALERT] {title}: {message}")
+
+
+def initialize_session(open_camera=True):
+    """
+    Initialize a new monitoring session.
+
+    Args:
+        open_camera (bool): Open the camera now. The dashboard passes False and
+            lets core.startup.warm_up() open it in the background.
+    """
+    global session_start_time, session_id
     session_start_time = time.time()
+    session_id = datetime.now().strftime("%Y%m%d-%H%M%S")
+
+    # Continue the checkpointed session (and its dose) after a short restart
+    exposure = get_accumulator()
+    if exposure.can_resume(session_start_time, SESSION_RESUME_GAP):
+        session_id = exposure.session_id
+        session_start_time = exposure.session_start or session_start_time
+    else:
+        exposure.start_session(session_id, session_start_time)
     
     # Initialize camera
+    if open_camera:
+        try:
+            from inputs.distance import initialize_camera
+            initialize_camera()
+        except Exception as e:
+            print(f"Camera initialization error: {e}")
+    
+    # Open the log (a new CSV file gets a header)
+    get_log_writer()
+
+    # Load persisted rollups
+    get_rollup_store()
+
+
+def get_rollup_store():
+    """Get the rollup store, loading persisted aggregates on first use."""
+    global rollups
+    if rollups is None:
+        rollups = RollupStore(ROLLUP_FILE).load()
+    return rollups
+
+
+def get_accumulator():
+    """Get the exposure accumulator, loading the checkpoint on first use."""
+    global accumulator
+    if accumulator is None:
+        accumulator = ExposureAccumulator(ACCUMULATOR_FILE).load()
+    return accumulator
+
+
+def get_rollups(resolution, start=None, end=None):
+    """
+    Get aggregated exposure summaries without touching the raw log.
+
+    Args:
+        resolution (str): "minute", "hour" or "day"
+        start (str): Inclusive lower bound key (e.g. "2025-01-31 08")
+        end (str): Exclusive upper bound key
+
+    Returns:
+        list: (bucket key, summary dict) tuples in time order
+    """
+    return get_rollup_store().get(resolution, start, end)
+
+
+def update_rollups(data, timestamp):
+    """Add a monitoring sample to the rollups."""
+    global last_sample_time
+    # A sample stands for the time since the previous one, but gaps (sleep,
+    # paused monitoring) count as at most two intervals
+    if last_sample_time is None:
+        seconds = MONITORING_INTERVAL
+    else:
+        seconds = max(0.0, min(timestamp - last_sample_time, 2 * MONITORING_INTERVAL))
+    last_sample_time = timestamp
+
     try:
-        initialize_camera()
+        get_rollup_store().add_sample(timestamp, data, seconds)
     except Exception as e:
-        print(f"Camera initialization error: {e}")
-    
-    # Initialize CSV log file if it doesn't exist
-    if not os.path.exists(LOG_FILE):
-        os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
+        print(f"Error updating rollups: {e}")
+
+
+def get_log_writer():
+    """Get the buffered log writer, opening it on first use."""
+    global log_writer
+    if log_writer is None:
+        if STORAGE_BACKEND == "sqlite":
+            log_writer = SQLiteLogWriter(
+                DB_FILE,
+                session_id=session_id,
+                flush_rows=LOG_FLUSH_ROWS,
+                flush_interval=LOG_FLUSH_INTERVAL,
+                fsync=LOG_FSYNC
+            ).open()
+        else:
+            log_writer = CsvLogWriter(
+                LOG_FILE,
+                flush_rows=LOG_FLUSH_ROWS,
+                flush_interval=LOG_FLUSH_INTERVAL,
+                fsync=LOG_FSYNC,
+                rotation=_rotation_policy(SEGMENT_DIR)
+            ).open()
+    return log_writer
+
+
+def _rotation_policy(segment_dir):
+    return RotationPolicy(
+        segment_dir,
+        max_bytes=LOG_ROTATE_BYTES,
+        max_age=LOG_ROTATE_SECONDS,
+        compression=LOG_COMPRESSION
+    )
+
+
+def get_face_log_writer():
+    """Get the per-face CSV log writer (multi-face mode), opening it on first use."""
+    global face_log_writer
+    if face_log_writer is None:
+        face_log_writer = CsvLogWriter(
+            FACE_LOG_FILE,
+            flush_rows=LOG_FLUSH_ROWS,
+            flush_interval=LOG_FLUSH_INTERVAL,
+            fsync=LOG_FSYNC,
+            rotation=_rotation_policy(FACE_SEGMENT_DIR),
+            columns=FACE_LOG_COLUMNS
+        ).open()
+    return face_log_writer
+
+
+def flush_log():
+    """Write buffered log rows to disk now (e.g. before reading the log)."""
+    if log_writer is not None:
+        log_writer.flush()
+    if face_log_writer is not None:
+        face_log_writer.flush()
+
+
+def read_log(start=None, end=None):
+    """
+    Stream CSV log rows for a time range, across rotated segments and the live log.
+
+    Args:
+        start (str): Inclusive lower bound ("YYYY-MM-DD HH:MM:SS" or a prefix such as a date)
+        end (str): Exclusive upper bound, same format
+
+    Yields:
+        list: Row values in LOG_COLUMNS order
+    """
+    flush_log()
+    return iter_rows(LOG_FILE, SEGMENT_DIR, start, end)
+
+
+def clear_log():
+    """Clear all logged data (rotated segments, rollups and dose totals), keeping the CSV header."""
+    get_rollup_store().clear()
+    get_accumulator().clear_totals()
+    clear_segments(SEGMENT_DIR)
+    if log_writer is not None or STORAGE_BACKEND == "sqlite":
+        get_log_writer().clear()
+    elif os.path.exists(LOG_FILE):
         with open(LOG_FILE, "w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                "DateTime",
-                "Distance_cm",
-                "Brightness",
-                "BlueLightScore",
-                "ThermalScore",
-                "BlueRisk",
-                "ThermalRisk"
-            ])
+            csv.writer(f).writerow(LOG_COLUMNS)
+
+    if face_log_writer is not None:
+        face_log_writer.clear()
+    elif os.path.exists(FACE_LOG_FILE):
+        with open(FACE_LOG_FILE, "w", newline="") as f:
+            csv.writer(f).writerow(FACE_LOG_COLUMNS)
 
 
 def get_session_duration_minutes():
@@ -81,65 +303,111 @@ def get_session_duration_minutes():
 def monitor():
     """
     Perform one monitoring cycle: collect data, calculate scores, log, and check alerts.
+    Each stage is timed (see core.instrumentation.get_stats()).
     
     Returns:
         dict: Monitoring data with all metrics
     """
+    with stage("cycle"):
+        data = _monitor_cycle()
+    mark("first_sample")
+    return data
+
+
+def _monitor_cycle():
+    """One monitoring cycle (see monitor())."""
     global last_blue_alert_time, last_thermal_alert_time
+    from inputs.distance import get_distance, get_face_distances, is_multi_face
     
     # Get current metrics
     duration_min = get_session_duration_minutes()
-    distance = get_distance()
-    brightness = get_brightness()
+    faces = None
+    with stage("distance"):
+        if is_multi_face():
+            faces = get_face_distances()
+            # The nearest viewer drives the main log and alerts (highest exposure)
+            distance = min((face["distance"] for face in faces), default=None)
+        else:
+            distance = get_distance()
+    if distance is None:
+        count("no_face")
+
+    with stage("brightness"):
+        brightness = get_brightness()
     
     # Default brightness to 60 if None (for macOS and other systems where detection might fail)
     if brightness is None:
+        count("brightness_unavailable")
         brightness = 60
 
-    # Calculate exposure scores
-    # Always calculate even if brightness is 0 or None (the function handles it)
-    blue_score = blue_light_score(brightness, duration_min, distance) if distance else 0.0
-    thermal_score_val = thermal_score(duration_min, distance) if distance else 0.0
+    current_time = time.time()
+
+    with stage("scoring"):
+        # Integrate the exposure since the previous sample and score the
+        # accumulated session dose (no dose accrues without a face, but a
+        # missed detection keeps the dose and so the score)
+        exposure = get_accumulator()
+        exposure.add_sample(current_time, brightness, distance, MONITORING_INTERVAL)
+        blue_score = blue_light_dose_score(exposure.blue_dose)
+        thermal_score_val = thermal_dose_score(exposure.thermal_dose)
 
-    # Determine risk levels
-    blue_risk = blue_light_risk(blue_score)
-    thermal_risk_val = thermal_risk(thermal_score_val)
+        # Determine risk levels
+        blue_risk = blue_light_risk(blue_score)
+        thermal_risk_val = thermal_risk(thermal_score_val)
 
     # Log data
-    log_data(distance, brightness, blue_score, thermal_score_val, blue_risk, thermal_risk_val)
+    with stage("log_write"):
+        log_data(distance, brightness, blue_score, thermal_score_val, blue_risk, thermal_risk_val)
 
     # Check for alerts (with cooldown to prevent spam)
-    current_time = time.time()
-    
-    if blue_risk == "HIGH" and (current_time - last_blue_alert_time) > ALERT_COOLDOWN:
-        show_alert(
-            "High Blue Light Exposure",
-            get_blue_light_recommendations(blue_risk)
-        )
-        last_blue_alert_time = current_time
-
-    if thermal_risk_val == "HIGH" and (current_time - last_thermal_alert_time) > ALERT_COOLDOWN:
-        show_alert(
-            "High Thermal Exposure",
-            get_thermal_recommendations(thermal_risk_val)
-        )
-        last_thermal_alert_time = current_time
+    with stage("alerts"):
+        if blue_risk == "HIGH" and (current_time - last_blue_alert_time) > ALERT_COOLDOWN:
+            raise_alert(
+                "High Blue Light Exposure",
+                get_blue_light_recommendations(blue_risk)
+            )
+            last_blue_alert_time = current_time
+            count("alerts")
 
-    # Return monitoring data
-    return {
+        if thermal_risk_val == "HIGH" and (current_time - last_thermal_alert_time) > ALERT_COOLDOWN:
+            raise_alert(
+                "High Thermal Exposure",
+                get_thermal_recommendations(thermal_risk_val)
+            )
+            last_thermal_alert_time = current_time
+            count("alerts")
+
+    data = {
         "distance": distance,
         "brightness": brightness,
         "blue_score": blue_score,
         "thermal_score": thermal_score_val,
         "blue_risk": blue_risk,
         "thermal_risk": thermal_risk_val,
-        "duration_min": duration_min
+        "duration_min": duration_min,
+        "blue_dose": round(exposure.blue_dose, 4),
+        "thermal_dose": round(exposure.thermal_dose, 4)
     }
 
+    if faces is not None:
+        with stage("face_scoring"):
+            data["faces"] = score_faces(faces, brightness, current_time)
+        with stage("face_log_write"):
+            log_face_data(data["faces"], brightness)
+
+    # Update minute/hour/day aggregates and attach today's summary
+    with stage("rollups"):
+        update_rollups(data, current_time)
+        data["today"] = get_rollup_store().get_bucket("day", datetime.now().strftime("%Y-%m-%d"))
+
+    # Return monitoring data
+    return data
+
 
 def log_data(distance, brightness, blue_score, thermal_score, blue_risk, thermal_risk):
     """
     Log monitoring data to CSV file.
+    Rows are buffered and written in batches by the log writer thread.
     
     Args:
         distance: Distance in cm
@@ -150,30 +418,123 @@ def log_data(distance, brightness, blue_score, thermal_score, blue_risk, thermal
         thermal_risk: Thermal risk level
     """
     try:
-        with open(LOG_FILE, "a", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                distance if distance else "N/A",
+        get_log_writer().write_row([
+            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            distance if distance else "N/A",
+            brightness if brightness else "N/A",
+            blue_score,
+            thermal_score,
+            blue_risk,
+            thermal_risk
+        ])
+    except Exception as e:
+        print(f"Error logging data: {e}")
+
+
+def score_faces(faces, brightness, timestamp):
+    """
+    Calculate exposure scores for every tracked face.
+
+    Each face is scored from its own accumulated dose (one dose_score() call
+    per face), so a viewer who just sat down starts at zero. The risk levels
+    of all faces are classified in one batch.
+
+    Args:
+        faces (list): {"track_id", "distance", ...} dicts from get_face_distances()
+        brightness (float): Screen brightness percentage
+        timestamp (float): Sample time (Unix seconds)
+
+    Returns:
+        list: {"track_id", "distance", "blue_score", "thermal_score", "blue_risk",
+            "thermal_risk"} dicts in the order of faces
+    """
+    if not faces:
+        return []
+
+    doses = get_accumulator().add_face_samples(timestamp, brightness, faces, MONITORING_INTERVAL)
+    blue_scores = [blue_light_dose_score(blue) for blue, _ in doses]
+    thermal_scores = [thermal_dose_score(thermal) for _, thermal in doses]
+    blue_risks = blue_light_risk_batch(blue_scores)
+    thermal_risks = thermal_risk_batch(thermal_scores)
+
+    return [
+        {
+            "track_id": face["track_id"],
+            "distance": face["distance"],
+            "blue_score": float(blue_scores[i]),
+            "thermal_score": float(thermal_scores[i]),
+            "blue_risk": str(blue_risks[i]),
+            "thermal_risk": str(thermal_risks[i])
+        }
+        for i, face in enumerate(faces)
+    ]
+
+
+def log_face_data(faces, brightness):
+    """
+    Log one row per tracked face to the per-face CSV log.
+
+    Args:
+        faces (list): Scored faces from score_faces()
+        brightness: Brightness percentage
+    """
+    if not faces:
+        return
+    try:
+        writer = get_face_log_writer()
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        for face in faces:
+            writer.write_row([
+                timestamp,
+                face["track_id"],
+                face["distance"],
                 brightness if brightness else "N/A",
-                blue_score,
-                thermal_score,
-                blue_risk,
-                thermal_risk
+                face["blue_score"],
+                face["thermal_score"],
+                face["blue_risk"],
+                face["thermal_risk"]
             ])
     except Exception as e:
-        print(f"Error logging data: {e}")
+        print(f"Error logging face data: {e}")
 
 
 def reset_session():
     """Reset the monitoring session."""
-    global session_start_time, last_blue_alert_time, last_thermal_alert_time
+    global session_start_time, session_id, last_blue_alert_time, last_thermal_alert_time
     session_start_time = time.time()
+    session_id = datetime.now().strftime("%Y%m%d-%H%M%S")
+    if log_writer is not None and hasattr(log_writer, "session_id"):
+        log_writer.session_id = session_id
     last_blue_alert_time = 0
     last_thermal_alert_time = 0
+    get_accumulator().start_session(session_id, session_start_time)
 
 
 def shutdown():
     """Cleanup resources on shutdown."""
-    release_camera()
+    global log_writer, face_log_writer
+    if "inputs.distance" in sys.modules:
+        # Nothing to release if the camera code was never loaded
+        from inputs.distance import release_camera
+        release_camera()
+    release_brightness()
+
+    # Write any buffered log rows
+    if log_writer is not None:
+        log_writer.close()
+        log_writer = None
+    if face_log_writer is not None:
+        face_log_writer.close()
+        face_log_writer = None
+
+    # Persist rollups
+    if rollups is not None:
+        rollups.save()
+
+    # Checkpoint the exposure doses so a restart can resume the session
+    if accumulator is not None:
+        accumulator.save()
+
+    # Write buffered stage timings
+    flush_trace()
 
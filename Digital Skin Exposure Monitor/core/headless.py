@@ -0,0 +1,91 @@
+"""
+Headless Module
+Runs the monitor without a GUI (kiosks, services).
+Monitoring cycles run on the main thread at the configured interval; the
+latest sample and rollups are served by the local metrics server. Tkinter and
+the camera preview are never loaded, and the camera only decodes the frames
+that are actually sampled.
+"""
+
+import signal
+import threading
+import time
+import traceback
+
+from core.controller import (
+    monitor, initialize_session, shutdown, get_monitoring_interval,
+    set_alert_handler, get_rollup_store
+)
+from core.metrics_server import MetricsState, MetricsServer
+from core.startup import warm_up, report_startup_times
+from inputs.camera import set_capture_interval
+
+# Decode at most this many camera frames per second when running headless
+HEADLESS_CAPTURE_FPS = 2
+
+
+def run_headless(host="127.0.0.1", port=8765, max_cycles=None):
+    """
+    Monitor until interrupted (Ctrl+C or SIGTERM), serving metrics over HTTP.
+
+    Args:
+        host (str): Metrics server bind address
+        port (int): Metrics server port
+        max_cycles (int): Stop after this many cycles (None = run forever)
+    """
+    stop_event = threading.Event()
+
+    def request_stop(signum, frame):
+        stop_event.set()
+
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+
+    set_capture_interval(1.0 / HEADLESS_CAPTURE_FPS if HEADLESS_CAPTURE_FPS else 0.0)
+    initialize_session(open_camera=False)
+
+    state = MetricsState()
+
+    def on_alert(title, message):
+        print(f"[ALERT] {title}: {message}")
+        state.record_alert(title, message)
+
+    set_alert_handler(on_alert)
+    server = None
+    cycles = 0
+    # Everything after initialize_session() runs inside the try, so a failed
+    # server start (e.g. port in use) still closes the logs and the camera
+    try:
+        server = MetricsServer(state, host, port, rollup_store=get_rollup_store).start()
+        bound_host, bound_port = server.address[:2]
+        print(f"Metrics at http://{bound_host}:{bound_port}/metrics")
+
+        # The server answers /health while the camera opens and the model loads
+        warm_up(print)
+        print("Headless monitoring active.")
+
+        while not stop_event.is_set():
+            cycle_start = time.monotonic()
+            try:
+                state.publish(monitor())
+            except Exception as e:
+                print(f"Error in update cycle: {e}")
+                traceback.print_exc()
+                # Continue monitoring even if one cycle fails
+                state.record_error(str(e))
+
+            cycles += 1
+            if cycles == 1:
+                report_startup_times("headless")
+            if max_cycles is not None and cycles >= max_cycles:
+                break
+            # Keep a steady cadence regardless of how long the cycle took
+            elapsed = time.monotonic() - cycle_start
+            stop_event.wait(max(0.0, get_monitoring_interval() - elapsed))
+    finally:
+        print("Shutting down...")
+        if server is not None:
+            server.stop()
+        set_alert_handler(None)
+        shutdown()
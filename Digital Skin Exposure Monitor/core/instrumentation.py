@@ -0,0 +1,178 @@
+"""
+Instrumentation Module
+Per-stage latency statistics for the monitoring pipeline.
+Code wraps each stage in ``with stage("name"):``. Every stage keeps a rolling
+window of recent durations (for p50/p95/p99), totals and a failure count.
+Named counters record events such as frames without a face. Stage timings can
+also be appended to a JSON-lines trace file for offline analysis.
+"""
+
+import json
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Record timings at all (the overhead is about a microsecond per stage)
+ENABLED = True
+
+# Number of recent durations kept per stage for the percentiles
+WINDOW_SIZE = 1024
+
+# JSON-lines trace file (None = no trace)
+TRACE_FILE = None
+
+_lock = threading.Lock()
+_stages = {}
+_counters = {}
+_trace = None
+
+
+class StageStats:
+    """Rolling latency statistics of one stage."""
+
+    def __init__(self, window_size):
+        self.recent = deque(maxlen=window_size)
+        self.count = 0
+        self.failures = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+
+    def add(self, elapsed_ms, ok=True):
+        self.recent.append(elapsed_ms)
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.last_ms = elapsed_ms
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+        if not ok:
+            self.failures += 1
+
+    def summary(self):
+        """
+        Returns:
+            dict: count, failures, total/mean/last/max and p50/p95/p99 of the recent window (ms)
+        """
+        ordered = sorted(self.recent)
+
+        def percentile(q):
+            if not ordered:
+                return None
+            # Nearest-rank percentile: the smallest value with at least q% of values at or below it
+            index = min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))
+            return round(ordered[index], 3)
+
+        return {
+            "count": self.count,
+            "failures": self.failures,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "last_ms": round(self.last_ms, 3),
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": percentile(50),
+            "p95_ms": percentile(95),
+            "p99_ms": percentile(99)
+        }
+
+
+def record(name, elapsed_ms, ok=True):
+    """
+    Record one stage duration.
+
+    Args:
+        name (str): Stage name
+        elapsed_ms (float): Duration in milliseconds
+        ok (bool): False if the stage raised
+    """
+    with _lock:
+        stats = _stages.get(name)
+        if stats is None:
+            stats = _stages[name] = StageStats(WINDOW_SIZE)
+        stats.add(elapsed_ms, ok)
+        if _trace is not None:
+            _trace.write(json.dumps({
+                "t": round(time.time(), 6),
+                "stage": name,
+                "ms": round(elapsed_ms, 4),
+                "ok": ok
+            }) + "\n")
+
+
+@contextmanager
+def stage(name):
+    """
+    Time a block of code as a pipeline stage.
+
+    Exceptions are counted as failures of the stage and re-raised.
+    """
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        record(name, (time.perf_counter() - start) * 1000, ok)
+
+
+def count(name, amount=1):
+    """Increment a named counter (e.g. "no_face")."""
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def get_stats():
+    """
+    Get latency statistics and counters.
+
+    Returns:
+        dict: {"stages": {name: summary}, "counters": {name: value}}
+    """
+    with _lock:
+        return {
+            "stages": {name: stats.summary() for name, stats in _stages.items()},
+            "counters": dict(_counters)
+        }
+
+
+def reset_stats():
+    """Forget all recorded timings and counters."""
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+
+
+def set_enabled(enabled):
+    """Turn timing on or off."""
+    global ENABLED
+    ENABLED = bool(enabled)
+
+
+def set_trace_file(path):
+    """
+    Start (or stop, with None) appending stage timings to a JSON-lines file.
+
+    Args:
+        path (str): Trace file path, or None to stop tracing
+    """
+    global TRACE_FILE, _trace
+    with _lock:
+        if _trace is not None:
+            _trace.close()
+            _trace = None
+        TRACE_FILE = path
+        if path:
+            _trace = open(path, "a", buffering=64 * 1024)
+
+
+def flush_trace():
+    """Write buffered trace lines to disk."""
+    with _lock:
+        if _trace is not None:
+            _trace.flush()
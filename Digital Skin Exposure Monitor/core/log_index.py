@@ -0,0 +1,538 @@
+"""
+Log Index Module
+Random-access paging over the exposure log.
+The CSV index keeps the byte offset of every row (persisted in a sidecar file
+next to the log) so any page can be read with one seek, without parsing the
+rows before it. The segmented index puts the rotated, compressed segments in
+front of the live CSV log, so paging covers the whole history. The SQLite
+index pages by row ID.
+All expose the same interface: build(), update(), len() and read_rows(start, count).
+update() only consumes rows added since the last call, so a live view can
+follow the log cheaply.
+"""
+
+import csv
+import io
+import json
+import os
+import sqlite3
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+
+import numpy as np
+
+from core.log_rotation import MANIFEST_NAME, load_manifest, open_segment
+from core.sqlite_store import SELECT_COLUMNS
+
+# Bytes read per chunk while scanning for row boundaries
+SCAN_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Bytes before end_offset remembered to detect a log rewritten in place
+FINGERPRINT_SIZE = 64
+
+# Sidecar files of the CSV index: row offsets (int64 each) and their JSON state
+INDEX_SUFFIX = ".idx"
+INDEX_STATE_SUFFIX = ".json"
+OFFSET_SIZE = 8
+
+# Decompressed segments kept in memory while paging through the archive
+SEGMENT_CACHE_SIZE = 2
+
+
+class CsvLogIndex:
+    """
+    Byte-offset index over the rows of a CSV log, persisted next to the log.
+
+    The offsets are kept in a sidecar file (one int64 per row, INDEX_SUFFIX)
+    with a small JSON state file (INDEX_STATE_SUFFIX). build() reopens the
+    sidecar and only scans rows appended since it was saved, so opening the
+    index costs the same at any log size; the whole log is scanned only when
+    no valid sidecar exists. Pages look up their two boundary offsets in the
+    sidecar, so the offsets are never loaded into memory.
+    """
+
+    def __init__(self, path, index_path=None):
+        """
+        Args:
+            path (str): CSV log file path
+            index_path (str): Offset sidecar file (default: path + INDEX_SUFFIX)
+        """
+        self.path = path
+        self.index_path = index_path or path + INDEX_SUFFIX
+        self.state_path = self.index_path + INDEX_STATE_SUFFIX
+        self.rows = 0
+        self.end_offset = 0  # End of the last complete row (bytes consumed so far)
+        self.header = None
+        self._inode = None
+        self._fingerprint = b""
+
+    def __len__(self):
+        return self.rows
+
+    def _reset(self):
+        self.rows = 0
+        self.end_offset = 0
+        self.header = None
+        self._inode = None
+        self._fingerprint = b""
+
+    def build(self):
+        """
+        Open the index: load the sidecar and index rows appended since it was saved.
+
+        Falls back to rebuild() when the sidecar is missing or belongs to other
+        log content (rotated, truncated or rewritten log).
+
+        Returns:
+            int: Number of indexed rows
+        """
+        self._reset()
+        if not os.path.exists(self.path):
+            return 0
+        if self._load_state():
+            self.update()
+            return self.rows
+        return self.rebuild()
+
+    def rebuild(self):
+        """
+        Rebuild the index by scanning the whole file for row boundaries.
+
+        Returns:
+            int: Number of indexed rows
+        """
+        self._reset()
+        if not os.path.exists(self.path):
+            return 0
+
+        with open(self.path, "rb") as f:
+            self._inode = os.fstat(f.fileno()).st_ino
+            header_line = f.readline()
+            if not header_line.endswith(b"\n"):
+                return 0
+            self.header = next(csv.reader([header_line.decode("utf-8")]))
+            self.end_offset = len(header_line)
+            self._scan(f, "wb")
+            self._fingerprint = self._read_fingerprint(f)
+        self._save_state()
+        return self.rows
+
+    def update(self):
+        """
+        Index rows appended since the last build()/update().
+
+        The index is rebuilt from scratch when the log was truncated (e.g. by
+        "Clear All Data"), replaced (rotation) or rewritten in place.
+
+        Returns:
+            tuple: (number of new rows, True if the index was rebuilt)
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            # Log removed: nothing to show until it is recreated
+            rebuilt = self.rows > 0 or self.end_offset > 0
+            self._reset()
+            return 0, rebuilt
+
+        if self.header is None or stat.st_ino != self._inode or stat.st_size < self.end_offset:
+            return self.rebuild(), True
+
+        with open(self.path, "rb") as f:
+            if self._read_fingerprint(f) != self._fingerprint:
+                # Same size or larger, but the rows we indexed are gone
+                return self.rebuild(), True
+            if stat.st_size == self.end_offset:
+                return 0, False
+
+            before = self.rows
+            self._scan(f, "r+b")
+            self._fingerprint = self._read_fingerprint(f)
+        if self.rows != before:
+            self._save_state()
+        return self.rows - before, False
+
+    def _read_fingerprint(self, f):
+        """Bytes just before end_offset, used to recognise the indexed content."""
+        begin = max(0, self.end_offset - FINGERPRINT_SIZE)
+        f.seek(begin)
+        return f.read(self.end_offset - begin)
+
+    def _scan(self, f, mode):
+        """
+        Index complete rows from end_offset to the end of the file.
+
+        Args:
+            f: Log file opened in binary mode
+            mode (str): "wb" to start a new sidecar, "r+b" to append to it
+        """
+        f.seek(self.end_offset)
+        position = self.end_offset
+        with open(self.index_path, mode) as index_file:
+            # Drop entries past the saved row count (left by an interrupted update)
+            index_file.truncate(self.rows * OFFSET_SIZE)
+            index_file.seek(self.rows * OFFSET_SIZE)
+            while True:
+                chunk = f.read(SCAN_CHUNK_SIZE)
+                if not chunk:
+                    break
+                newlines = np.flatnonzero(np.frombuffer(chunk, dtype=np.uint8) == 10)
+                if len(newlines):
+                    # A row starts right after the previous row's newline
+                    starts = np.empty(len(newlines), dtype=np.int64)
+                    starts[0] = self.end_offset
+                    starts[1:] = position + newlines[:-1] + 1
+                    index_file.write(starts.tobytes())
+                    self.rows += len(starts)
+                    self.end_offset = position + int(newlines[-1]) + 1
+                position += len(chunk)
+
+    def _load_state(self):
+        """
+        Load the sidecar state and check that it matches the log.
+
+        Returns:
+            bool: True if the sidecar can be used
+        """
+        try:
+            with open(self.state_path, "r") as f:
+                state = json.load(f)
+            rows = int(state["rows"])
+            end_offset = int(state["end_offset"])
+            fingerprint = bytes.fromhex(state["fingerprint"])
+            if os.path.getsize(self.index_path) < rows * OFFSET_SIZE:
+                return False
+            with open(self.path, "rb") as f:
+                stat = os.fstat(f.fileno())
+                if stat.st_ino != state["inode"] or stat.st_size < end_offset:
+                    return False
+                begin = max(0, end_offset - FINGERPRINT_SIZE)
+                f.seek(begin)
+                if f.read(end_offset - begin) != fingerprint:
+                    return False
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+
+        self.rows = rows
+        self.end_offset = end_offset
+        self.header = state["header"]
+        self._inode = state["inode"]
+        self._fingerprint = fingerprint
+        return True
+
+    def _save_state(self):
+        """Write the sidecar state atomically (after the offsets it describes)."""
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "rows": self.rows,
+                "end_offset": self.end_offset,
+                "inode": self._inode,
+                "header": self.header,
+                "fingerprint": self._fingerprint.hex()
+            }, f)
+        os.replace(tmp_path, self.state_path)
+
+    def _offsets(self, start, stop):
+        """Byte range of rows [start, stop) from the sidecar."""
+        with open(self.index_path, "rb") as f:
+            f.seek(start * OFFSET_SIZE)
+            begin = array("q", f.read(OFFSET_SIZE))[0]
+            if stop >= self.rows:
+                return begin, self.end_offset
+            f.seek(stop * OFFSET_SIZE)
+            return begin, array("q", f.read(OFFSET_SIZE))[0]
+
+    def read_rows(self, start, count):
+        """
+        Read a page of rows.
+
+        Args:
+            start (int): Index of the first row
+            count (int): Maximum number of rows
+
+        Returns:
+            list: Row value tuples
+        """
+        start = max(0, start)
+        stop = min(self.rows, start + count)
+        if start >= stop:
+            return []
+
+        begin, end = self._offsets(start, stop)
+        with open(self.path, "rb") as f:
+            f.seek(begin)
+            data = f.read(end - begin)
+
+        reader = csv.reader(io.StringIO(data.decode("utf-8", errors="replace"), newline=""))
+        return [tuple(row) for row in reader]
+
+
+class SegmentedLogIndex:
+    """
+    Paging over the rotated segments followed by the live CSV log.
+
+    Segment row counts come from the rotation manifest, so opening costs the
+    same however much is archived. A segment is decompressed only when a page
+    inside it is read; the last SEGMENT_CACHE_SIZE segments stay in memory.
+    """
+
+    def __init__(self, path, segment_dir):
+        """
+        Args:
+            path (str): Live CSV log file path
+            segment_dir (str): Segment directory of the rotated log
+        """
+        self.path = path
+        self.segment_dir = segment_dir
+        self.live = CsvLogIndex(path)
+        self.segments = []
+        self._bounds = []  # Global index of the first row of every segment
+        self.archived_rows = 0
+        self._manifest_stamp = None
+        self._cache = OrderedDict()  # segment file -> (data, row start offsets)
+
+    def __len__(self):
+        return self.archived_rows + len(self.live)
+
+    def _manifest_changed(self):
+        path = os.path.join(self.segment_dir, MANIFEST_NAME)
+        try:
+            stat = os.stat(path)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            stamp = None
+        if stamp == self._manifest_stamp:
+            return False
+        self._manifest_stamp = stamp
+        return True
+
+    def _load_segments(self):
+        self.segments = load_manifest(self.segment_dir)
+        self._bounds = []
+        total = 0
+        for segment in self.segments:
+            self._bounds.append(total)
+            total += segment["rows"]
+        self.archived_rows = total
+
+    def build(self):
+        """
+        Open the index: read the manifest and open the live log index.
+
+        Returns:
+            int: Number of rows (archived and live)
+        """
+        self._manifest_changed()
+        self._load_segments()
+        self._cache.clear()
+        self.live.build()
+        return len(self)
+
+    def update(self):
+        """
+        Account for rows logged and segments rotated since the last build()/update().
+
+        Rotation moves rows from the live log into a new segment without
+        changing their position, so it only counts as a rebuild when archived
+        segments were removed (e.g. "Clear All Data").
+
+        Returns:
+            tuple: (number of new rows, True if the index was rebuilt)
+        """
+        before = len(self)
+        rotated = False
+        rebuilt = False
+        if self._manifest_changed():
+            old_files = [segment["file"] for segment in self.segments]
+            self._load_segments()
+            new_files = [segment["file"] for segment in self.segments]
+            if new_files[:len(old_files)] == old_files:
+                rotated = len(new_files) > len(old_files)
+            else:
+                rebuilt = True
+                self._cache.clear()
+
+        live_rebuilt = self.live.update()[1]
+        rebuilt = rebuilt or (live_rebuilt and not rotated)
+        return (len(self) if rebuilt else max(0, len(self) - before)), rebuilt
+
+    def _segment_rows(self, segment):
+        """Decompressed data and row start offsets of a segment (cached)."""
+        name = segment["file"]
+        if name in self._cache:
+            self._cache.move_to_end(name)
+            return self._cache[name]
+
+        with open_segment(os.path.join(self.segment_dir, name), binary=True) as f:
+            data = f.read()
+        newlines = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == 10)
+        # Row i spans starts[i]:starts[i + 1] (the header line is not a row)
+        starts = newlines + 1
+        if len(data) and data[-1:] != b"\n":
+            starts = np.append(starts, len(data))
+
+        self._cache[name] = (data, starts)
+        while len(self._cache) > SEGMENT_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return data, starts
+
+    def _read_segment_rows(self, segment, start, count):
+        data, starts = self._segment_rows(segment)
+        stop = min(start + count, len(starts) - 1)
+        if start >= stop:
+            return []
+        text = data[starts[start]:starts[stop]].decode("utf-8", errors="replace")
+        return [tuple(row) for row in csv.reader(io.StringIO(text, newline="")) if row]
+
+    def read_rows(self, start, count):
+        """
+        Read a page of rows, crossing from segment to segment and into the live log.
+
+        Args:
+            start (int): Index of the first row
+            count (int): Maximum number of rows
+
+        Returns:
+            list: Row value tuples
+        """
+        start = max(0, start)
+        rows = []
+        while count > 0 and start < len(self):
+            if start >= self.archived_rows:
+                rows += self.live.read_rows(start - self.archived_rows, count)
+                break
+            i = bisect_right(self._bounds, start) - 1
+            segment = self.segments[i]
+            offset = start - self._bounds[i]
+            wanted = min(count, segment["rows"] - offset)
+            page = self._read_segment_rows(segment, offset, wanted)
+            rows += page
+            count -= len(page)
+            # A segment shorter than its manifest entry just ends early
+            start += wanted
+        return rows
+
+
+class SQLiteLogIndex:
+    """Row-ID paging over the SQLite samples table."""
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Database file path
+        """
+        self.path = path
+        self.count = 0
+        self.min_id = 0
+        self.max_id = 0
+        self.contiguous = True
+        self._last_datetime = None  # DateTime of row max_id, to recognise the indexed rows
+
+    def __len__(self):
+        return self.count
+
+    def build(self):
+        """
+        Read the row count and ID range.
+
+        Returns:
+            int: Number of rows
+        """
+        self.count = self.min_id = self.max_id = 0
+        self._last_datetime = None
+        if not os.path.exists(self.path):
+            return 0
+
+        conn = sqlite3.connect(self.path)
+        try:
+            count, min_id, max_id = conn.execute("SELECT COUNT(*), MIN(id), MAX(id) FROM samples").fetchone()
+            self._last_datetime = self._datetime_of(conn, max_id)
+        except sqlite3.OperationalError:
+            return 0
+        finally:
+            conn.close()
+
+        self.count = count or 0
+        self.min_id = min_id or 0
+        self.max_id = max_id or 0
+        self.contiguous = self.max_id - self.min_id + 1 == self.count
+        return self.count
+
+    @staticmethod
+    def _datetime_of(conn, row_id):
+        """DateTime of a row, or None if the row does not exist."""
+        row = conn.execute("SELECT datetime FROM samples WHERE id = ?", (row_id,)).fetchone()
+        return row[0] if row else None
+
+    def update(self):
+        """
+        Account for rows inserted since the last build()/update().
+        Only rows with an ID above the last seen one are counted. The index is
+        rebuilt when indexed rows were deleted, including a delete followed by
+        inserts that reuse the old IDs.
+
+        Returns:
+            tuple: (number of new rows, True if the index was rebuilt)
+        """
+        if not os.path.exists(self.path):
+            rebuilt = self.count > 0
+            self.count = self.min_id = self.max_id = 0
+            return 0, rebuilt
+
+        conn = sqlite3.connect(self.path)
+        try:
+            min_id, max_id = conn.execute("SELECT MIN(id), MAX(id) FROM samples").fetchone()
+            min_id, max_id = min_id or 0, max_id or 0
+            deleted = self.count and (
+                min_id != self.min_id or max_id < self.max_id
+                or self._datetime_of(conn, self.max_id) != self._last_datetime
+            )
+            if not deleted:
+                new_count = conn.execute("SELECT COUNT(*) FROM samples WHERE id > ?", (self.max_id,)).fetchone()[0]
+                last_datetime = self._datetime_of(conn, max_id) if new_count else None
+        except sqlite3.OperationalError:
+            return 0, False
+        finally:
+            conn.close()
+
+        if deleted:
+            # Rows were deleted (e.g. "Clear All Data"), possibly followed by new ones
+            return self.build(), True
+
+        if new_count:
+            if not self.count:
+                self.min_id = min_id
+            self.count += new_count
+            self.max_id = max_id
+            self._last_datetime = last_datetime
+            self.contiguous = self.contiguous and self.max_id - self.min_id + 1 == self.count
+        return new_count, False
+
+    def read_rows(self, start, count):
+        """
+        Read a page of rows in insertion order.
+
+        IDs are contiguous unless rows were deleted, so a page is normally a
+        direct primary-key range; otherwise OFFSET paging is used.
+
+        Returns:
+            list: Row value tuples
+        """
+        start = max(0, start)
+        if start >= self.count or count <= 0:
+            return []
+
+        if self.contiguous:
+            sql = f"SELECT {SELECT_COLUMNS} FROM samples WHERE id >= ? ORDER BY id LIMIT ?"
+            params = (self.min_id + start, count)
+        else:
+            sql = f"SELECT {SELECT_COLUMNS} FROM samples ORDER BY id LIMIT ? OFFSET ?"
+            params = (count, start)
+
+        conn = sqlite3.connect(self.path)
+        try:
+            return [tuple("N/A" if v is None else v for v in row) for row in conn.execute(sql, params)]
+        finally:
+            conn.close()
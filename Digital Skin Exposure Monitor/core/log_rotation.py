@@ -0,0 +1,252 @@
+"""
+Log Rotation Module
+Size/time-based rotation of the CSV exposure log into compressed segments.
+
+Rotated segments are gzip (or zstd, when the optional ``zstandard`` package is
+installed) compressed copies of the log, each with its own header. A JSON
+manifest records every segment's time range, so a time-range read only opens
+the segments it needs and streams them without unpacking to disk.
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MANIFEST_NAME = "manifest.json"
+
+# Compressed segment file suffixes
+SUFFIXES = {"gzip": ".csv.gz", "zstd": ".csv.zst"}
+
+
+class RotationPolicy:
+    """When and how the live CSV log is rotated."""
+
+    def __init__(self, segment_dir, max_bytes=10 * 1024 * 1024, max_age=7 * 86400, compression="gzip"):
+        """
+        Args:
+            segment_dir (str): Directory for segments and the manifest
+            max_bytes (int): Rotate once the live log is larger than this (None = no size limit)
+            max_age (float): Rotate once the oldest live row is older than this many seconds (None = no limit)
+            compression (str): "gzip" or "zstd" (falls back to gzip without zstandard)
+        """
+        self.segment_dir = segment_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        if compression == "zstd" and zstandard is None:
+            print("zstandard is not installed, rotating log segments with gzip")
+            compression = "gzip"
+        if compression not in SUFFIXES:
+            raise ValueError(f"Unknown compression: {compression}")
+        self.compression = compression
+
+    def should_rotate(self, size, first_row_time, now=None):
+        """
+        Check whether the live log is due for rotation.
+
+        Args:
+            size (int): Live log size in bytes
+            first_row_time (float): Unix time of the oldest live row (None if empty)
+            now (float): Current time (defaults to time.time())
+
+        Returns:
+            bool: True if the log should be rotated
+        """
+        if first_row_time is None:
+            return False
+        if self.max_bytes and size >= self.max_bytes:
+            return True
+        now = now if now is not None else time.time()
+        return bool(self.max_age) and now - first_row_time >= self.max_age
+
+
+def parse_datetime(value):
+    """Parse a log DateTime field to Unix time (None if malformed)."""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d %H:%M:%S").timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def read_boundary_times(f):
+    """
+    Get the DateTime of the first and last data rows of an open CSV file.
+
+    Returns:
+        tuple: (first, last) DateTime strings, None when there are no rows
+    """
+    f.seek(0)
+    f.readline()  # header
+    first_line = f.readline()
+    if not first_line:
+        return None, None
+
+    # Read a tail window that certainly contains the last complete row
+    size = f.seek(0, os.SEEK_END)
+    f.seek(max(0, size - 4096))
+    tail = f.read().splitlines()
+    last_line = tail[-1] if tail else first_line
+
+    first = next(csv.reader([first_line.decode("utf-8", errors="replace")]), [None])[0]
+    last = next(csv.reader([last_line.decode("utf-8", errors="replace")]), [None])[0]
+    return first, last
+
+
+def load_manifest(segment_dir):
+    """
+    Load the segment manifest.
+
+    Returns:
+        list: Segment entries ({"file", "start", "end", "rows", "bytes", "compression"}) by start time
+    """
+    path = os.path.join(segment_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, "r") as f:
+            return sorted(json.load(f).get("segments", []), key=lambda s: s["start"])
+    except (IOError, ValueError) as e:
+        print(f"Error reading segment manifest: {e}")
+        return []
+
+
+def save_manifest(segment_dir, segments):
+    """Write the manifest atomically."""
+    path = os.path.join(segment_dir, MANIFEST_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"segments": segments}, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def write_segment(source, segment_dir, start, end, compression="gzip"):
+    """
+    Compress the contents of an open binary CSV file into a new segment.
+
+    Args:
+        source: Binary file object positioned anywhere (it is read from the start)
+        segment_dir (str): Target directory
+        start (str): DateTime of the first row
+        end (str): DateTime of the last row
+        compression (str): "gzip" or "zstd"
+
+    Returns:
+        dict: Manifest entry of the new segment
+    """
+    os.makedirs(segment_dir, exist_ok=True)
+    stamp = start.replace("-", "").replace(":", "").replace(" ", "-")
+    name = f"exposure_log-{stamp}{SUFFIXES[compression]}"
+    path = os.path.join(segment_dir, name)
+    counter = 1
+    while os.path.exists(path):
+        name = f"exposure_log-{stamp}-{counter}{SUFFIXES[compression]}"
+        path = os.path.join(segment_dir, name)
+        counter += 1
+
+    source.seek(0)
+    rows = -1  # header line is not a row
+    raw_bytes = 0
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as raw_out:
+        if compression == "zstd":
+            out = zstandard.ZstdCompressor(level=10).stream_writer(raw_out)
+        else:
+            out = gzip.GzipFile(fileobj=raw_out, mode="wb", compresslevel=6)
+        with out:
+            while True:
+                chunk = source.read(1024 * 1024)
+                if not chunk:
+                    break
+                rows += chunk.count(b"\n")
+                raw_bytes += len(chunk)
+                out.write(chunk)
+    os.replace(tmp_path, path)
+
+    return {
+        "file": name,
+        "start": start,
+        "end": end,
+        "rows": max(rows, 0),
+        "bytes": os.path.getsize(path),
+        "raw_bytes": raw_bytes,
+        "compression": compression
+    }
+
+
+def open_segment(path, binary=False):
+    """
+    Open a (possibly compressed) CSV log or segment for streaming reads.
+
+    Args:
+        path (str): Segment or CSV file
+        binary (bool): Return a binary reader instead of a text reader
+
+    Returns:
+        file object: Text-mode (or binary) reader
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb") if binary else gzip.open(path, "rt", newline="")
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read .zst segments")
+        raw = open(path, "rb")
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return reader if binary else io.TextIOWrapper(reader, newline="")
+    return open(path, "rb") if binary else open(path, "r", newline="")
+
+
+def iter_rows(log_path, segment_dir, start=None, end=None):
+    """
+    Stream log rows for a time range across compressed segments and the live log.
+
+    Only segments whose time range overlaps [start, end) are opened.
+
+    Args:
+        log_path (str): Live CSV log
+        segment_dir (str): Segment directory
+        start (str): Inclusive lower bound ("YYYY-MM-DD HH:MM:SS" or a prefix like a date)
+        end (str): Exclusive upper bound, same format
+
+    Yields:
+        list: Row values in log column order
+    """
+    sources = []
+    for segment in load_manifest(segment_dir):
+        if end is not None and segment["start"] >= end:
+            continue
+        # segment["end"] is the last row's DateTime, compare as an inclusive bound
+        if start is not None and segment["end"] < start:
+            continue
+        sources.append(os.path.join(segment_dir, segment["file"]))
+    if os.path.exists(log_path):
+        sources.append(log_path)
+
+    for path in sources:
+        with open_segment(path) as f:
+            reader = csv.reader(f)
+            next(reader, None)  # header
+            for row in reader:
+                if not row:
+                    continue
+                stamp = row[0]
+                if start is not None and stamp < start:
+                    continue
+                if end is not None and stamp >= end:
+                    # Rows are in time order within a file
+                    break
+                yield row
+
+
+def clear_segments(segment_dir):
+    """Delete all segments and the manifest."""
+    if os.path.isdir(segment_dir):
+        shutil.rmtree(segment_dir)
@@ -0,0 +1,216 @@
+"""
+Log Writer Module
+Buffered CSV writer for the exposure log.
+Rows are collected in memory and written by a background thread in batches
+(when enough rows are pending, after a time limit, or on close), keeping the
+file open between batches. Optional group-commit fsync makes each batch durable
+with a single sync call. With a RotationPolicy the log is rotated into
+compressed segments after a flush once it is too large or too old.
+"""
+
+import csv
+import os
+import threading
+
+from core.instrumentation import stage
+from core.log_rotation import (
+    parse_datetime, read_boundary_times, write_segment, load_manifest, save_manifest
+)
+
+# Column header of the exposure log
+LOG_COLUMNS = [
+    "DateTime",
+    "Distance_cm",
+    "Brightness",
+    "BlueLightScore",
+    "ThermalScore",
+    "BlueRisk",
+    "ThermalRisk"
+]
+
+# Column header of the per-face log (multi-face mode)
+FACE_LOG_COLUMNS = [
+    "DateTime",
+    "TrackID",
+    "Distance_cm",
+    "Brightness",
+    "BlueLightScore",
+    "ThermalScore",
+    "BlueRisk",
+    "ThermalRisk"
+]
+
+
+class CsvLogWriter:
+    """Append-only CSV log with in-memory buffering and batched flushes."""
+
+    def __init__(self, path, flush_rows=50, flush_interval=5.0, fsync=False, rotation=None, columns=LOG_COLUMNS):
+        """
+        Args:
+            path (str): CSV file path
+            flush_rows (int): Flush as soon as this many rows are pending
+            flush_interval (float): Flush pending rows at least this often (seconds)
+            fsync (bool): fsync the file after every batch (group commit)
+            rotation (RotationPolicy): Rotate the log into compressed segments (None = never)
+            columns (list): Header row (first column must be the DateTime)
+        """
+        self.path = path
+        self.flush_rows = max(1, int(flush_rows))
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.rotation = rotation
+        self.columns = list(columns)
+        self._first_row_time = None  # Unix time of the oldest row in the live log
+
+        self._file = None
+        self._writer = None
+        self._pending = []
+        self._pending_lock = threading.Lock()  # Guards the pending buffer
+        self._io_lock = threading.Lock()  # Serializes file writes
+        self._wake = threading.Event()
+        self._closing = False
+        self._thread = None
+
+        self.rows_written = 0
+        self.flushes = 0
+
+    def open(self):
+        """Open the log (writing the header to a new file) and start the flusher."""
+        if self._file is not None:
+            return self
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        self._file = open(self.path, "a", newline="", buffering=1024 * 1024)
+        self._writer = csv.writer(self._file)
+        if new_file:
+            self._writer.writerow(self.columns)
+            self._file.flush()
+        else:
+            with open(self.path, "rb") as f:
+                first, _ = read_boundary_times(f)
+            self._first_row_time = parse_datetime(first)
+
+        self._closing = False
+        self._thread = threading.Thread(target=self._run, name="CsvLogWriter", daemon=True)
+        self._thread.start()
+        return self
+
+    def write_row(self, row):
+        """
+        Queue one row for writing. Never blocks on disk I/O.
+
+        Args:
+            row (list): Values in column order
+        """
+        with self._pending_lock:
+            self._pending.append(row)
+            if len(self._pending) >= self.flush_rows:
+                self._wake.set()
+
+    def _run(self):
+        """Background flush loop."""
+        while not self._closing:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error logging data: {e}")
+
+    def flush(self):
+        """
+        Write all pending rows to disk now.
+
+        Returns:
+            int: Number of rows written
+        """
+        with self._io_lock:
+            with self._pending_lock:
+                rows, self._pending = self._pending, []
+            if not rows or self._file is None:
+                return 0
+
+            with stage("log_flush"):
+                self._writer.writerows(rows)
+                self._file.flush()
+                if self.fsync:
+                    os.fsync(self._file.fileno())
+
+            self.rows_written += len(rows)
+            self.flushes += 1
+
+            if self._first_row_time is None:
+                self._first_row_time = parse_datetime(rows[0][0])
+            if self.rotation is not None:
+                size = os.fstat(self._file.fileno()).st_size
+                if self.rotation.should_rotate(size, self._first_row_time):
+                    self._rotate()
+            return len(rows)
+
+    def rotate(self):
+        """
+        Rotate the live log into a compressed segment now.
+
+        Returns:
+            dict: Manifest entry of the new segment, or None if the log had no rows
+        """
+        if self.rotation is None:
+            raise RuntimeError("No rotation policy configured")
+        self.flush()
+        with self._io_lock:
+            return self._rotate()
+
+    def _rotate(self):
+        """Compress the live log into a segment and truncate it (io lock held)."""
+        if self._file is None:
+            return None
+        self._file.flush()
+
+        with open(self.path, "rb") as source:
+            first, last = read_boundary_times(source)
+            if first is None:
+                return None
+            entry = write_segment(source, self.rotation.segment_dir, first, last, self.rotation.compression)
+
+        # Record the segment before dropping the rows from the live log
+        segments = load_manifest(self.rotation.segment_dir)
+        segments.append(entry)
+        save_manifest(self.rotation.segment_dir, segments)
+
+        self._file.truncate(0)
+        self._writer.writerow(self.columns)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._first_row_time = None
+        return entry
+
+    def clear(self):
+        """Drop pending rows and truncate the log back to its header."""
+        with self._io_lock:
+            with self._pending_lock:
+                self._pending = []
+            if self._file is not None:
+                self._file.flush()
+                self._file.truncate(0)
+                self._writer.writerow(self.columns)
+                self._file.flush()
+            self._first_row_time = None
+
+    def close(self):
+        """Flush pending rows, stop the flusher and close the file."""
+        self._closing = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+        with self._io_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                self._writer = None
@@ -0,0 +1,293 @@
+"""
+Metrics Server Module
+Local HTTP endpoint exposing the latest monitoring sample and the rollups.
+
+Endpoints (bound to 127.0.0.1 by default):
+    /latest    Latest sample, recent alerts and counters (JSON)
+    /rollups   Rollup buckets (JSON); ?resolution=minute|hour|day&start=...&end=...
+    /stats     Per-stage latency percentiles and pipeline counters (JSON)
+    /metrics   Latest sample, today's aggregates and stage latencies (Prometheus text format)
+    /health    Liveness check (JSON)
+"""
+
+import json
+import math
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from core.rollups import RESOLUTIONS, RISK_LEVELS
+from core.instrumentation import get_stats
+
+# Numeric risk levels for Prometheus gauges
+RISK_VALUES = {"LOW": 0, "MODERATE": 1, "HIGH": 2}
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsState:
+    """Latest sample and counters shared between the monitor loop and the server."""
+
+    def __init__(self, max_alerts=20):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.latest = None
+        self.latest_time = None
+        self.samples = 0
+        self.errors = 0
+        self.last_error = None
+        self.alerts = deque(maxlen=max_alerts)
+        self.alert_counts = {}
+
+    def publish(self, data):
+        """Record a monitoring sample."""
+        with self._lock:
+            self.latest = data
+            self.latest_time = time.time()
+            self.samples += 1
+
+    def record_error(self, message):
+        """Record a failed monitoring cycle."""
+        with self._lock:
+            self.errors += 1
+            self.last_error = message
+
+    def record_alert(self, title, message):
+        """Record a raised alert (usable as the controller's alert handler)."""
+        with self._lock:
+            self.alerts.append({"time": time.time(), "title": title, "message": message})
+            self.alert_counts[title] = self.alert_counts.get(title, 0) + 1
+
+    def snapshot(self):
+        """
+        Get a consistent copy of the state.
+
+        Returns:
+            dict: latest sample, its time, counters and recent alerts
+        """
+        with self._lock:
+            return {
+                "latest": self.latest,
+                "latest_time": self.latest_time,
+                "uptime_s": round(time.time() - self.started, 1),
+                "samples": self.samples,
+                "errors": self.errors,
+                "last_error": self.last_error,
+                "alerts": list(self.alerts),
+                "alert_counts": dict(self.alert_counts)
+            }
+
+
+def _number(value):
+    """Prometheus sample value (NaN for missing values)."""
+    if value is None or value == "N/A":
+        return "NaN"
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return "NaN"
+    return "NaN" if math.isnan(value) else repr(value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def render_prometheus(snapshot, today=None, stats=None):
+    """
+    Format a state snapshot in the Prometheus text exposition format.
+
+    Args:
+        snapshot (dict): MetricsState.snapshot()
+        today (dict): Today's rollup summary (see core.rollups.summarize)
+        stats (dict): Pipeline statistics (see core.instrumentation.get_stats)
+
+    Returns:
+        str: Metrics text
+    """
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        # Samples are (labels, value), or (suffix, labels, value) for series such as _sum
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for sample in samples:
+            suffix, labels, value = sample if len(sample) == 3 else ("", *sample)
+            label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+            series = name + suffix
+            lines.append(f"{series}{{{label_text}}} {value}" if label_text else f"{series} {value}")
+
+    latest = snapshot["latest"] or {}
+    metric("dsem_distance_cm", "gauge", "Distance from screen of the nearest face (cm)",
+           [({}, _number(latest.get("distance")))])
+    metric("dsem_brightness_percent", "gauge", "Screen brightness (%)",
+           [({}, _number(latest.get("brightness")))])
+    metric("dsem_blue_light_score", "gauge", "Blue light exposure score (0-100)",
+           [({}, _number(latest.get("blue_score")))])
+    metric("dsem_thermal_score", "gauge", "Thermal exposure score (0-100)",
+           [({}, _number(latest.get("thermal_score")))])
+    metric("dsem_risk_level", "gauge", "Risk level (0 = LOW, 1 = MODERATE, 2 = HIGH)", [
+        ({"kind": "blue"}, _number(RISK_VALUES.get(latest.get("blue_risk")))),
+        ({"kind": "thermal"}, _number(RISK_VALUES.get(latest.get("thermal_risk"))))
+    ])
+    metric("dsem_session_duration_minutes", "gauge", "Current session duration (minutes)",
+           [({}, _number(latest.get("duration_min")))])
+    metric("dsem_session_dose", "gauge", "Accumulated session dose (blue: brightness*min/cm^2, thermal: min/cm)", [
+        ({"kind": "blue"}, _number(latest.get("blue_dose"))),
+        ({"kind": "thermal"}, _number(latest.get("thermal_dose")))
+    ])
+    if "faces" in latest:
+        metric("dsem_faces", "gauge", "Faces currently tracked", [({}, len(latest["faces"]))])
+        metric("dsem_face_distance_cm", "gauge", "Distance from screen per tracked face (cm)",
+               [({"track_id": face["track_id"]}, _number(face["distance"])) for face in latest["faces"]])
+
+    metric("dsem_last_sample_timestamp_seconds", "gauge", "Unix time of the latest sample",
+           [({}, _number(snapshot["latest_time"]))])
+    metric("dsem_uptime_seconds", "gauge", "Seconds since the monitor started",
+           [({}, _number(snapshot["uptime_s"]))])
+    metric("dsem_samples_total", "counter", "Monitoring cycles completed", [({}, snapshot["samples"])])
+    metric("dsem_cycle_errors_total", "counter", "Monitoring cycles that failed", [({}, snapshot["errors"])])
+    metric("dsem_alerts_total", "counter", "Alerts raised",
+           [({"title": title}, count) for title, count in sorted(snapshot["alert_counts"].items())])
+
+    if today:
+        metric("dsem_today_monitored_seconds", "gauge", "Seconds monitored today",
+               [({}, _number(today.get("seconds")))])
+        metric("dsem_today_samples", "gauge", "Samples taken today", [({}, _number(today.get("samples")))])
+        metric("dsem_today_risk_seconds", "gauge", "Seconds spent in each risk level today", [
+            ({"kind": kind, "level": level}, _number(today.get(f"{kind}_{level.lower()}_s")))
+            for kind in ("blue", "thermal") for level in RISK_LEVELS
+        ])
+        metric("dsem_today_distance_avg_cm", "gauge", "Average distance today (cm)",
+               [({}, _number(today.get("distance_avg")))])
+        metric("dsem_today_blue_light_score_max", "gauge", "Peak blue light score today",
+               [({}, _number(today.get("blue_score_max")))])
+
+    if stats:
+        stages = sorted(stats["stages"].items())
+        # Quantiles over the recent window; _sum and _count over the whole run
+        metric("dsem_stage_latency_ms", "summary", "Pipeline stage latency (ms)", [
+            sample
+            for name, summary in stages
+            for sample in [
+                ({"stage": name, "quantile": q}, _number(summary[f"p{int(float(q) * 100)}_ms"]))
+                for q in ("0.5", "0.95", "0.99")
+            ] + [
+                ("_sum", {"stage": name}, _number(summary["total_ms"])),
+                ("_count", {"stage": name}, summary["count"])
+            ]
+        ])
+        metric("dsem_stage_calls_total", "counter", "Pipeline stage executions",
+               [({"stage": name}, summary["count"]) for name, summary in stages])
+        metric("dsem_stage_failures_total", "counter", "Pipeline stage executions that raised",
+               [({"stage": name}, summary["failures"]) for name, summary in stages])
+        metric("dsem_pipeline_events_total", "counter", "Pipeline events (e.g. no_face, camera_no_frame)",
+               [({"event": name}, value) for name, value in sorted(stats["counters"].items())])
+
+    return "\n".join(lines) + "\n"
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Serves the metrics endpoints for MetricsServer."""
+
+    server_version = "DSEMMetrics/1.0"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        metrics = self.server.metrics
+        try:
+            if url.path == "/latest":
+                self._send_json(metrics.state.snapshot())
+            elif url.path == "/rollups":
+                query = parse_qs(url.query)
+                resolution = query.get("resolution", ["hour"])[0]
+                if resolution not in RESOLUTIONS:
+                    self._send_json({"error": f"Unknown resolution: {resolution}"}, status=400)
+                    return
+                start = query.get("start", [None])[0]
+                end = query.get("end", [None])[0]
+                buckets = metrics.rollup_store().get(resolution, start, end) if metrics.rollup_store else []
+                self._send_json({"resolution": resolution, "buckets": [
+                    {"key": key, **summary} for key, summary in buckets
+                ]})
+            elif url.path == "/stats":
+                self._send_json(get_stats())
+            elif url.path == "/metrics":
+                body = render_prometheus(metrics.state.snapshot(), metrics.today_summary(), get_stats())
+                self._send(200, PROMETHEUS_CONTENT_TYPE, body.encode("utf-8"))
+            elif url.path in ("/", "/health"):
+                self._send_json({"status": "ok", "endpoints": ["/latest", "/rollups", "/stats", "/metrics"]})
+            else:
+                self._send_json({"error": "Not found"}, status=404)
+        except Exception as e:
+            print(f"Error serving {url.path}: {e}")
+            self._send_json({"error": str(e)}, status=500)
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload, default=str).encode("utf-8")
+        self._send(status, "application/json", body)
+
+    def _send(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood the console
+        pass
+
+
+class MetricsServer:
+    """Threaded HTTP server for the metrics endpoints."""
+
+    def __init__(self, state, host="127.0.0.1", port=8765, rollup_store=None):
+        """
+        Args:
+            state (MetricsState): Shared state updated by the monitor loop
+            host (str): Bind address (keep it local unless the network is trusted)
+            port (int): TCP port (0 picks a free port)
+            rollup_store (callable): Returns the RollupStore used for /rollups and today's totals
+        """
+        self.state = state
+        self.host = host
+        self.port = port
+        self.rollup_store = rollup_store
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def address(self):
+        """(host, port) the server is bound to."""
+        return self._httpd.server_address if self._httpd is not None else (self.host, self.port)
+
+    def today_summary(self):
+        """Today's rollup summary, or None."""
+        if self.rollup_store is None:
+            return None
+        return self.rollup_store().get_bucket("day", datetime.now().strftime("%Y-%m-%d"))
+
+    def start(self):
+        """Bind and serve on a background thread."""
+        if self._httpd is not None:
+            return self
+        self._httpd = ThreadingHTTPServer((self.host, self.port), MetricsRequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.metrics = self
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="MetricsServer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the socket."""
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
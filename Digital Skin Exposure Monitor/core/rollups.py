@@ -0,0 +1,237 @@
+"""
+Rollups Module
+Per-minute, per-hour and per-day exposure aggregates.
+Every monitoring sample updates one bucket per resolution in O(1) (count, sum,
+min and max of each metric plus seconds spent in each risk level), so summaries
+never need a scan of the raw log. Buckets are persisted as JSON next to the log.
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+# Bucket key format per resolution (local time); keys sort chronologically
+RESOLUTIONS = {
+    "minute": "%Y-%m-%d %H:%M",
+    "hour": "%Y-%m-%d %H",
+    "day": "%Y-%m-%d"
+}
+
+# How long buckets are kept per resolution (days, None = forever)
+RETENTION_DAYS = {
+    "minute": 2,
+    "hour": 90,
+    "day": None
+}
+
+# Numeric metrics aggregated from the monitoring data dict
+METRICS = ("distance", "brightness", "blue_score", "thermal_score")
+
+RISK_LEVELS = ("LOW", "MODERATE", "HIGH")
+
+
+def new_bucket():
+    """Empty aggregate bucket."""
+    return {
+        "samples": 0,
+        "seconds": 0.0,
+        "metrics": {name: {"count": 0, "sum": 0.0, "min": None, "max": None} for name in METRICS},
+        "risk_seconds": {
+            "blue": {level: 0.0 for level in RISK_LEVELS},
+            "thermal": {level: 0.0 for level in RISK_LEVELS}
+        }
+    }
+
+
+def summarize(bucket):
+    """
+    Flatten a bucket into averages, extremes and time in risk levels.
+
+    Returns:
+        dict: e.g. distance_avg, blue_score_max, blue_high_s, thermal_moderate_s
+    """
+    summary = {"samples": bucket["samples"], "seconds": round(bucket["seconds"], 1)}
+    for name, agg in bucket["metrics"].items():
+        summary[f"{name}_avg"] = round(agg["sum"] / agg["count"], 2) if agg["count"] else None
+        summary[f"{name}_min"] = agg["min"]
+        summary[f"{name}_max"] = agg["max"]
+    for kind, levels in bucket["risk_seconds"].items():
+        for level, seconds in levels.items():
+            summary[f"{kind}_{level.lower()}_s"] = round(seconds, 1)
+    return summary
+
+
+def merge_buckets(target, source):
+    """Add the aggregates of ``source`` into ``target``."""
+    target["samples"] += source["samples"]
+    target["seconds"] += source["seconds"]
+    for name, agg in source["metrics"].items():
+        dest = target["metrics"].setdefault(name, {"count": 0, "sum": 0.0, "min": None, "max": None})
+        dest["count"] += agg["count"]
+        dest["sum"] += agg["sum"]
+        if agg["min"] is not None:
+            dest["min"] = agg["min"] if dest["min"] is None else min(dest["min"], agg["min"])
+        if agg["max"] is not None:
+            dest["max"] = agg["max"] if dest["max"] is None else max(dest["max"], agg["max"])
+    for kind, levels in source["risk_seconds"].items():
+        for level, seconds in levels.items():
+            target["risk_seconds"].setdefault(kind, {}).setdefault(level, 0.0)
+            target["risk_seconds"][kind][level] += seconds
+    return target
+
+
+class RollupStore:
+    """Incrementally maintained exposure aggregates at several resolutions."""
+
+    def __init__(self, path, save_interval=60.0):
+        """
+        Args:
+            path (str): JSON file the rollups are persisted to
+            save_interval (float): Minimum seconds between automatic saves
+        """
+        self.path = path
+        self.save_interval = save_interval
+        self.buckets = {resolution: {} for resolution in RESOLUTIONS}
+        self._lock = threading.Lock()
+        self._last_save = time.monotonic()
+        self._dirty = False
+
+    def load(self):
+        """Load persisted rollups (missing or unreadable files start empty)."""
+        if not os.path.exists(self.path):
+            return self
+        try:
+            with open(self.path, "r") as f:
+                stored = json.load(f)
+            with self._lock:
+                for resolution in RESOLUTIONS:
+                    self.buckets[resolution] = stored.get(resolution, {})
+        except (IOError, ValueError) as e:
+            print(f"Error loading rollups: {e}")
+        return self
+
+    def add_sample(self, timestamp, data, seconds):
+        """
+        Add one monitoring sample to every resolution.
+
+        Args:
+            timestamp (float): Sample time (Unix seconds)
+            data (dict): Monitoring data (distance, brightness, scores, risks)
+            seconds (float): Time the sample represents (for time-in-risk)
+        """
+        moment = datetime.fromtimestamp(timestamp)
+        with self._lock:
+            for resolution, key_format in RESOLUTIONS.items():
+                key = moment.strftime(key_format)
+                bucket = self.buckets[resolution].get(key)
+                if bucket is None:
+                    bucket = self.buckets[resolution][key] = new_bucket()
+
+                bucket["samples"] += 1
+                bucket["seconds"] += seconds
+                for name in METRICS:
+                    value = data.get(name)
+                    if value is None or value == "N/A":
+                        continue
+                    agg = bucket["metrics"][name]
+                    agg["count"] += 1
+                    agg["sum"] += value
+                    agg["min"] = value if agg["min"] is None else min(agg["min"], value)
+                    agg["max"] = value if agg["max"] is None else max(agg["max"], value)
+
+                for kind, key_name in (("blue", "blue_risk"), ("thermal", "thermal_risk")):
+                    level = data.get(key_name)
+                    if level in RISK_LEVELS:
+                        bucket["risk_seconds"][kind][level] += seconds
+            self._dirty = True
+
+        if time.monotonic() - self._last_save >= self.save_interval:
+            self.save()
+
+    def get(self, resolution, start=None, end=None):
+        """
+        Get summarized buckets in time order.
+
+        Args:
+            resolution (str): "minute", "hour" or "day"
+            start (str): Inclusive lower bound key (e.g. "2025-01-31" or "2025-01-31 08")
+            end (str): Exclusive upper bound key
+
+        Returns:
+            list: (bucket key, summary dict) tuples
+        """
+        with self._lock:
+            items = sorted(self.buckets[resolution].items())
+            return [
+                (key, summarize(bucket))
+                for key, bucket in items
+                if (start is None or key >= start) and (end is None or key < end)
+            ]
+
+    def get_bucket(self, resolution, key):
+        """
+        Get the summary of a single bucket.
+
+        Returns:
+            dict: Summary, or None if the bucket has no samples
+        """
+        with self._lock:
+            bucket = self.buckets[resolution].get(key)
+            return summarize(bucket) if bucket else None
+
+    def total(self, resolution, start=None, end=None):
+        """
+        Combine a range of buckets into one summary.
+
+        Returns:
+            dict: Summary over all matching buckets
+        """
+        combined = new_bucket()
+        with self._lock:
+            for key, bucket in self.buckets[resolution].items():
+                if (start is None or key >= start) and (end is None or key < end):
+                    merge_buckets(combined, bucket)
+        return summarize(combined)
+
+    def prune(self, now=None):
+        """Drop buckets older than their resolution's retention."""
+        now = datetime.fromtimestamp(now if now is not None else time.time())
+        with self._lock:
+            for resolution, days in RETENTION_DAYS.items():
+                if days is None:
+                    continue
+                cutoff = (now - timedelta(days=days)).strftime(RESOLUTIONS[resolution])
+                stale = [key for key in self.buckets[resolution] if key < cutoff]
+                for key in stale:
+                    del self.buckets[resolution][key]
+
+    def save(self):
+        """Persist rollups atomically (write to a temp file, then replace)."""
+        self.prune()
+        with self._lock:
+            if not self._dirty and os.path.exists(self.path):
+                self._last_save = time.monotonic()
+                return
+            payload = json.dumps(self.buckets, separators=(",", ":"))
+            self._dirty = False
+        self._last_save = time.monotonic()
+
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                f.write(payload)
+            os.replace(tmp_path, self.path)
+        except (IOError, OSError) as e:
+            print(f"Error saving rollups: {e}")
+
+    def clear(self):
+        """Remove all aggregates."""
+        with self._lock:
+            self.buckets = {resolution: {} for resolution in RESOLUTIONS}
+            self._dirty = True
+        self.save()
@@ -0,0 +1,333 @@
+"""
+SQLite Storage Module
+Optional SQLite backend for exposure samples.
+Samples are stored with an indexed timestamp, a session ID and indexed risk
+levels, inserted in batches in WAL mode, so time-range and risk queries do not
+need a full scan of the log. Includes a one-shot importer for CSV logs.
+
+Usage (import an existing CSV log):
+    python -m core.sqlite_store data/exposure_log.csv --db data/exposure_log.db
+"""
+
+import argparse
+import csv
+from collections import Counter
+import os
+import sqlite3
+import threading
+import time
+
+from core.instrumentation import stage
+from core.log_writer import LOG_COLUMNS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    id INTEGER PRIMARY KEY,
+    datetime TEXT NOT NULL,
+    session_id TEXT,
+    distance_cm REAL,
+    brightness REAL,
+    blue_score REAL,
+    thermal_score REAL,
+    blue_risk TEXT,
+    thermal_risk TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_samples_datetime ON samples(datetime);
+CREATE INDEX IF NOT EXISTS idx_samples_session ON samples(session_id, datetime);
+CREATE INDEX IF NOT EXISTS idx_samples_blue_risk ON samples(blue_risk, datetime);
+CREATE INDEX IF NOT EXISTS idx_samples_thermal_risk ON samples(thermal_risk, datetime);
+"""
+
+INSERT_SQL = """
+INSERT INTO samples (datetime, session_id, distance_cm, brightness, blue_score,
+                     thermal_score, blue_risk, thermal_risk)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Columns returned by queries, in LOG_COLUMNS order
+SELECT_COLUMNS = "datetime, distance_cm, brightness, blue_score, thermal_score, blue_risk, thermal_risk"
+
+
+def connect(db_path, fsync=False):
+    """
+    Open a database connection in WAL mode, creating the schema if needed.
+
+    Args:
+        db_path (str): Database file path
+        fsync (bool): Use synchronous=FULL instead of NORMAL
+
+    Returns:
+        sqlite3.Connection: Open connection
+    """
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=" + ("FULL" if fsync else "NORMAL"))
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _to_number(value):
+    """Convert a CSV/log field to a float, or None for missing values."""
+    if value is None or value == "" or value == "N/A":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _sample_params(row, session_id):
+    """Convert a row in LOG_COLUMNS order to INSERT parameters."""
+    return (
+        row[0],
+        session_id,
+        _to_number(row[1]),
+        _to_number(row[2]),
+        _to_number(row[3]),
+        _to_number(row[4]),
+        row[5] or None,
+        row[6] or None
+    )
+
+
+class SQLiteLogWriter:
+    """Exposure log writer backed by SQLite (same interface as CsvLogWriter)."""
+
+    def __init__(self, path, session_id=None, flush_rows=50, flush_interval=5.0, fsync=False):
+        """
+        Args:
+            path (str): Database file path
+            session_id (str): Session ID stored with rows logged from now on
+            flush_rows (int): Insert as soon as this many rows are pending
+            flush_interval (float): Insert pending rows at least this often (seconds)
+            fsync (bool): Use synchronous=FULL so every batch is durable
+        """
+        self.path = path
+        self.session_id = session_id
+        self.flush_rows = max(1, int(flush_rows))
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+
+        self._conn = None
+        self._pending = []  # (row, session_id) pairs
+        self._pending_lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closing = False
+        self._thread = None
+
+        self.rows_written = 0
+        self.flushes = 0
+
+    def open(self):
+        """Open the database and start the flusher thread."""
+        if self._conn is not None:
+            return self
+
+        self._conn = connect(self.path, self.fsync)
+        self._closing = False
+        self._thread = threading.Thread(target=self._run, name="SQLiteLogWriter", daemon=True)
+        self._thread.start()
+        return self
+
+    def write_row(self, row):
+        """
+        Queue one row for insertion. Never blocks on disk I/O.
+
+        The row keeps the session ID current at this call, even if the
+        session changes before the row is inserted.
+
+        Args:
+            row (list): Values in LOG_COLUMNS order
+        """
+        with self._pending_lock:
+            self._pending.append((row, self.session_id))
+            if len(self._pending) >= self.flush_rows:
+                self._wake.set()
+
+    def _run(self):
+        """Background flush loop."""
+        while not self._closing:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error logging data: {e}")
+
+    def flush(self):
+        """
+        Insert all pending rows in a single transaction.
+
+        Returns:
+            int: Number of rows written
+        """
+        with self._io_lock:
+            with self._pending_lock:
+                rows, self._pending = self._pending, []
+            if not rows or self._conn is None:
+                return 0
+
+            with stage("log_flush"), self._conn:
+                self._conn.executemany(INSERT_SQL, [_sample_params(r, sid) for r, sid in rows])
+
+            self.rows_written += len(rows)
+            self.flushes += 1
+            return len(rows)
+
+    def clear(self):
+        """Drop pending rows and delete all stored samples."""
+        with self._io_lock:
+            with self._pending_lock:
+                self._pending = []
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM samples")
+
+    def close(self):
+        """Flush pending rows, stop the flusher and close the database."""
+        self._closing = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+        with self._io_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def query_samples(db_path, start=None, end=None, risk=None, session_id=None, limit=None, offset=0):
+    """
+    Query stored samples in time order.
+
+    Args:
+        db_path (str): Database file path
+        start (str): Inclusive lower bound, "YYYY-MM-DD HH:MM:SS" (or a prefix such as a date)
+        end (str): Exclusive upper bound, same format
+        risk (str): Only samples where blue or thermal risk equals this level
+        session_id (str): Only samples of this session
+        limit (int): Maximum number of rows
+        offset (int): Rows to skip (used with limit for paging)
+
+    Returns:
+        list: Tuples in LOG_COLUMNS order
+    """
+    if not os.path.exists(db_path):
+        return []
+
+    where = []
+    params = []
+    if start is not None:
+        where.append("datetime >= ?")
+        params.append(start)
+    if end is not None:
+        where.append("datetime < ?")
+        params.append(end)
+    if session_id is not None:
+        where.append("session_id = ?")
+        params.append(session_id)
+
+    sql = f"SELECT {SELECT_COLUMNS} FROM samples"
+    if risk is not None:
+        # UNION of the two risk indexes instead of an OR that would scan the table
+        clause = " AND ".join(where)
+        base = f"SELECT id FROM samples WHERE {{}} = ?{' AND ' + clause if clause else ''}"
+        sql += f" WHERE id IN ({base.format('blue_risk')} UNION {base.format('thermal_risk')})"
+        params = [risk] + params + [risk] + params
+    elif where:
+        sql += " WHERE " + " AND ".join(where)
+
+    sql += " ORDER BY datetime, id"
+    if limit is not None:
+        sql += " LIMIT ? OFFSET ?"
+        params += [int(limit), int(offset)]
+
+    conn = sqlite3.connect(db_path)
+    try:
+        return [
+            tuple("N/A" if v is None else v for v in row)
+            for row in conn.execute(sql, params)
+        ]
+    finally:
+        conn.close()
+
+
+def count_samples(db_path):
+    """Get the number of stored samples."""
+    if not os.path.exists(db_path):
+        return 0
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM samples").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def import_csv(csv_path, db_path, session_id="imported", batch_size=5000):
+    """
+    Import an existing CSV exposure log into the database.
+
+    Importing is idempotent: rows already stored for the session (same
+    values, counted with multiplicity) are skipped, so running the import
+    again, or after an interrupted import, does not duplicate data.
+
+    Args:
+        csv_path (str): CSV log file (with the LOG_COLUMNS header)
+        db_path (str): Database file path
+        session_id (str): Session ID assigned to imported rows
+        batch_size (int): Rows per insert transaction
+
+    Returns:
+        int: Number of imported rows (skipped rows not included)
+    """
+    conn = connect(db_path)
+    imported = 0
+    try:
+        existing = Counter(conn.execute(
+            "SELECT datetime, session_id, distance_cm, brightness, blue_score, thermal_score, "
+            "blue_risk, thermal_risk FROM samples WHERE session_id = ?",
+            (session_id,)
+        ))
+        with open(csv_path, "r", newline="") as f:
+            reader = csv.DictReader(f)
+            batch = []
+            for row in reader:
+                params = _sample_params([row.get(c) for c in LOG_COLUMNS], session_id)
+                if existing[params] > 0:
+                    existing[params] -= 1
+                    continue
+                batch.append(params)
+                if len(batch) >= batch_size:
+                    with conn:
+                        conn.executemany(INSERT_SQL, batch)
+                    imported += len(batch)
+                    batch = []
+            if batch:
+                with conn:
+                    conn.executemany(INSERT_SQL, batch)
+                imported += len(batch)
+    finally:
+        conn.close()
+    return imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a CSV exposure log into SQLite")
+    parser.add_argument("csv_path", help="CSV log to import")
+    parser.add_argument("--db", default="data/exposure_log.db", help="Database file (default: data/exposure_log.db)")
+    parser.add_argument("--session", default="imported", help="Session ID for the imported rows")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = import_csv(args.csv_path, args.db, args.session)
+    print(f"Imported {count} rows into {args.db} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
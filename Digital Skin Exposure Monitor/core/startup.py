@@ -0,0 +1,128 @@
+"""
+Startup Module
+Staged application startup and startup timing.
+The dashboard is drawn first; opening the camera and loading the face model
+happen afterwards in warm_up(), on the monitor worker thread, while the window
+shows progress. Milestones (first window, camera ready, model ready, first
+sample) are measured from process start and appended to STARTUP_LOG so that
+startup time can be tracked across versions.
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from core.instrumentation import record
+
+# Reference point of all startup times (main.py imports this module first)
+PROCESS_START = time.perf_counter()
+
+# JSON-lines file receiving one record per startup (None = do not write)
+STARTUP_LOG = "data/startup_times.jsonl"
+
+_lock = threading.Lock()
+_marks = {}
+
+
+def mark(name):
+    """
+    Record a startup milestone the first time it is reached.
+
+    The time is also recorded as the instrumentation stage "startup_<name>",
+    so it shows up in /stats and /metrics.
+
+    Args:
+        name (str): Milestone name (e.g. "first_window", "first_sample")
+
+    Returns:
+        bool: True if this call recorded the milestone, False if it was already reached
+    """
+    if name in _marks:
+        return False
+    elapsed_ms = (time.perf_counter() - PROCESS_START) * 1000
+    with _lock:
+        if name in _marks:
+            return False
+        _marks[name] = elapsed_ms
+    record(f"startup_{name}", elapsed_ms)
+    return True
+
+
+def get_startup_times():
+    """
+    Get the startup milestones reached so far.
+
+    Returns:
+        dict: Milestone name -> milliseconds since process start
+    """
+    with _lock:
+        return {name: round(ms, 1) for name, ms in _marks.items()}
+
+
+def report_startup_times(mode="gui"):
+    """
+    Print the startup milestones and append them to STARTUP_LOG.
+
+    Args:
+        mode (str): Run mode recorded with the times ("gui" or "headless")
+    """
+    times = get_startup_times()
+    print("Startup: " + ", ".join(f"{name} {ms:.0f} ms" for name, ms in times.items()))
+    if not STARTUP_LOG:
+        return
+    try:
+        os.makedirs(os.path.dirname(STARTUP_LOG) or ".", exist_ok=True)
+        with open(STARTUP_LOG, "a") as f:
+            f.write(json.dumps({
+                "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "mode": mode,
+                **{f"{name}_ms": ms for name, ms in times.items()}
+            }) + "\n")
+    except Exception as e:
+        print(f"Error writing startup times: {e}")
+
+
+def warm_up(progress=None, sample_rate_hz=None):
+    """
+    Open the camera and load the face model ahead of the first monitoring cycle.
+
+    Call this on the thread that runs detection (the backend is created and
+    used there). Failures are reported but not raised: the monitoring cycle
+    retries both on demand.
+
+    Args:
+        progress (callable): Called with a status text before and after each step
+        sample_rate_hz (float): Background detection rate to configure first
+            (see inputs.distance.set_distance_sampling; None = leave unchanged)
+
+    Returns:
+        bool: True if both steps succeeded
+    """
+    # Imported here: cv2 and the model runtime are the slowest imports of the app
+    from inputs.distance import initialize_camera, get_backend, set_distance_sampling
+
+    if sample_rate_hz is not None:
+        set_distance_sampling(sample_rate_hz)
+
+    def report(text):
+        if progress is not None:
+            progress(text)
+
+    ok = True
+    for label, step, milestone in (
+        ("Opening camera", initialize_camera, "camera_ready"),
+        ("Loading face model", get_backend, "model_ready")
+    ):
+        report(f"{label}...")
+        try:
+            step()
+            mark(milestone)
+        except Exception as e:
+            print(f"{label} failed: {e}")
+            report(f"⚠ {label} failed: {str(e)[:60]}")
+            ok = False
+    if ok:
+        report("Waiting for first sample...")
+    return ok
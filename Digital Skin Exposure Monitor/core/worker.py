@@ -0,0 +1,108 @@
+"""
+Monitor Worker Module
+Runs the monitoring cycle on a background thread so that camera reads,
+face detection, brightness probes and logging never block the Tk main loop.
+Results are handed to the UI through a thread-safe queue.
+"""
+
+import queue
+import threading
+import time
+import traceback
+
+from core.controller import monitor, get_monitoring_interval, set_alert_handler
+from core.startup import warm_up
+
+
+class MonitorWorker(threading.Thread):
+    """Background thread that calls ``monitor()`` every monitoring interval."""
+
+    def __init__(self, results=None, warm_up=True, sample_rate_hz=None):
+        """
+        Args:
+            results (queue.Queue): Queue receiving ``(kind, payload)`` messages.
+                ``kind`` is "data" (monitoring dict), "alert" ((title, message)),
+                "error" (error text) or "status" (startup progress text).
+            warm_up (bool): Open the camera and load the face model before the
+                first cycle, posting progress as "status" messages
+            sample_rate_hz (float): Background detection rate set during the
+                warm-up, on this thread (None = leave unchanged)
+        """
+        super().__init__(name="MonitorWorker", daemon=True)
+        self.results = results if results is not None else queue.Queue()
+        self.warm_up = warm_up
+        self.sample_rate_hz = sample_rate_hz
+        self._stop_event = threading.Event()
+
+    def run(self):
+        # Alerts are raised from this thread, so forward them to the UI
+        # instead of creating Tk windows here
+        set_alert_handler(self._post_alert)
+
+        if self.warm_up:
+            warm_up(self._post_status, self.sample_rate_hz)
+
+        while not self._stop_event.is_set():
+            cycle_start = time.monotonic()
+            try:
+                data = monitor()
+                self.results.put(("data", data))
+            except Exception as e:
+                print(f"Error in update cycle: {e}")
+                traceback.print_exc()
+                # Continue monitoring even if one cycle fails
+                self.results.put(("error", str(e)))
+
+            # Keep a steady cadence regardless of how long the cycle took
+            elapsed = time.monotonic() - cycle_start
+            self._stop_event.wait(max(0.0, get_monitoring_interval() - elapsed))
+
+        set_alert_handler(None)
+
+    def _post_alert(self, title, message):
+        """Queue an alert for the UI thread."""
+        self.results.put(("alert", (title, message)))
+
+    def _post_status(self, text):
+        """Queue a startup progress message for the UI thread."""
+        self.results.put(("status", text))
+
+    def stop(self, timeout=5):
+        """Ask the worker to finish its current cycle and exit."""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+
+def drain_results(results, on_data, on_alert=None, on_error=None, on_status=None, max_items=50):
+    """
+    Process pending worker messages (call from the UI thread).
+
+    Args:
+        results (queue.Queue): Worker result queue
+        on_data (callable): Called with each monitoring data dict
+        on_alert (callable): Called with (title, message) for each alert
+        on_error (callable): Called with error text for failed cycles
+        on_status (callable): Called with startup progress text
+        max_items (int): Upper bound of messages handled per call
+
+    Returns:
+        int: Number of messages processed
+    """
+    processed = 0
+    while processed < max_items:
+        try:
+            kind, payload = results.get_nowait()
+        except queue.Empty:
+            break
+        processed += 1
+
+        if kind == "data":
+            on_data(payload)
+        elif kind == "alert" and on_alert is not None:
+            on_alert(*payload)
+        elif kind == "error" and on_error is not None:
+            on_error(payload)
+        elif kind == "status" and on_status is not None:
+            on_status(payload)
+    return processed
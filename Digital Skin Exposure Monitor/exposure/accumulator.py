@@ -0,0 +1,296 @@
+"""
+Exposure Accumulator Module
+Running blue light and thermal doses of a monitoring session.
+Scoring by session duration × current distance treats the whole session as if
+it had been spent at the latest distance. The accumulator instead integrates
+the exposure rates over the actual sample intervals (trapezoid rule, O(1) per
+sample):
+
+    blue light dose = ∫ Brightness / Distance² dt   (brightness·min / cm²)
+    thermal dose    = ∫ 1 / Distance dt             (min / cm)
+
+No dose accrues while no face is detected. Scores are the doses times the
+calibration constants of exposure/blue_light.py and exposure/thermal.py, so a
+constant exposure scores exactly as before.
+
+The session state and lifetime/daily totals are checkpointed to a JSON file,
+so a restart resumes the session dose without rescanning the log.
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+# Days of daily totals kept in the checkpoint
+DAY_RETENTION = 366
+
+# Per-face doses of tracks not seen for this long are dropped (seconds)
+FACE_EXPIRY = 600
+
+
+def _rates(brightness, distance):
+    """
+    Exposure rates of one sample.
+
+    Returns:
+        tuple: (blue light rate, thermal rate), (0, 0) without a face
+    """
+    if not distance or distance <= 0:
+        return 0.0, 0.0
+    # Same brightness default as blue_light_score (unavailable or 0 counts as 60%)
+    brightness = float(brightness) if brightness else 60.0
+    return brightness / (distance * distance), 1.0 / distance
+
+
+def _new_totals():
+    return {"blue_dose": 0.0, "thermal_dose": 0.0, "exposed_seconds": 0.0}
+
+
+class _Integrator:
+    """Trapezoid integration of the two exposure rates of one viewer."""
+
+    __slots__ = ("blue_dose", "thermal_dose", "exposed_seconds", "last_time", "last_rates")
+
+    def __init__(self):
+        self.blue_dose = 0.0
+        self.thermal_dose = 0.0
+        self.exposed_seconds = 0.0
+        self.last_time = None
+        self.last_rates = (0.0, 0.0)
+
+    def add(self, timestamp, rates, interval):
+        """
+        Integrate up to a new sample.
+
+        The first sample counts for one interval at its own rate; gaps are
+        capped at two intervals (the same rule the rollups use).
+
+        Returns:
+            tuple: (blue dose, thermal dose, exposed seconds) added
+        """
+        if self.last_time is None:
+            seconds = interval
+            blue = rates[0] * seconds
+            thermal = rates[1] * seconds
+            exposed = seconds if rates[1] else 0.0
+        else:
+            seconds = max(0.0, min(timestamp - self.last_time, 2 * interval))
+            blue = (self.last_rates[0] + rates[0]) / 2 * seconds
+            thermal = (self.last_rates[1] + rates[1]) / 2 * seconds
+            exposed = seconds * ((self.last_rates[1] > 0) + (rates[1] > 0)) / 2
+
+        blue /= 60.0
+        thermal /= 60.0
+        self.blue_dose += blue
+        self.thermal_dose += thermal
+        self.exposed_seconds += exposed
+        self.last_time = timestamp if self.last_time is None else max(timestamp, self.last_time)
+        self.last_rates = rates
+        return blue, thermal, exposed
+
+
+class ExposureAccumulator:
+    """Session doses, per-face doses and lifetime/daily totals, with a JSON checkpoint."""
+
+    def __init__(self, path, checkpoint_interval=60.0):
+        """
+        Args:
+            path (str): JSON checkpoint file
+            checkpoint_interval (float): Minimum seconds between automatic checkpoints
+        """
+        self.path = path
+        self.checkpoint_interval = checkpoint_interval
+        self.session_id = None
+        self.session_start = None
+        self.samples = 0
+        self._session = _Integrator()
+        self.faces = {}  # track_id -> _Integrator (not checkpointed: track IDs restart)
+        self.totals = _new_totals()
+        self.days = {}  # "YYYY-MM-DD" -> totals
+        self._lock = threading.Lock()
+        self._last_save = time.monotonic()
+        self._dirty = False
+
+    @property
+    def blue_dose(self):
+        """Blue light dose of the session (brightness·min / cm²)."""
+        return self._session.blue_dose
+
+    @property
+    def thermal_dose(self):
+        """Thermal dose of the session (min / cm)."""
+        return self._session.thermal_dose
+
+    @property
+    def exposed_minutes(self):
+        """Minutes of the session with a face in front of the screen."""
+        return self._session.exposed_seconds / 60.0
+
+    @property
+    def last_time(self):
+        """Time of the last sample (Unix seconds), or None."""
+        return self._session.last_time
+
+    def load(self):
+        """Load the checkpoint (missing or unreadable files start empty)."""
+        if not os.path.exists(self.path):
+            return self
+        try:
+            with open(self.path, "r") as f:
+                stored = json.load(f)
+            session = stored.get("session") or {}
+            with self._lock:
+                self.session_id = session.get("id")
+                self.session_start = session.get("start")
+                self.samples = session.get("samples", 0)
+                self._session = _Integrator()
+                self._session.blue_dose = session.get("blue_dose", 0.0)
+                self._session.thermal_dose = session.get("thermal_dose", 0.0)
+                self._session.exposed_seconds = session.get("exposed_seconds", 0.0)
+                self._session.last_time = session.get("last_time")
+                self._session.last_rates = tuple(session.get("last_rates", (0.0, 0.0)))
+                self.totals = dict(_new_totals(), **stored.get("totals", {}))
+                self.days = stored.get("days", {})
+        except (IOError, ValueError, TypeError) as e:
+            print(f"Error loading exposure checkpoint: {e}")
+        return self
+
+    def can_resume(self, now, max_gap):
+        """
+        Check whether the checkpointed session can be continued.
+
+        Args:
+            now (float): Current time (Unix seconds)
+            max_gap (float): Longest break (seconds) that still continues a session
+
+        Returns:
+            bool: True if a session was sampled within max_gap seconds
+        """
+        last_time = self._session.last_time
+        return self.session_id is not None and last_time is not None and 0 <= now - last_time <= max_gap
+
+    def start_session(self, session_id, start_time):
+        """Start a new session with zero dose (totals are kept)."""
+        with self._lock:
+            self.session_id = session_id
+            self.session_start = start_time
+            self.samples = 0
+            self._session = _Integrator()
+            self.faces = {}
+            self._dirty = True
+        self.save()
+
+    def add_sample(self, timestamp, brightness, distance, interval):
+        """
+        Add a monitoring sample to the session dose.
+
+        Args:
+            timestamp (float): Sample time (Unix seconds)
+            brightness (float): Screen brightness percentage
+            distance (float): Distance in cm, or None without a face
+            interval (float): Monitoring interval in seconds
+        """
+        with self._lock:
+            blue, thermal, exposed = self._session.add(timestamp, _rates(brightness, distance), interval)
+            self.samples += 1
+            day = datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d")
+            day_totals = self.days.get(day)
+            if day_totals is None:
+                day_totals = self.days[day] = _new_totals()
+                self._prune_days(timestamp)
+            for totals in (self.totals, day_totals):
+                totals["blue_dose"] += blue
+                totals["thermal_dose"] += thermal
+                totals["exposed_seconds"] += exposed
+            self._dirty = True
+
+        if time.monotonic() - self._last_save >= self.checkpoint_interval:
+            self.save()
+
+    def add_face_samples(self, timestamp, brightness, faces, interval):
+        """
+        Add a multi-face sample to the per-face doses.
+
+        Args:
+            timestamp (float): Sample time (Unix seconds)
+            brightness (float): Screen brightness percentage
+            faces (list): {"track_id", "distance", ...} dicts
+            interval (float): Monitoring interval in seconds
+
+        Returns:
+            list: (blue dose, thermal dose) per face, in the order of faces
+        """
+        doses = []
+        with self._lock:
+            for face in faces:
+                integrator = self.faces.get(face["track_id"])
+                if integrator is None:
+                    integrator = self.faces[face["track_id"]] = _Integrator()
+                integrator.add(timestamp, _rates(brightness, face["distance"]), interval)
+                doses.append((integrator.blue_dose, integrator.thermal_dose))
+            for track_id in [t for t, i in self.faces.items() if timestamp - i.last_time > FACE_EXPIRY]:
+                del self.faces[track_id]
+        return doses
+
+    def get_totals(self, day=None):
+        """
+        Get accumulated doses across sessions.
+
+        Args:
+            day (str): "YYYY-MM-DD" for one day's totals, None for the lifetime totals
+
+        Returns:
+            dict: blue_dose, thermal_dose and exposed_seconds
+        """
+        with self._lock:
+            totals = self.totals if day is None else self.days.get(day, _new_totals())
+            return dict(totals)
+
+    def _prune_days(self, now):
+        cutoff = (datetime.fromtimestamp(now) - timedelta(days=DAY_RETENTION)).strftime("%Y-%m-%d")
+        for day in [d for d in self.days if d < cutoff]:
+            del self.days[day]
+
+    def clear_totals(self):
+        """Forget the lifetime and daily totals (the session dose is kept)."""
+        with self._lock:
+            self.totals = _new_totals()
+            self.days = {}
+            self._dirty = True
+        self.save()
+
+    def save(self):
+        """Write the checkpoint atomically (write to a temp file, then replace)."""
+        with self._lock:
+            if not self._dirty and os.path.exists(self.path):
+                self._last_save = time.monotonic()
+                return
+            payload = json.dumps({
+                "session": {
+                    "id": self.session_id,
+                    "start": self.session_start,
+                    "samples": self.samples,
+                    "blue_dose": self._session.blue_dose,
+                    "thermal_dose": self._session.thermal_dose,
+                    "exposed_seconds": self._session.exposed_seconds,
+                    "last_time": self._session.last_time,
+                    "last_rates": list(self._session.last_rates)
+                },
+                "totals": self.totals,
+                "days": self.days
+            }, separators=(",", ":"))
+            self._dirty = False
+        self._last_save = time.monotonic()
+
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                f.write(payload)
+            os.replace(tmp_path, self.path)
+        except (IOError, OSError) as e:
+            print(f"Error saving exposure checkpoint: {e}")
@@ -0,0 +1,74 @@
+"""
+Batch Scoring Helpers
+Shared NumPy helpers for the vectorized exposure scoring functions.
+They reproduce the scalar scoring semantics (missing values, rounding and
+risk thresholds) on whole arrays at once.
+"""
+
+import numpy as np
+
+# Risk zone thresholds shared by blue light and thermal scoring
+LOW_RISK_MAX = 30
+MODERATE_RISK_MAX = 70
+
+
+def as_float_array(values):
+    """
+    Convert input to a float array with missing values set to NaN.
+
+    Masked entries of a ``numpy.ma.MaskedArray`` and ``None`` items are
+    treated as missing.
+
+    Args:
+        values: Scalar, sequence, ndarray or masked array
+
+    Returns:
+        numpy.ndarray: Float array
+    """
+    if np.ma.isMaskedArray(values):
+        return np.ma.filled(values.astype(float), np.nan)
+    return np.asarray(values, dtype=float)
+
+
+def round_scores(values):
+    """
+    Round scores to 2 decimals exactly like Python's built-in ``round()``.
+
+    ``np.round`` scales by 100 first, which can pick the other neighbour when
+    the value sits (almost) on a .xx5 boundary. Those rare entries are
+    re-rounded with ``round()`` so batch and scalar results are identical.
+
+    Args:
+        values (numpy.ndarray): Float array
+
+    Returns:
+        numpy.ndarray: Rounded float array
+    """
+    values = np.asarray(values, dtype=float)
+    # At least 1-d: on a 0-d input np.rint returns a scalar the fix-up cannot write to
+    flat = np.atleast_1d(values)
+    scaled = flat * 100
+    rounded = np.rint(scaled) / 100
+
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for index in np.flatnonzero(near_tie):
+        rounded.flat[index] = round(float(flat.flat[index]), 2)
+    return rounded.reshape(values.shape)
+
+
+def classify_risk(scores):
+    """
+    Vectorized risk classification ("LOW", "MODERATE" or "HIGH").
+
+    Args:
+        scores: Array of exposure scores
+
+    Returns:
+        numpy.ndarray: Array of risk level strings
+    """
+    scores = as_float_array(scores)
+    return np.select(
+        [scores <= LOW_RISK_MAX, scores <= MODERATE_RISK_MAX],
+        ["LOW", "MODERATE"],
+        default="HIGH"
+    )
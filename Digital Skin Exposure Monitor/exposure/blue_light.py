@@ -4,6 +4,14 @@ Calculates blue light exposure score based on screen brightness, duration, and d
 Based on research literature on blue light effects on skin health.
 """
 
+import numpy as np
+
+from exposure.batch import as_float_array, round_scores, classify_risk
+
+# Calibration constant (K) based on research literature
+# Adjusted to produce meaningful values: increased from 0.02 to 0.5 for better visibility
+K = 0.5
+
 
 def blue_light_score(brightness, duration_min, distance_cm):
     """
@@ -32,10 +40,6 @@ def blue_light_score(brightness, duration_min, distance_cm):
     if not distance_cm or distance_cm <= 0:
         return 0.0
 
-    # Calibration constant (K) based on research literature
-    # Adjusted to produce meaningful values: increased from 0.02 to 0.5 for better visibility
-    K = 0.5
-    
     # Inverse square law: exposure decreases with distance squared
     # Higher brightness and longer duration increase exposure
     # Add small epsilon to avoid division issues
@@ -45,6 +49,23 @@ def blue_light_score(brightness, duration_min, distance_cm):
     return min(100, round(score, 2))
 
 
+def blue_light_dose_score(dose):
+    """
+    Blue light exposure score of an accumulated dose.
+
+    The dose is the time integral of Brightness / Distance² (in minutes, see
+    exposure/accumulator.py), so a constant exposure scores the same as
+    blue_light_score() over the same duration.
+
+    Args:
+        dose (float): Accumulated brightness·minutes / cm²
+
+    Returns:
+        float: Blue light exposure score (0-100)
+    """
+    return min(100, round(dose * K, 2))
+
+
 def blue_light_risk(score):
     """
     Classify blue light exposure risk level based on score.
@@ -63,6 +84,51 @@ def blue_light_risk(score):
         return "HIGH"
 
 
+def blue_light_score_batch(brightness, duration_min, distance_cm):
+    """
+    Vectorized blue light exposure score for many samples at once.
+
+    Gives exactly the same values as ``blue_light_score`` applied element by
+    element. Missing values may be passed as NaN, None or masked entries:
+    missing/zero brightness defaults to 60%, missing duration counts as 0 and
+    missing or non-positive distance scores 0.
+
+    Args:
+        brightness (array-like): Screen brightness percentages (0-100)
+        duration_min (array-like): Exposure durations in minutes
+        distance_cm (array-like): Distances from screen in centimeters
+
+    Returns:
+        numpy.ndarray: Blue light exposure scores (0-100)
+    """
+    brightness = as_float_array(brightness)
+    duration_min = as_float_array(duration_min)
+    distance_cm = as_float_array(distance_cm)
+
+    brightness = np.where(np.isnan(brightness) | (brightness == 0), 60.0, brightness)
+    duration_min = np.where(np.isnan(duration_min), 0.0, duration_min)
+    valid = distance_cm > 0
+
+    safe_distance = np.where(valid, distance_cm, 1.0)
+    with np.errstate(over="ignore", invalid="ignore"):
+        score = ((brightness * np.maximum(duration_min, 0.1)) / (safe_distance ** 2)) * K
+    score = np.minimum(100, round_scores(score))
+    return np.where(valid, score, 0.0)
+
+
+def blue_light_risk_batch(scores):
+    """
+    Vectorized blue light risk classification.
+
+    Args:
+        scores (array-like): Blue light exposure scores
+
+    Returns:
+        numpy.ndarray: Risk levels ("LOW", "MODERATE", or "HIGH")
+    """
+    return classify_risk(scores)
+
+
 def get_blue_light_recommendations(risk_level):
     """
     Get recommendations based on blue light risk level.
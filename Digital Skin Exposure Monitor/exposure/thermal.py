@@ -4,6 +4,14 @@ Calculates thermal exposure score based on proximity to screen and exposure dura
 Based on research on erythema ab igne (toasted skin syndrome) from device heat.
 """
 
+import numpy as np
+
+from exposure.batch import as_float_array, round_scores, classify_risk
+
+# Calibration constant (M) based on thermal exposure literature
+# Adjusted to produce meaningful values: increased from 1.5 to 3.0 for better visibility
+M = 3.0
+
 
 def thermal_score(duration_min, distance_cm):
     """
@@ -28,10 +36,6 @@ def thermal_score(duration_min, distance_cm):
     if not distance_cm or distance_cm <= 0:
         return 0.0
 
-    # Calibration constant (M) based on thermal exposure literature
-    # Adjusted to produce meaningful values: increased from 1.5 to 3.0 for better visibility
-    M = 3.0
-    
     # Closer distance and longer duration increase thermal exposure
     # Use max(duration_min, 0.1) to ensure some value is calculated even at start
     score = (max(duration_min, 0.1) / distance_cm) * M
@@ -40,6 +44,23 @@ def thermal_score(duration_min, distance_cm):
     return min(100, round(score, 2))
 
 
+def thermal_dose_score(dose):
+    """
+    Thermal exposure score of an accumulated dose.
+
+    The dose is the time integral of 1 / Distance (in minutes, see
+    exposure/accumulator.py), so a constant exposure scores the same as
+    thermal_score() over the same duration.
+
+    Args:
+        dose (float): Accumulated minutes / cm
+
+    Returns:
+        float: Thermal exposure score (0-100)
+    """
+    return min(100, round(dose * M, 2))
+
+
 def thermal_risk(score):
     """
     Classify thermal exposure risk level based on score.
@@ -58,6 +79,47 @@ def thermal_risk(score):
         return "HIGH"
 
 
+def thermal_score_batch(duration_min, distance_cm):
+    """
+    Vectorized thermal exposure score for many samples at once.
+
+    Gives exactly the same values as ``thermal_score`` applied element by
+    element. Missing values may be passed as NaN, None or masked entries:
+    missing duration counts as 0 and missing or non-positive distance scores 0.
+
+    Args:
+        duration_min (array-like): Exposure durations in minutes
+        distance_cm (array-like): Distances from screen in centimeters
+
+    Returns:
+        numpy.ndarray: Thermal exposure scores (0-100)
+    """
+    duration_min = as_float_array(duration_min)
+    distance_cm = as_float_array(distance_cm)
+
+    duration_min = np.where(np.isnan(duration_min), 0.0, duration_min)
+    valid = distance_cm > 0
+
+    safe_distance = np.where(valid, distance_cm, 1.0)
+    with np.errstate(over="ignore", invalid="ignore"):
+        score = (np.maximum(duration_min, 0.1) / safe_distance) * M
+    score = np.minimum(100, round_scores(score))
+    return np.where(valid, score, 0.0)
+
+
+def thermal_risk_batch(scores):
+    """
+    Vectorized thermal risk classification.
+
+    Args:
+        scores (array-like): Thermal exposure scores
+
+    Returns:
+        numpy.ndarray: Risk levels ("LOW", "MODERATE", or "HIGH")
+    """
+    return classify_risk(scores)
+
+
 def get_thermal_recommendations(risk_level):
     """
     Get recommendations based on thermal risk level.
@@ -1,115 +1,296 @@
 """
 Brightness Detection Module
 Cross-platform screen brightness detection for Windows, macOS, and Linux.
+
+The working backend is detected once. On Linux the sysfs backlight files are
+kept open and re-read in place; subprocess-based probes (PowerShell, ioreg,
+xrandr) run on a background thread that refreshes a cached value, so
+get_brightness() never waits on a subprocess.
 """
 
 import subprocess
 import platform
+import threading
 import os
 
+# Default sysfs backlight directory (Linux)
+SYSFS_BACKLIGHT_ROOT = "/sys/class/backlight"
 
-def get_brightness():
-    """
-    Get current screen brightness percentage.
-    
-    Returns:
-        int: Brightness percentage (0-100), or None if unavailable
-    """
-    os_name = platform.system()
+# Backlight devices tried first, in order; any other device under the root follows
+PREFERRED_BACKLIGHTS = ["intel_backlight", "acpi_video0", "radeon_bl0"]
 
-    try:
-        if os_name == "Windows":
-            # Windows: Use WMI to get brightness
-            cmd = "powershell (Get-WmiObject -Namespace root/WMI -Class WmiMonitorBrightness).CurrentBrightness"
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                shell=True,
-                timeout=2
-            )
-            if result.returncode == 0:
-                return int(result.stdout.strip())
-            
-        elif os_name == "Darwin":  # macOS
-            # macOS: Use ioreg to get brightness
-            cmd = 'ioreg -c AppleBacklightDisplay | grep -Eo "\"brightness\"[^}]+" | cut -d ":" -f2'
-            result = subprocess.run(
-                cmd,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=2
-            )
-            if result.returncode == 0:
-                val = result.stdout.strip()
-                if val:
-                    # Brightness is stored as 0-65535, convert to 0-100
-                    # return int(float(val) / 65535 * 100)
-                    return 60
-
-            
-            # Alternative method for macOS
+# Seconds between background refreshes of subprocess-based backends
+SUBPROCESS_REFRESH_INTERVAL = 5.0
+
+
+class BrightnessReader:
+    """Reads screen brightness through a backend detected once at startup."""
+
+    def __init__(self, sysfs_root=SYSFS_BACKLIGHT_ROOT, os_name=None,
+                 refresh_interval=SUBPROCESS_REFRESH_INTERVAL):
+        """
+        Args:
+            sysfs_root (str): Backlight class directory (a fake root can be used in tests)
+            os_name (str): Platform name override ("Linux", "Windows", "Darwin")
+            refresh_interval (float): Seconds between subprocess refreshes
+        """
+        self.sysfs_root = sysfs_root
+        self.os_name = os_name or platform.system()
+        self.refresh_interval = refresh_interval
+
+        # "sysfs", "wmi", "macos", "xrandr" or None when nothing works
+        self.backend = None
+        self.device_path = None
+        self.max_brightness = None
+        self._brightness_file = None
+
+        # Guards the open file and backend state against close() from another
+        # thread; once closed, read() returns None instead of detecting again
+        self._io_lock = threading.Lock()
+        self._closed = False
+
+        # Subprocess backends: value cached by the background thread
+        self._cached = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        self.detect()
+
+    def detect(self):
+        """
+        Detect the working brightness backend.
+
+        Returns:
+            str: Backend name, or None if no backend is available
+        """
+        with self._io_lock:
+            self._closed = False
+            return self._detect()
+
+    def _detect(self):
+        """detect() with the I/O lock held."""
+        self._release()
+        self.backend = None
+
+        if self.os_name == "Linux":
+            if self._open_sysfs():
+                self.backend = "sysfs"
+            else:
+                self.backend = "xrandr"
+        elif self.os_name == "Windows":
+            self.backend = "wmi"
+        elif self.os_name == "Darwin":
+            self.backend = "macos"
+
+        return self.backend
+
+    def _sysfs_candidates(self):
+        """Backlight device directories, preferred devices first."""
+        try:
+            devices = sorted(os.listdir(self.sysfs_root))
+        except OSError:
+            return []
+        ordered = [d for d in PREFERRED_BACKLIGHTS if d in devices]
+        ordered += [d for d in devices if d not in PREFERRED_BACKLIGHTS]
+        return [os.path.join(self.sysfs_root, d) for d in ordered]
+
+    def _open_sysfs(self):
+        """Open the first usable sysfs backlight and cache its max_brightness."""
+        for path in self._sysfs_candidates():
             try:
-                result = subprocess.run(
-                    ['brightness', '-l'],
-                    capture_output=True,
-                    text=True,
-                    timeout=2
-                )
-                if result.returncode == 0:
-                    # Parse output like "display 0: brightness 0.500000"
-                    for line in result.stdout.split('\n'):
-                        if 'brightness' in line.lower():
-                            val = float(line.split()[-1])
-                            return int(val * 100)
-            except FileNotFoundError:
-                pass
-                
-        elif os_name == "Linux":
-            # Linux: Read from sysfs
-            backlight_paths = [
-                "/sys/class/backlight/intel_backlight/",
-                "/sys/class/backlight/acpi_video0/",
-                "/sys/class/backlight/radeon_bl0/",
-            ]
-            
-            for path in backlight_paths:
+                with open(os.path.join(path, "max_brightness"), "r") as f:
+                    max_b = int(f.read().strip())
+                if max_b <= 0:
+                    continue
+
+                brightness_file = open(os.path.join(path, "brightness"), "rb", buffering=0)
                 try:
-                    brightness_file = os.path.join(path, "brightness")
-                    max_brightness_file = os.path.join(path, "max_brightness")
-                    
-                    if os.path.exists(brightness_file) and os.path.exists(max_brightness_file):
-                        with open(brightness_file, 'r') as f:
-                            current = int(f.read().strip())
-                        with open(max_brightness_file, 'r') as f:
-                            max_b = int(f.read().strip())
-                        
-                        if max_b > 0:
-                            return int((current / max_b) * 100)
-                except (IOError, ValueError, FileNotFoundError):
+                    int(brightness_file.read().strip())
+                except ValueError:
+                    brightness_file.close()
                     continue
-            
-            # Try xrandr as fallback
-            try:
-                result = subprocess.run(
-                    ['xrandr', '--verbose'],
-                    capture_output=True,
-                    text=True,
-                    timeout=2
-                )
-                if result.returncode == 0:
-                    # Parse xrandr output for brightness
-                    for line in result.stdout.split('\n'):
-                        if 'Brightness' in line:
-                            val = float(line.split()[-1])
-                            return int(val * 100)
-            except FileNotFoundError:
-                pass
-
-    except (subprocess.TimeoutExpired, ValueError, FileNotFoundError, IOError) as e:
-        print(f"Brightness detection error: {e}")
+
+                self.device_path = path
+                self.max_brightness = max_b
+                self._brightness_file = brightness_file
+                return True
+            except (IOError, ValueError):
+                continue
+        return False
+
+    def read(self):
+        """
+        Get current screen brightness percentage.
+
+        Returns:
+            int: Brightness percentage (0-100), or None if unavailable
+        """
+        with self._io_lock:
+            if self._closed or self.backend is None:
+                return None
+
+            if self.backend == "sysfs":
+                try:
+                    self._brightness_file.seek(0)
+                    current = int(self._brightness_file.read().strip())
+                    return int((current / self.max_brightness) * 100)
+                except (IOError, ValueError) as e:
+                    # Device went away (e.g. driver reload): detect again next time
+                    print(f"Brightness detection error: {e}")
+                    self._detect()
+                    return None
+
+            self._ensure_refresher()
+        with self._lock:
+            return self._cached
+
+    def _ensure_refresher(self):
+        """Start the background refresh thread for subprocess backends."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._refresh_loop, name="BrightnessRefresh", daemon=True)
+            self._thread.start()
+
+    def _refresh_loop(self):
+        """Background loop: query the subprocess backend and cache the result."""
+        while not self._stop_event.is_set():
+            value = self._query_subprocess()
+            with self._lock:
+                self._cached = value
+            self._stop_event.wait(self.refresh_interval)
+
+    def _query_subprocess(self):
+        """Run the subprocess probe of the current backend."""
+        try:
+            if self.backend == "wmi":
+                return _query_windows()
+            if self.backend == "macos":
+                return _query_macos()
+            if self.backend == "xrandr":
+                return _query_xrandr()
+        except (subprocess.TimeoutExpired, ValueError, FileNotFoundError, IOError) as e:
+            print(f"Brightness detection error: {e}")
         return None
 
+    def close(self):
+        """Close open files and stop the background refresh thread (read() then returns None)."""
+        with self._io_lock:
+            self._closed = True
+            self._release()
+
+    def _release(self):
+        """Close the sysfs file and stop the refresh thread (I/O lock held)."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=3)
+            self._thread = None
+        if self._brightness_file is not None:
+            self._brightness_file.close()
+            self._brightness_file = None
+        self.device_path = None
+        self.max_brightness = None
+
+
+def _query_windows():
+    """Windows: Use WMI to get brightness."""
+    cmd = "powershell (Get-WmiObject -Namespace root/WMI -Class WmiMonitorBrightness).CurrentBrightness"
+    result = subprocess.run(
+        cmd,
+        capture_output=True,
+        text=True,
+        shell=True,
+        timeout=2
+    )
+    if result.returncode == 0:
+        return int(result.stdout.strip())
+    return None
+
+
+def _query_macos():
+    """macOS: Use ioreg, then the `brightness` tool, to get brightness."""
+    cmd = 'ioreg -c AppleBacklightDisplay | grep -Eo "\"brightness\"[^}]+" | cut -d ":" -f2'
+    result = subprocess.run(
+        cmd,
+        shell=True,
+        capture_output=True,
+        text=True,
+        timeout=2
+    )
+    if result.returncode == 0:
+        val = result.stdout.strip()
+        if val:
+            # Brightness is stored as 0-65535, convert to 0-100
+            # return int(float(val) / 65535 * 100)
+            return 60
+
+    # Alternative method for macOS
+    try:
+        result = subprocess.run(
+            ['brightness', '-l'],
+            capture_output=True,
+            text=True,
+            timeout=2
+        )
+        if result.returncode == 0:
+            # Parse output like "display 0: brightness 0.500000"
+            for line in result.stdout.split('\n'):
+                if 'brightness' in line.lower():
+                    val = float(line.split()[-1])
+                    return int(val * 100)
+    except FileNotFoundError:
+        pass
+    return None
+
+
+def _query_xrandr():
+    """Linux fallback: parse `xrandr --verbose` for the brightness value."""
+    try:
+        result = subprocess.run(
+            ['xrandr', '--verbose'],
+            capture_output=True,
+            text=True,
+            timeout=2
+        )
+        if result.returncode == 0:
+            # Parse xrandr output for brightness
+            for line in result.stdout.split('\n'):
+                if 'Brightness' in line:
+                    val = float(line.split()[-1])
+                    return int(val * 100)
+    except FileNotFoundError:
+        pass
     return None
 
+
+# Shared reader, created on first use
+_reader = None
+_reader_lock = threading.Lock()
+
+
+def get_reader():
+    """Get the shared BrightnessReader, detecting the backend on first use."""
+    global _reader
+    with _reader_lock:
+        if _reader is None:
+            _reader = BrightnessReader()
+        return _reader
+
+
+def get_brightness():
+    """
+    Get current screen brightness percentage.
+
+    Returns:
+        int: Brightness percentage (0-100), or None if unavailable
+    """
+    return get_reader().read()
+
+
+def release_brightness():
+    """Close the shared reader (open files and background thread)."""
+    global _reader
+    with _reader_lock:
+        if _reader is not None:
+            _reader.close()
+            _reader = None
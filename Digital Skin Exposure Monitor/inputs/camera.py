@@ -0,0 +1,204 @@
+"""
+Camera Capture Module
+Owns the webcam and reads frames on a background thread.
+The distance detector and the dashboard preview both read the latest frame
+from here, so every camera frame is decoded exactly once. Frames come from an
+injectable FrameSource (webcam by default, see inputs/frame_sources.py). A capture interval
+lets consumers that sample rarely (headless mode) skip decoding the frames
+in between.
+"""
+
+import threading
+import time
+from collections import deque
+
+from inputs.frame_sources import CameraSource
+
+# Minimum seconds between decoded frames for new captures (0 = decode every frame)
+CAPTURE_INTERVAL = 0.0
+
+
+class CameraCapture:
+    """Background capture thread with a timestamped latest-frame slot."""
+
+    def __init__(self, device_index=0, buffer_size=0, capture_interval=0.0, source=None):
+        """
+        Args:
+            device_index (int): OpenCV camera index (used when no source is given)
+            buffer_size (int): Number of recent frames to keep in the ring
+                buffer (0 disables the buffer)
+            capture_interval (float): Minimum seconds between decoded frames;
+                frames in between are grabbed (keeping the driver queue fresh) but not decoded
+            source (FrameSource): Where frames come from (default: the webcam)
+        """
+        self.device_index = device_index
+        self.capture_interval = capture_interval
+        self.source = source if source is not None else CameraSource(device_index)
+        self._cap = None
+        self._thread = None
+        self._running = False
+
+        # Latest-frame slot, guarded by the condition's lock
+        self._cond = threading.Condition()
+        self._frame = None
+        self._timestamp = 0.0
+        self._frame_id = 0
+
+        # Optional ring buffer of (frame_id, timestamp, frame)
+        self._buffer = deque(maxlen=buffer_size) if buffer_size > 0 else None
+
+    def start(self):
+        """Open the frame source and start the capture thread."""
+        if self._running:
+            return self
+
+        self._cap = self.source.open()
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="CameraCapture", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        """Capture loop - runs on the background thread."""
+        last_decode = 0.0
+        while self._running:
+            if not self._cap.grab():
+                # Avoid spinning when the device hiccups
+                time.sleep(0.01)
+                continue
+
+            now = time.monotonic()
+            if self.capture_interval and now - last_decode < self.capture_interval:
+                continue
+            ret, frame = self._cap.retrieve()
+            if not ret or frame is None:
+                continue
+            last_decode = now
+
+            timestamp = time.time()
+            with self._cond:
+                self._frame_id += 1
+                self._frame = frame
+                self._timestamp = timestamp
+                if self._buffer is not None:
+                    self._buffer.append((self._frame_id, timestamp, frame))
+                self._cond.notify_all()
+
+    def is_opened(self):
+        """Check whether the capture thread is running on an open device."""
+        return self._running and self._cap is not None and self._cap.is_opened()
+
+    def read_latest(self):
+        """
+        Get the most recent frame without blocking on the camera.
+
+        The returned frame is shared with other consumers and must be treated
+        as read-only.
+
+        Returns:
+            tuple: (frame_id, timestamp, frame), frame is None before the first capture
+        """
+        with self._cond:
+            return self._frame_id, self._timestamp, self._frame
+
+    def wait_for_frame(self, after_id=0, timeout=1.0):
+        """
+        Wait until a frame newer than ``after_id`` is available.
+
+        Args:
+            after_id (int): Last frame ID the caller has already seen
+            timeout (float): Maximum time to wait in seconds
+
+        Returns:
+            tuple: (frame_id, timestamp, frame), frame is None on timeout
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._frame_id > after_id or not self._running, timeout)
+            if self._frame_id > after_id:
+                return self._frame_id, self._timestamp, self._frame
+            return self._frame_id, self._timestamp, None
+
+    def get_buffer(self):
+        """
+        Get the frames currently held in the ring buffer, oldest first.
+
+        Returns:
+            list: (frame_id, timestamp, frame) tuples
+        """
+        with self._cond:
+            return list(self._buffer) if self._buffer is not None else []
+
+    def stop(self):
+        """Stop the capture thread and release the camera."""
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        if self._cap is not None:
+            self._cap.close()
+            self._cap = None
+
+
+# Shared capture instance
+_camera = None
+_camera_lock = threading.Lock()
+
+# Frame source used by the shared capture (None = webcam)
+_frame_source = None
+
+
+def set_frame_source(source):
+    """
+    Use a frame source instead of the webcam (e.g. a video, images or synthetic frames).
+    A running shared capture is stopped; the next start_camera() uses the new source.
+
+    Args:
+        source (FrameSource): Frame source, or None for the webcam
+    """
+    global _frame_source
+    _frame_source = source
+    stop_camera()
+
+
+def set_capture_interval(seconds):
+    """
+    Set the minimum time between decoded frames (applies to the running capture too).
+
+    Args:
+        seconds (float): 0 decodes every frame
+    """
+    global CAPTURE_INTERVAL
+    CAPTURE_INTERVAL = max(0.0, float(seconds))
+    if _camera is not None:
+        _camera.capture_interval = CAPTURE_INTERVAL
+
+
+def start_camera(device_index=0, buffer_size=0):
+    """
+    Start the shared camera capture (no-op if already running).
+
+    Returns:
+        CameraCapture: The shared capture instance
+    """
+    global _camera
+    with _camera_lock:
+        if _camera is None:
+            _camera = CameraCapture(device_index, buffer_size, CAPTURE_INTERVAL, _frame_source).start()
+        return _camera
+
+
+def get_camera():
+    """Get the shared camera capture, or None if it has not been started."""
+    return _camera
+
+
+def stop_camera():
+    """Stop the shared camera capture."""
+    global _camera
+    with _camera_lock:
+        if _camera is not None:
+            _camera.stop()
+            _camera = None
@@ -2,75 +2,343 @@
 Distance Detection Module
 Uses MediaPipe Face Mesh to calculate distance from webcam to user's face.
 Based on inter-pupillary distance (IPD) measurement.
+The eye locator is pluggable (see inputs/distance_backends.py).
+In multi-face mode every face in the frame is measured in one pass and given a
+stable track ID (see inputs/face_tracker.py).
+Distances are smoothed by a temporal filter (see inputs/distance_filter.py).
+With background sampling on, detection runs at a fixed rate on its own thread
+and get_distance() returns the filter's prediction for the current time.
 """
 
-import cv2
-import mediapipe as mp
 import math
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from inputs.camera import start_camera, get_camera, stop_camera
+from inputs.distance_backends import create_backend, available_backends, REAL_EYE_DISTANCE_CM
+from inputs.face_tracker import FaceTracker
+from inputs.distance_filter import create_filter
+from core.instrumentation import stage, count
 
 # Physical constants
-REAL_EYE_DISTANCE_CM = 6.3  # Average inter-pupillary distance in cm
 FOCAL_LENGTH = 650  # Estimated focal length in pixels
 
-# MediaPipe face mesh landmark indices for eyes
-LEFT_EYE_INDEX = 133
-RIGHT_EYE_INDEX = 362
+# Eye locator used for distance estimation (see available_backends())
+DISTANCE_BACKEND = "facemesh_refined"
 
-# Initialize MediaPipe Face Mesh
-mp_face_mesh = mp.solutions.face_mesh
-face_mesh = mp_face_mesh.FaceMesh(
-    static_image_mode=False,
-    max_num_faces=1,
-    refine_landmarks=True,
-    min_detection_confidence=0.5,
-    min_tracking_confidence=0.5
-)
+# ROI tracking: run Face Mesh on a (downscaled) crop around the last face.
+# Off by default: crops go to a static-image graph that runs the face detector
+# every time, which the video-mode graph skips; compare both with
+# benchmarks/distance_backends.py --roi before enabling it
+ROI_TRACKING = False
+ROI_PADDING = 0.4  # Margin added on each side of the face box (fraction of box size)
+ROI_TARGET_SIZE = 256  # Longer side of the crop after downscaling (None = keep size)
 
-# Initialize webcam
-cap = None
+# Motion gating: reuse the previous distance while the scene has not changed
+MOTION_GATING = True
+MOTION_THRESHOLD = 2.0  # Mean absolute gray-level difference (0-255) of the thumbnails
+MOTION_MAX_AGE = 30.0  # Seconds before a fresh inference is forced anyway
+MOTION_THUMBNAIL_SIZE = (32, 24)  # (width, height) of the change-detection thumbnail
 
-def initialize_camera():
-    """Initialize the webcam."""
-    global cap
-    if cap is None:
-        cap = cv2.VideoCapture(0)
-        if not cap.isOpened():
-            raise RuntimeError("Could not open webcam")
-    return cap
+# Multi-face mode: measure every face in frame instead of only the first one
+MULTI_FACE = False
+MAX_FACES = 4
 
-def get_distance():
+# Temporal filter of the distance stream (see available_filters()); "none"
+# keeps the logged and scored distances the raw per-cycle measurements
+DISTANCE_FILTER = "none"
+FILTER_MAX_HOLD = 1.0  # Seconds a lost face keeps its predicted distance
+
+# Background sampling: detect this many times per second on a separate thread
+# (0 = detect on every get_distance() call)
+SAMPLE_RATE_HZ = 0
+
+# Last camera frame the detector has processed
+_last_frame_id = 0
+
+# Motion gate state: thumbnail, result, key (estimator and detection settings)
+# and time of the last inferred frame
+_gate_thumbnail = None
+_gate_result = None
+_gate_key = None
+_gate_time = 0.0
+_gate_hits = 0
+_gate_misses = 0
+_gate_last_diff = None
+
+# Active backend instance (created on first use)
+_backend = None
+
+# Track IDs for multi-face mode
+_tracker = FaceTracker()
+
+# Distance filters (single face, and per track ID in multi-face mode) and the
+# faces of the last sample; the lock guards them against the preview thread
+_filter_lock = threading.Lock()
+_distance_filter = None
+_face_filters = {}
+_sampled_faces = []
+# (distance, timestamp) of the last detection before filtering (distance None =
+# no face); answers get_predicted_distance() when no filter is set
+_last_measurement = (None, None)
+
+# Background sampler thread (SAMPLE_RATE_HZ > 0)
+_sampler = None
+
+
+def get_distance_backend_name():
+    """Get the configured distance backend name."""
+    return DISTANCE_BACKEND
+
+
+def set_distance_backend(name):
     """
-    Calculate distance from webcam to face using face landmark detection.
-    
+    Select the distance backend.
+
+    Args:
+        name (str): One of available_backends()
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    global DISTANCE_BACKEND
+    if name not in available_backends():
+        raise ValueError(f"Unknown distance backend: {name}")
+    # The switch itself happens in get_backend(), on the thread that runs detection
+    DISTANCE_BACKEND = name
+
+
+def get_backend():
+    """Get the active distance backend, creating it on first use."""
+    global _backend
+    if _backend is not None and _backend.name != DISTANCE_BACKEND:
+        _backend.close()
+        _backend = None
+    if _backend is None:
+        _backend = create_backend(DISTANCE_BACKEND)
+        _apply_roi_settings(_backend)
+        _tracker.reset()
+        # The gated result came from the previous backend
+        _reset_motion_gate()
+
+    max_faces = MAX_FACES if MULTI_FACE else 1
+    if _backend.max_faces != max_faces:
+        _backend.set_max_faces(max_faces)
+    return _backend
+
+
+def _apply_roi_settings(backend):
+    """Push the ROI tracking configuration to backends that support it."""
+    if hasattr(backend, "roi_tracking"):
+        backend.roi_tracking = ROI_TRACKING
+        backend.roi_padding = ROI_PADDING
+        backend.roi_target_size = ROI_TARGET_SIZE
+        backend.reset()
+
+
+def set_roi_tracking(enabled, padding=None, target_size=None):
+    """
+    Configure ROI-cropped inference.
+
+    Args:
+        enabled (bool): Crop to the previous face instead of processing full frames
+        padding (float): Margin around the face box as a fraction of its size
+        target_size (int): Downscale crops so their longer side is at most this
+    """
+    global ROI_TRACKING, ROI_PADDING, ROI_TARGET_SIZE
+    ROI_TRACKING = bool(enabled)
+    if padding is not None:
+        ROI_PADDING = max(0.0, float(padding))
+    if target_size is not None:
+        ROI_TARGET_SIZE = int(target_size) if target_size else None
+    if _backend is not None:
+        _apply_roi_settings(_backend)
+
+
+def set_multi_face(enabled, max_faces=None):
+    """
+    Configure multi-face mode.
+
+    Args:
+        enabled (bool): Measure all faces in frame (see get_face_distances())
+        max_faces (int): Maximum number of faces detected per frame
+    """
+    global MULTI_FACE, MAX_FACES
+    MULTI_FACE = bool(enabled)
+    if max_faces is not None:
+        MAX_FACES = max(1, int(max_faces))
+    # The backend picks up the new face limit in get_backend(), on the detection thread
+
+
+def is_multi_face():
+    """Check whether multi-face mode is enabled."""
+    return MULTI_FACE
+
+
+def get_distance_filter_name():
+    """Get the configured distance filter name."""
+    return DISTANCE_FILTER
+
+
+def set_distance_filter(name, max_hold=None):
+    """
+    Select the temporal distance filter.
+
+    Args:
+        name (str): One of available_filters() ("none" = raw distances)
+        max_hold (float): Seconds a lost face keeps its predicted distance
+
+    Raises:
+        ValueError: If the filter name is unknown
+    """
+    global DISTANCE_FILTER, FILTER_MAX_HOLD, _distance_filter, _last_measurement
+    create_filter(name)  # validates the name
+    with _filter_lock:
+        DISTANCE_FILTER = name
+        if max_hold is not None:
+            FILTER_MAX_HOLD = max(0.0, float(max_hold))
+        _distance_filter = None
+        _face_filters.clear()
+        _last_measurement = (None, None)
+
+
+def set_distance_sampling(rate_hz):
+    """
+    Configure background sampling.
+
+    Args:
+        rate_hz (float): Detections per second on the sampler thread (0 = off,
+            detect on every get_distance() call)
+    """
+    global SAMPLE_RATE_HZ
+    SAMPLE_RATE_HZ = max(0.0, float(rate_hz))
+    if _sampler is not None:
+        if SAMPLE_RATE_HZ:
+            _sampler.rate_hz = SAMPLE_RATE_HZ
+        else:
+            _stop_sampler()
+
+
+def set_motion_gating(enabled, threshold=None, max_age=None):
+    """
+    Configure motion-gated inference.
+
+    Args:
+        enabled (bool): Skip inference when the frame has not changed
+        threshold (float): Mean thumbnail difference below which a frame counts as unchanged
+        max_age (float): Seconds after which inference is forced even without motion
+    """
+    global MOTION_GATING, MOTION_THRESHOLD, MOTION_MAX_AGE
+    MOTION_GATING = bool(enabled)
+    if threshold is not None:
+        MOTION_THRESHOLD = max(0.0, float(threshold))
+    if max_age is not None:
+        MOTION_MAX_AGE = max(0.0, float(max_age))
+    _reset_motion_gate()
+
+
+def _reset_motion_gate():
+    """Forget the last inferred frame so the next frame runs inference."""
+    global _gate_thumbnail, _gate_result
+    _gate_thumbnail = None
+    _gate_result = None
+
+
+def get_motion_gate_stats():
+    """
+    Get motion gate counters for tuning the threshold.
+
     Returns:
-        float: Distance in centimeters, or None if face not detected
+        dict: Hits (inference skipped), misses (inference run), hit rate and
+            the last measured thumbnail difference
     """
-    global cap
-    
-    if cap is None:
-        cap = initialize_camera()
-    
-    ret, frame = cap.read()
-    if not ret:
-        return None
+    total = _gate_hits + _gate_misses
+    return {
+        "hits": _gate_hits,
+        "misses": _gate_misses,
+        "hit_rate": round(_gate_hits / total, 4) if total else 0.0,
+        "last_diff": round(_gate_last_diff, 3) if _gate_last_diff is not None else None
+    }
 
-    # Convert BGR to RGB for MediaPipe
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = face_mesh.process(rgb)
 
-    # Check if face detected
-    if not results.multi_face_landmarks:
-        return None
+def reset_motion_gate_stats():
+    """Reset the motion gate hit/miss counters."""
+    global _gate_hits, _gate_misses
+    _gate_hits = 0
+    _gate_misses = 0
+
+
+def _thumbnail(frame):
+    """Tiny grayscale version of the frame used for change detection."""
+    small = cv2.resize(frame, MOTION_THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+
+def _gated(frame, estimator):
+    """
+    Run an estimator on a camera frame, reusing the last result when the scene is unchanged.
+
+    Args:
+        frame: BGR frame
+        estimator (callable): distance_from_frame or faces_from_frame
+    """
+    global _gate_thumbnail, _gate_result, _gate_key, _gate_time
+    global _gate_hits, _gate_misses, _gate_last_diff
+
+    if not MOTION_GATING:
+        with stage("face_detection"):
+            return estimator(frame)
+
+    with stage("motion_gate"):
+        thumbnail = _thumbnail(frame)
+        now = time.monotonic()
+        # A result of another backend or face limit is not reused, even on an unchanged
+        # frame: a hit never reaches get_backend(), which applies those settings
+        key = (estimator, DISTANCE_BACKEND, MULTI_FACE, MAX_FACES)
 
-    # Get face landmarks
-    landmarks = results.multi_face_landmarks[0].landmark
-    h, w, _ = frame.shape
+        if _gate_thumbnail is not None and _gate_key == key:
+            _gate_last_diff = float(cv2.absdiff(thumbnail, _gate_thumbnail).mean())
+            if _gate_last_diff < MOTION_THRESHOLD and (now - _gate_time) < MOTION_MAX_AGE:
+                _gate_hits += 1
+                count("motion_gate_hits")
+                return _gate_result
+
+    _gate_misses += 1
+    with stage("face_detection"):
+        _gate_result = estimator(frame)
+    _gate_key = key
+    _gate_thumbnail = thumbnail
+    _gate_time = now
+    return _gate_result
+
+
+def get_backend_latency():
+    """
+    Get latency statistics of the active backend.
+
+    Returns:
+        dict: Backend name, number of calls, last and mean latency in ms
+    """
+    return get_backend().get_latency_stats()
+
+
+def distance_from_frame(frame):
+    """
+    Calculate distance to the face in a single BGR frame.
+
+    Returns:
+        float: Distance in centimeters, or None if face not detected
+    """
+    backend = get_backend()
 
     # Get eye coordinates
-    x1 = int(landmarks[LEFT_EYE_INDEX].x * w)
-    y1 = int(landmarks[LEFT_EYE_INDEX].y * h)
-    x2 = int(landmarks[RIGHT_EYE_INDEX].x * w)
-    y2 = int(landmarks[RIGHT_EYE_INDEX].y * h)
+    eyes = backend.locate_eyes(frame)
+    if eyes is None:
+        return None
+    (x1, y1), (x2, y2) = eyes
 
     # Calculate pixel distance between eyes
     pixel_dist = math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
@@ -79,14 +347,247 @@ def get_distance():
         return None
 
     # Calculate distance using focal length formula: distance = (real_size * focal_length) / pixel_size
-    distance_cm = (REAL_EYE_DISTANCE_CM * FOCAL_LENGTH) / pixel_dist
+    distance_cm = (backend.reference_span_cm * FOCAL_LENGTH) / pixel_dist
     
     return round(distance_cm, 2)
 
+
+def faces_from_frame(frame):
+    """
+    Calculate the distance of every face in a single BGR frame.
+
+    All faces come from one detector pass; distances are computed for all of
+    them at once.
+
+    Returns:
+        list: {"track_id", "distance", "eyes"} dicts ordered by track ID
+    """
+    backend = get_backend()
+    eye_pairs = [eyes for eyes in backend.locate_all_eyes(frame) if eyes[0] != eyes[1]]
+    track_ids = _tracker.update(eye_pairs)
+    if not eye_pairs:
+        return []
+
+    points = np.asarray(eye_pairs, dtype=np.float64).reshape(-1, 2, 2)
+    pixel_dist = np.hypot(*(points[:, 1] - points[:, 0]).T)
+    distances = np.round((backend.reference_span_cm * FOCAL_LENGTH) / pixel_dist, 2)
+
+    faces = [
+        {"track_id": track_id, "distance": float(distance), "eyes": eyes}
+        for track_id, distance, eyes in zip(track_ids, distances, eye_pairs)
+    ]
+    return sorted(faces, key=lambda face: face["track_id"])
+
+
+def initialize_camera():
+    """Initialize the webcam (starts the shared capture thread)."""
+    return start_camera(0)
+
+def _latest_frame():
+    """
+    Latest camera frame (waits briefly only if nothing has been captured yet).
+
+    Returns:
+        tuple: (frame, capture time), frame is None if no frame arrived
+    """
+    global _last_frame_id
+
+    camera = get_camera()
+    if camera is None:
+        camera = initialize_camera()
+
+    frame_id, timestamp, frame = camera.read_latest()
+    if frame is None:
+        # Nothing captured yet (a restarted camera counts frame IDs from 0 again)
+        frame_id, timestamp, frame = camera.wait_for_frame(0, timeout=1.0)
+        if frame is None:
+            return None, None
+    _last_frame_id = frame_id
+    return frame, timestamp
+
+
+def _filter_distance(distance, timestamp):
+    """Feed a measured distance (None = no face) to the filter and return the filtered value."""
+    global _distance_filter, _last_measurement
+    with _filter_lock:
+        _last_measurement = (distance, timestamp)
+        if _distance_filter is None:
+            _distance_filter = create_filter(DISTANCE_FILTER)
+            if _distance_filter is None:
+                return distance
+        if distance is not None:
+            return round(_distance_filter.update(timestamp, distance), 2)
+        return _hold(_distance_filter, timestamp)
+
+
+def _hold(distance_filter, timestamp):
+    """Predicted distance of a face that was not detected, until FILTER_MAX_HOLD has passed."""
+    if distance_filter.last_time is None or timestamp - distance_filter.last_time > FILTER_MAX_HOLD:
+        distance_filter.reset()
+        return None
+    return round(distance_filter.predict(timestamp), 2)
+
+
+def _filter_faces(faces, timestamp):
+    """Filter the distance of every tracked face; filters of faces gone too long are dropped."""
+    global _last_measurement
+    with _filter_lock:
+        nearest = min((face["distance"] for face in faces), default=None)
+        _last_measurement = (nearest, timestamp)
+    if DISTANCE_FILTER == "none":
+        return faces
+    with _filter_lock:
+        seen = set()
+        for face in faces:
+            track_id = face["track_id"]
+            seen.add(track_id)
+            distance_filter = _face_filters.get(track_id)
+            if distance_filter is None:
+                distance_filter = _face_filters[track_id] = create_filter(DISTANCE_FILTER)
+            face["distance"] = round(distance_filter.update(timestamp, face["distance"]), 2)
+        for track_id in list(_face_filters):
+            if track_id not in seen and timestamp - _face_filters[track_id].last_time > FILTER_MAX_HOLD:
+                del _face_filters[track_id]
+    return faces
+
+
+def get_predicted_distance(timestamp=None):
+    """
+    Predict the distance at a given time from the filtered detections.
+
+    Cheap enough to call for every preview frame; detection itself may run
+    much less often. In multi-face mode this is the nearest tracked face.
+
+    Args:
+        timestamp (float): Time (time.time() scale, e.g. a frame's capture time);
+            None = now
+
+    Returns:
+        float: Distance in cm, or None without a face detected in the last
+            FILTER_MAX_HOLD seconds. The "none" filter cannot predict, so it
+            returns the last raw detection while it is not older than that.
+    """
+    if timestamp is None:
+        timestamp = time.time()
+    with _filter_lock:
+        if DISTANCE_FILTER == "none":
+            distance, measured = _last_measurement
+            if measured is None or abs(timestamp - measured) > FILTER_MAX_HOLD:
+                return None
+            return distance
+        filters = list(_face_filters.values()) if MULTI_FACE else [_distance_filter]
+        predictions = [
+            f.predict(timestamp) for f in filters
+            if f is not None and f.last_time is not None and timestamp - f.last_time <= FILTER_MAX_HOLD
+        ]
+    return round(min(predictions), 2) if predictions else None
+
+
+def _measure_distance():
+    """Detect on the latest frame and return the filtered distance (None if no face)."""
+    with stage("camera_read"):
+        frame, timestamp = _latest_frame()
+    if frame is None:
+        count("camera_no_frame")
+        return None
+    return _filter_distance(_gated(frame, distance_from_frame), timestamp)
+
+
+def _measure_faces():
+    """Detect all faces on the latest frame and return them with filtered distances."""
+    with stage("camera_read"):
+        frame, timestamp = _latest_frame()
+    if frame is None:
+        count("camera_no_frame")
+        return []
+    # Copies: the gate may hand out the same cached list again
+    faces = [dict(face) for face in _gated(frame, faces_from_frame)]
+    return _filter_faces(faces, timestamp)
+
+
+class DistanceSampler(threading.Thread):
+    """Detects at a fixed rate on the latest camera frame, feeding the distance filters."""
+
+    def __init__(self, rate_hz):
+        super().__init__(name="DistanceSampler", daemon=True)
+        self.rate_hz = rate_hz
+        self.first_sample = threading.Event()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        global _sampled_faces
+        while not self._stop_event.is_set():
+            cycle_start = time.monotonic()
+            try:
+                with stage("distance_sample"):
+                    if MULTI_FACE:
+                        _sampled_faces = _measure_faces()
+                    else:
+                        _measure_distance()
+            except Exception as e:
+                print(f"Error sampling distance: {e}")
+            # Also after a failure, so callers do not keep waiting for a sample
+            self.first_sample.set()
+            elapsed = time.monotonic() - cycle_start
+            self._stop_event.wait(max(0.0, 1.0 / self.rate_hz - elapsed))
+
+    def stop(self, timeout=2):
+        self._stop_event.set()
+        if self.is_alive() and self is not threading.current_thread():
+            self.join(timeout)
+
+
+def _ensure_sampler():
+    """Start the background sampler on first use and wait for its first detection."""
+    global _sampler
+    if _sampler is None:
+        _sampler = DistanceSampler(SAMPLE_RATE_HZ)
+        _sampler.start()
+    _sampler.first_sample.wait(timeout=2.0)
+
+
+def _stop_sampler():
+    global _sampler
+    if _sampler is not None:
+        _sampler.stop()
+        _sampler = None
+
+
+def get_distance():
+    """
+    Calculate distance from webcam to face using face landmark detection.
+    
+    Returns:
+        float: Filtered distance in centimeters, or None if face not detected
+    """
+    if SAMPLE_RATE_HZ:
+        _ensure_sampler()
+        return get_predicted_distance()
+    return _measure_distance()
+
+
+def get_face_distances():
+    """
+    Calculate the distance of every face in front of the webcam (multi-face mode).
+
+    Returns:
+        list: {"track_id", "distance", "eyes"} dicts, empty if no face is detected
+    """
+    if SAMPLE_RATE_HZ:
+        _ensure_sampler()
+        now = time.time()
+        faces = []
+        with _filter_lock:
+            for face in _sampled_faces:
+                distance_filter = _face_filters.get(face["track_id"])
+                if distance_filter is not None:
+                    face = dict(face, distance=round(distance_filter.predict(now), 2))
+                faces.append(face)
+        return faces
+    return _measure_faces()
+
 def release_camera():
     """Release the webcam resource."""
-    global cap
-    if cap is not None:
-        cap.release()
-        cap = None
+    _stop_sampler()
+    stop_camera()
 
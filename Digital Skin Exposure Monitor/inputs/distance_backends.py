@@ -0,0 +1,410 @@
+"""
+Distance Backends Module
+Interchangeable face/eye locators used for distance estimation.
+Every backend finds two eye reference points in a frame and reports its own
+latency, so cheaper detectors can be swapped in for the full refined Face Mesh.
+Backends can also return the eyes of every face in the frame from one pass.
+"""
+
+import os
+import time
+
+import cv2
+
+from core.instrumentation import stage
+from inputs.face_roi import crop_region, to_frame_points, padded_box
+
+# Average inter-pupillary distance in cm (reference span of the Face Mesh backends)
+REAL_EYE_DISTANCE_CM = 6.3
+
+# Eye-center keypoints are further apart in the image than the inner eye corners
+# (landmarks 133/362) the Face Mesh calibration is based on. Average IPD (6.3 cm)
+# over average inner canthal distance (3.2 cm) keeps all backends on one calibration.
+EYE_CENTER_SPAN_RATIO = 1.95
+
+
+class DistanceBackend:
+    """Base class for eye locators."""
+
+    name = "base"
+    # Real-world span (cm) of the two reference points this backend returns
+    reference_span_cm = REAL_EYE_DISTANCE_CM
+
+    def __init__(self):
+        self.calls = 0
+        self.total_latency_ms = 0.0
+        self.last_latency_ms = 0.0
+        self.max_faces = 1  # Faces returned by locate_all_eyes()
+
+    def _timed(self, locate, frame):
+        """Run a locate function and record its latency."""
+        start = time.perf_counter()
+        try:
+            return locate(frame)
+        finally:
+            self.last_latency_ms = (time.perf_counter() - start) * 1000
+            self.total_latency_ms += self.last_latency_ms
+            self.calls += 1
+
+    def locate_eyes(self, frame):
+        """
+        Locate the two eye reference points in a BGR frame.
+
+        Returns:
+            tuple: ((x1, y1), (x2, y2)) in full-frame pixels, or None if no face
+                (integers, except for sub-pixel backends such as "marker")
+        """
+        return self._timed(self._locate_eyes, frame)
+
+    def locate_all_eyes(self, frame):
+        """
+        Locate the eye reference points of up to max_faces faces in one pass.
+
+        Returns:
+            list: ((x1, y1), (x2, y2)) tuples, one per detected face
+        """
+        return self._timed(self._locate_all_eyes, frame)[:self.max_faces]
+
+    def _locate_eyes(self, frame):
+        raise NotImplementedError
+
+    def _locate_all_eyes(self, frame):
+        # Single-face fallback for backends without a multi-face implementation
+        eyes = self._locate_eyes(frame)
+        return [eyes] if eyes is not None else []
+
+    def set_max_faces(self, max_faces):
+        """Set how many faces locate_all_eyes() returns."""
+        self.max_faces = max(1, int(max_faces))
+
+    def get_latency_stats(self):
+        """
+        Get latency statistics for this backend.
+
+        Returns:
+            dict: Backend name, number of calls, last and mean latency in ms
+        """
+        mean = self.total_latency_ms / self.calls if self.calls else 0.0
+        return {
+            "backend": self.name,
+            "calls": self.calls,
+            "last_ms": round(self.last_latency_ms, 3),
+            "mean_ms": round(mean, 3)
+        }
+
+    def reset(self):
+        """Forget any tracking state (e.g. after the camera changed)."""
+
+    def close(self):
+        """Release model resources."""
+
+
+class FaceMeshBackend(DistanceBackend):
+    """
+    MediaPipe Face Mesh (landmarks 133/362) with ROI-cropped tracking.
+
+    Full frames go to a video-mode graph (MediaPipe tracks the face between
+    frames itself). ROI crops go to a separate static-image graph: their
+    coordinates jump with the crop, which would confuse MediaPipe's tracker.
+    """
+
+    # MediaPipe face mesh landmark indices for eyes
+    LEFT_EYE_INDEX = 133
+    RIGHT_EYE_INDEX = 362
+
+    def __init__(self, refine_landmarks=True, roi_tracking=False, roi_padding=0.4, roi_target_size=256):
+        super().__init__()
+        self.name = "facemesh_refined" if refine_landmarks else "facemesh"
+        self.refine_landmarks = refine_landmarks
+        self.face_mesh = self._create_face_mesh(1)
+        self.crop_face_mesh = None  # Static-image graph for ROI crops, created on first use
+
+        # ROI tracking: run Face Mesh on a (downscaled) crop around the last face
+        self.roi_tracking = roi_tracking
+        self.roi_padding = roi_padding  # Margin on each side (fraction of face box size)
+        self.roi_target_size = roi_target_size  # Longer side of the crop after downscaling
+        self._last_face_box = None  # (x0, y0, x1, y1) in full-frame pixels
+
+    def _create_face_mesh(self, max_faces, static_image_mode=False):
+        import mediapipe as mp
+
+        return mp.solutions.face_mesh.FaceMesh(
+            static_image_mode=static_image_mode,
+            max_num_faces=max_faces,
+            refine_landmarks=self.refine_landmarks,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+
+    def set_max_faces(self, max_faces):
+        max_faces = max(1, int(max_faces))
+        if max_faces != self.max_faces:
+            # max_num_faces is fixed per Face Mesh graph
+            self.face_mesh.close()
+            self.face_mesh = self._create_face_mesh(max_faces)
+            self.max_faces = max_faces
+            self.reset()
+
+    def _run_face_mesh(self, frame, box=None):
+        """
+        Run Face Mesh on the full frame or on a (downscaled) ROI crop.
+
+        Returns:
+            list: Landmark (x, y) positions in full-frame pixels, or None if no face
+        """
+        faces = self._run_face_mesh_all(frame, box)
+        return faces[0] if faces else None
+
+    def _run_face_mesh_all(self, frame, box=None):
+        """
+        Run Face Mesh and keep every detected face.
+
+        Args:
+            frame: BGR frame
+            box (tuple): ROI crop (x0, y0, x1, y1), None for the full frame
+
+        Returns:
+            list: One list of landmark (x, y) positions (full-frame pixels) per face
+        """
+        if box is None:
+            h, w = frame.shape[:2]
+            box = (0, 0, w, h)
+            image = frame
+            face_mesh = self.face_mesh
+        else:
+            image = crop_region(frame, box, self.roi_target_size)
+            if self.crop_face_mesh is None:
+                self.crop_face_mesh = self._create_face_mesh(1, static_image_mode=True)
+            face_mesh = self.crop_face_mesh
+
+        # Convert BGR to RGB for MediaPipe
+        with stage("color_convert"):
+            rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        with stage("facemesh"):
+            results = face_mesh.process(rgb)
+
+        if not results.multi_face_landmarks:
+            return []
+        return [to_frame_points(face.landmark, box) for face in results.multi_face_landmarks]
+
+    def detect_landmarks(self, frame):
+        """
+        Detect face landmarks, cropping to the previous face when tracking.
+        Falls back to full-frame detection when tracking is lost.
+        """
+        h, w = frame.shape[:2]
+
+        points = None
+        if self.roi_tracking and self._last_face_box is not None:
+            points = self._run_face_mesh(frame, self._last_face_box)
+        if points is None:
+            points = self._run_face_mesh(frame)
+
+        tracked = points and self.roi_tracking
+        self._last_face_box = padded_box(points, w, h, self.roi_padding) if tracked else None
+        return points
+
+    def _eyes_from_landmarks(self, landmarks):
+        left = landmarks[self.LEFT_EYE_INDEX]
+        right = landmarks[self.RIGHT_EYE_INDEX]
+        return (int(left[0]), int(left[1])), (int(right[0]), int(right[1]))
+
+    def _locate_eyes(self, frame):
+        landmarks = self.detect_landmarks(frame)
+        if not landmarks:
+            return None
+        return self._eyes_from_landmarks(landmarks)
+
+    def _locate_all_eyes(self, frame):
+        if self.max_faces == 1:
+            return super()._locate_all_eyes(frame)
+        # One full-frame pass for all faces (a single-face ROI crop would miss the others)
+        return [self._eyes_from_landmarks(face) for face in self._run_face_mesh_all(frame)]
+
+    def reset(self):
+        self._last_face_box = None
+
+    def close(self):
+        self.face_mesh.close()
+        if self.crop_face_mesh is not None:
+            self.crop_face_mesh.close()
+
+
+class FaceDetectionBackend(DistanceBackend):
+    """MediaPipe short-range face detection; uses its two eye keypoints."""
+
+    name = "face_detection"
+    reference_span_cm = REAL_EYE_DISTANCE_CM * EYE_CENTER_SPAN_RATIO
+
+    def __init__(self):
+        super().__init__()
+        import mediapipe as mp
+
+        self.detector = mp.solutions.face_detection.FaceDetection(
+            model_selection=0,
+            min_detection_confidence=0.5
+        )
+
+    def _locate_eyes(self, frame):
+        eyes = self._locate_all_eyes(frame)
+        return eyes[0] if eyes else None
+
+    def _locate_all_eyes(self, frame):
+        h, w = frame.shape[:2]
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        results = self.detector.process(rgb)
+        if not results.detections:
+            return []
+
+        eyes = []
+        for detection in results.detections:
+            # Keypoints 0 and 1 are the right and left eye centers
+            keypoints = detection.location_data.relative_keypoints
+            right, left = keypoints[0], keypoints[1]
+            eyes.append(((int(left.x * w), int(left.y * h)), (int(right.x * w), int(right.y * h))))
+        return eyes
+
+    def close(self):
+        self.detector.close()
+
+
+class HaarCascadeBackend(DistanceBackend):
+    """OpenCV Haar cascades: face box, then the two eyes inside its upper half."""
+
+    name = "opencv_haar"
+    reference_span_cm = REAL_EYE_DISTANCE_CM * EYE_CENTER_SPAN_RATIO
+
+    def __init__(self, detect_width=480):
+        super().__init__()
+        cascade_dir = getattr(cv2, "data", None) and cv2.data.haarcascades
+        face_path = os.path.join(cascade_dir or "", "haarcascade_frontalface_default.xml")
+        eye_path = os.path.join(cascade_dir or "", "haarcascade_eye.xml")
+        if not (os.path.exists(face_path) and os.path.exists(eye_path)):
+            raise RuntimeError("OpenCV Haar cascade files not found")
+
+        self.face_cascade = cv2.CascadeClassifier(face_path)
+        self.eye_cascade = cv2.CascadeClassifier(eye_path)
+        self.detect_width = detect_width  # Frames are downscaled to this width for detection
+
+    def _detect_faces(self, frame):
+        """Detect face boxes on a downscaled grayscale frame."""
+        h, w = frame.shape[:2]
+        scale = min(1.0, self.detect_width / w)
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if scale < 1.0:
+            gray = cv2.resize(gray, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+
+        faces = self.face_cascade.detectMultiScale(gray, scaleFactor=1.2, minNeighbors=5, minSize=(40, 40))
+        # Largest faces first
+        return gray, scale, sorted(faces, key=lambda f: f[2] * f[3], reverse=True)
+
+    def _locate_eyes(self, frame):
+        gray, scale, faces = self._detect_faces(frame)
+        if not faces:
+            return None
+        return self._eyes_in_face(gray, scale, faces[0])
+
+    def _locate_all_eyes(self, frame):
+        gray, scale, faces = self._detect_faces(frame)
+        eyes = (self._eyes_in_face(gray, scale, face) for face in faces[:self.max_faces])
+        return [pair for pair in eyes if pair is not None]
+
+    def _eyes_in_face(self, gray, scale, face):
+        """Find the two eyes in the upper half of a face box."""
+        fx, fy, fw, fh = face
+        face_top = gray[fy:fy + fh // 2, fx:fx + fw]
+        eyes = self.eye_cascade.detectMultiScale(face_top, scaleFactor=1.1, minNeighbors=5)
+        if len(eyes) < 2:
+            return None
+
+        eyes = sorted(eyes, key=lambda e: e[2] * e[3], reverse=True)[:2]
+        points = []
+        for ex, ey, ew, eh in sorted(eyes, key=lambda e: e[0]):
+            points.append((int((fx + ex + ew / 2) / scale), int((fy + ey + eh / 2) / scale)))
+        return points[0], points[1]
+
+
+class MarkerBackend(DistanceBackend):
+    """
+    Finds solid marker-coloured eye dots (synthetic frames, printed test targets).
+    Deterministic and model-free, for testing and benchmarking the pipeline.
+    """
+
+    name = "marker"
+
+    def __init__(self, color=(0, 255, 0), tolerance=60, min_area=3):
+        """
+        Args:
+            color (tuple): BGR marker colour
+            tolerance (int): Allowed per-channel deviation from the colour
+            min_area (int): Smallest blob (pixels) counted as a marker
+        """
+        super().__init__()
+        self.lower = tuple(max(0, c - tolerance) for c in color)
+        self.upper = tuple(min(255, c + tolerance) for c in color)
+        self.min_area = min_area
+
+    def _markers(self, frame):
+        """Centroids of marker blobs, largest first."""
+        mask = cv2.inRange(frame, self.lower, self.upper)
+        count, _, stats, centroids = cv2.connectedComponentsWithStats(mask)
+        blobs = [
+            (stats[i, cv2.CC_STAT_AREA], centroids[i])
+            for i in range(1, count)
+            if stats[i, cv2.CC_STAT_AREA] >= self.min_area
+        ]
+        blobs.sort(key=lambda blob: blob[0], reverse=True)
+        return [centroid for _, centroid in blobs]
+
+    def _locate_eyes(self, frame):
+        eyes = self._locate_all_eyes(frame)
+        return eyes[0] if eyes else None
+
+    def _locate_all_eyes(self, frame):
+        # Pair markers left to right: faces sit side by side, two markers each
+        markers = sorted(self._markers(frame)[:2 * self.max_faces], key=lambda c: c[0])
+        eyes = []
+        for i in range(0, len(markers) - 1, 2):
+            left, right = markers[i], markers[i + 1]
+            # Sub-pixel centroids: rounding would lose the generator's sub-pixel placement
+            eyes.append(((float(left[0]), float(left[1])), (float(right[0]), float(right[1]))))
+        return eyes
+
+
+# Backend registry: name -> factory
+BACKENDS = {}
+
+
+def register_backend(name, factory):
+    """
+    Register a distance backend.
+
+    Args:
+        name (str): Name used in configuration
+        factory (callable): Returns a new DistanceBackend instance
+    """
+    BACKENDS[name] = factory
+
+
+def available_backends():
+    """Get the names of all registered backends."""
+    return list(BACKENDS)
+
+
+def create_backend(name):
+    """
+    Create a backend by name.
+
+    Raises:
+        ValueError: If no backend is registered under that name
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown distance backend: {name} (available: {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
+
+
+register_backend("facemesh_refined", lambda: FaceMeshBackend(refine_landmarks=True))
+register_backend("facemesh", lambda: FaceMeshBackend(refine_landmarks=False))
+register_backend("face_detection", FaceDetectionBackend)
+register_backend("opencv_haar", HaarCascadeBackend)
+register_backend("marker", MarkerBackend)
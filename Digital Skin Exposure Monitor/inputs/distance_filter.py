@@ -0,0 +1,212 @@
+"""
+Distance Filter Module
+Temporal filters for the distance stream.
+Raw per-frame distances jitter by a centimetre or more, which is enough to flip
+the dashboard's distance colour on a single reading. The filters smooth the
+measurements and predict the distance at any time between them, so inference
+can run at a fraction of the preview frame rate while the displayed distance
+still changes smoothly every frame.
+
+All filters take the measurement time, so irregular sample intervals (motion
+gating, slow frames) are handled correctly:
+
+    ema       exponential moving average with a time constant (prediction holds
+              the last value)
+    one_euro  One Euro filter: little smoothing while the distance changes fast,
+              strong smoothing while it is steady (Casiez et al., CHI 2012)
+    kalman    constant-velocity Kalman filter (default)
+"""
+
+import math
+
+# Predictions extrapolate the velocity at most this far past the last
+# measurement (seconds); beyond it the distance is held
+MAX_EXTRAPOLATION = 0.5
+
+
+class DistanceFilter:
+    """Base class: update() with measurements, predict() at any time."""
+
+    name = "base"
+
+    def __init__(self):
+        self.value = None
+        self.velocity = 0.0  # cm/s
+        self.last_time = None
+
+    def update(self, t, measurement):
+        """
+        Add a measurement.
+
+        Args:
+            t (float): Measurement time in seconds
+            measurement (float): Measured distance in cm
+
+        Returns:
+            float: Filtered distance at time t
+        """
+        if self.last_time is None:
+            self.value = float(measurement)
+            self.velocity = 0.0
+            self.last_time = t
+        else:
+            # Out-of-order or repeated timestamps are treated as simultaneous
+            self._update(max(0.0, t - self.last_time), float(measurement))
+            self.last_time = max(t, self.last_time)
+        return self.value
+
+    def _update(self, dt, measurement):
+        raise NotImplementedError
+
+    def predict(self, t):
+        """
+        Estimate the distance at time t (between or after measurements).
+
+        Returns:
+            float: Predicted distance in cm, or None before the first measurement
+        """
+        if self.value is None:
+            return None
+        dt = min(max(0.0, t - self.last_time), MAX_EXTRAPOLATION)
+        return max(0.0, self.value + self.velocity * dt)
+
+    def reset(self):
+        """Forget the filter state (e.g. the face was lost)."""
+        self.value = None
+        self.velocity = 0.0
+        self.last_time = None
+
+
+class EmaFilter(DistanceFilter):
+    """Exponential moving average with a time constant."""
+
+    name = "ema"
+
+    def __init__(self, time_constant=0.3):
+        """
+        Args:
+            time_constant (float): Seconds for the output to cover ~63% of a step
+        """
+        super().__init__()
+        self.time_constant = time_constant
+
+    def _update(self, dt, measurement):
+        alpha = 1.0 - math.exp(-dt / self.time_constant) if self.time_constant > 0 else 1.0
+        self.value += alpha * (measurement - self.value)
+
+    def predict(self, t):
+        # No velocity estimate: hold the smoothed value
+        return self.value
+
+
+class OneEuroFilter(DistanceFilter):
+    """One Euro filter (adaptive low-pass cutoff driven by the speed)."""
+
+    name = "one_euro"
+
+    def __init__(self, min_cutoff=1.0, beta=0.05, derivative_cutoff=1.0):
+        """
+        Args:
+            min_cutoff (float): Cutoff frequency (Hz) while the distance is steady
+            beta (float): Cutoff increase per cm/s of speed (higher = less lag)
+            derivative_cutoff (float): Cutoff frequency (Hz) of the speed estimate
+        """
+        super().__init__()
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.derivative_cutoff = derivative_cutoff
+
+    @staticmethod
+    def _alpha(dt, cutoff):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def _update(self, dt, measurement):
+        if dt <= 0:
+            return
+        speed = (measurement - self.value) / dt
+        self.velocity += self._alpha(dt, self.derivative_cutoff) * (speed - self.velocity)
+        cutoff = self.min_cutoff + self.beta * abs(self.velocity)
+        self.value += self._alpha(dt, cutoff) * (measurement - self.value)
+
+
+class KalmanFilter(DistanceFilter):
+    """Constant-velocity Kalman filter over (distance, speed)."""
+
+    name = "kalman"
+
+    def __init__(self, measurement_noise=1.0, acceleration_noise=30.0, initial_speed_var=100.0):
+        """
+        Args:
+            measurement_noise (float): Standard deviation of a raw measurement (cm)
+            acceleration_noise (float): Standard deviation of the unmodelled
+                acceleration (cm/s²); higher follows movements faster
+            initial_speed_var (float): Variance of the speed before it is observed ((cm/s)²)
+        """
+        super().__init__()
+        self.measurement_noise = measurement_noise
+        self.acceleration_noise = acceleration_noise
+        self.initial_speed_var = initial_speed_var
+        self._p = None
+
+    def update(self, t, measurement):
+        if self.last_time is None:
+            # Covariance [[p00, p01], [p01, p11]] of (distance, speed)
+            self._p = [self.measurement_noise ** 2, 0.0, self.initial_speed_var]
+        return super().update(t, measurement)
+
+    def _update(self, dt, measurement):
+        p00, p01, p11 = self._p
+
+        # Predict: x' = F x, P' = F P F^T + Q (white-noise acceleration)
+        q = self.acceleration_noise ** 2
+        value = self.value + self.velocity * dt
+        p00 = p00 + 2 * dt * p01 + dt * dt * p11 + q * dt ** 4 / 4
+        p01 = p01 + dt * p11 + q * dt ** 3 / 2
+        p11 = p11 + q * dt * dt
+
+        # Correct with the measured distance
+        s = p00 + self.measurement_noise ** 2
+        k0 = p00 / s
+        k1 = p01 / s
+        residual = measurement - value
+        self.value = value + k0 * residual
+        self.velocity += k1 * residual
+        self._p = [(1 - k0) * p00, (1 - k0) * p01, p11 - k1 * p01]
+
+    def reset(self):
+        super().reset()
+        self._p = None
+
+
+FILTERS = {
+    "ema": EmaFilter,
+    "one_euro": OneEuroFilter,
+    "kalman": KalmanFilter
+}
+
+
+def available_filters():
+    """Get the names of all distance filters ("none" disables filtering)."""
+    return ["none"] + list(FILTERS)
+
+
+def create_filter(name, **params):
+    """
+    Create a distance filter by name.
+
+    Args:
+        name (str): One of available_filters()
+        **params: Filter parameters (see the filter classes)
+
+    Returns:
+        DistanceFilter: New filter, or None for "none"
+
+    Raises:
+        ValueError: If the filter name is unknown
+    """
+    if name in (None, "none"):
+        return None
+    if name not in FILTERS:
+        raise ValueError(f"Unknown distance filter: {name} (available: {', '.join(available_filters())})")
+    return FILTERS[name](**params)
@@ -0,0 +1,74 @@
+"""
+Face ROI Module
+Crop helpers for running a landmark model on the region around the last known face.
+Only depends on OpenCV.
+"""
+
+import cv2
+
+
+def crop_region(frame, box, target_size=None):
+    """
+    Cut a box out of a frame, optionally downscaling it.
+
+    Args:
+        frame: BGR frame
+        box (tuple): (x0, y0, x1, y1) in full-frame pixels
+        target_size (int): Longer side of the crop after downscaling (None = keep size)
+
+    Returns:
+        numpy.ndarray: The crop (never upscaled)
+    """
+    x0, y0, x1, y1 = box
+    crop = frame[y0:y1, x0:x1]
+    crop_w, crop_h = x1 - x0, y1 - y0
+
+    if target_size and max(crop_w, crop_h) > target_size:
+        scale = target_size / max(crop_w, crop_h)
+        size = (max(1, int(crop_w * scale)), max(1, int(crop_h * scale)))
+        crop = cv2.resize(crop, size, interpolation=cv2.INTER_AREA)
+    return crop
+
+
+def to_frame_points(landmarks, box):
+    """
+    Map landmarks normalized to a crop back to full-frame pixels.
+
+    Landmarks are normalized to the crop, so downscaling does not affect the mapping.
+
+    Args:
+        landmarks: Landmarks with .x and .y in [0, 1] (e.g. MediaPipe face.landmark)
+        box (tuple): (x0, y0, x1, y1) of the crop in full-frame pixels
+
+    Returns:
+        list: (x, y) positions in full-frame pixels
+    """
+    x0, y0, x1, y1 = box
+    crop_w, crop_h = x1 - x0, y1 - y0
+    return [(x0 + lm.x * crop_w, y0 + lm.y * crop_h) for lm in landmarks]
+
+
+def padded_box(points, w, h, padding):
+    """
+    Bounding box of landmark positions plus padding, clipped to the frame.
+
+    Args:
+        points (list): (x, y) positions in full-frame pixels
+        w (int): Frame width
+        h (int): Frame height
+        padding (float): Margin on each side (fraction of the box size)
+
+    Returns:
+        tuple: (x0, y0, x1, y1), or None if the box is degenerate
+    """
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    pad = padding * max(max(xs) - min(xs), max(ys) - min(ys))
+
+    x0 = max(0, int(min(xs) - pad))
+    y0 = max(0, int(min(ys) - pad))
+    x1 = min(w, int(max(xs) + pad) + 1)
+    y1 = min(h, int(max(ys) + pad) + 1)
+    if x1 - x0 < 2 or y1 - y0 < 2:
+        return None
+    return x0, y0, x1, y1
@@ -0,0 +1,89 @@
+"""
+Face Tracker Module
+Assigns stable track IDs to the faces detected in consecutive frames.
+Each face is matched to the track with the nearest eye midpoint (measured in
+eye spans, so the gate scales with how close the face is). Tracks that are not
+seen for a few frames are dropped; new faces get new IDs.
+"""
+
+import numpy as np
+
+
+class FaceTracker:
+    """Nearest-centroid tracker over per-face eye pairs."""
+
+    def __init__(self, max_match_distance=1.5, max_missed=5):
+        """
+        Args:
+            max_match_distance (float): Largest centroid jump, in eye spans, still
+                counted as the same face
+            max_missed (int): Consecutive frames a track may go undetected before it is dropped
+        """
+        self.max_match_distance = max_match_distance
+        self.max_missed = max_missed
+        self.next_id = 1
+        self.tracks = {}  # track_id -> {"centroid": (x, y), "span": px, "missed": n}
+
+    def update(self, eye_pairs):
+        """
+        Match this frame's faces to tracks.
+
+        Args:
+            eye_pairs (list): ((x1, y1), (x2, y2)) per detected face
+
+        Returns:
+            list: Track ID per face, in the order of eye_pairs
+        """
+        if len(eye_pairs):
+            points = np.asarray(eye_pairs, dtype=np.float64).reshape(-1, 2, 2)
+            centroids = points.mean(axis=1)
+            spans = np.maximum(np.hypot(*(points[:, 1] - points[:, 0]).T), 1.0)
+        else:
+            centroids = np.empty((0, 2))
+            spans = np.empty(0)
+
+        track_ids = list(self.tracks)
+        assigned = [None] * len(centroids)
+
+        if track_ids and len(centroids):
+            track_centroids = np.array([self.tracks[t]["centroid"] for t in track_ids])
+            track_spans = np.array([self.tracks[t]["span"] for t in track_ids])
+            # cost[i, j]: distance between face i and track j in units of the track's eye span
+            cost = np.linalg.norm(centroids[:, None, :] - track_centroids[None, :, :], axis=2) / track_spans
+
+            # Greedy assignment, cheapest pairs first
+            used_faces = set()
+            used_tracks = set()
+            for flat in np.argsort(cost, axis=None):
+                i, j = divmod(int(flat), len(track_ids))
+                if cost[i, j] > self.max_match_distance:
+                    break
+                if i in used_faces or j in used_tracks:
+                    continue
+                used_faces.add(i)
+                used_tracks.add(j)
+                assigned[i] = track_ids[j]
+
+        for i, track_id in enumerate(assigned):
+            if track_id is None:
+                track_id = assigned[i] = self.next_id
+                self.next_id += 1
+            self.tracks[track_id] = {
+                "centroid": (float(centroids[i, 0]), float(centroids[i, 1])),
+                "span": float(spans[i]),
+                "missed": 0
+            }
+
+        seen = set(assigned)
+        for track_id in track_ids:
+            if track_id in seen:
+                continue
+            self.tracks[track_id]["missed"] += 1
+            if self.tracks[track_id]["missed"] > self.max_missed:
+                del self.tracks[track_id]
+
+        return assigned
+
+    def reset(self):
+        """Drop all tracks (IDs keep increasing)."""
+        self.tracks = {}
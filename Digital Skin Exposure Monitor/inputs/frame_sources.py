@@ -0,0 +1,316 @@
+"""
+Frame Sources Module
+Injectable frame sources for the camera capture thread.
+The capture thread reads from a FrameSource instead of a hard-wired
+cv2.VideoCapture(0), so the capture, inference and scoring path can run on a
+webcam, a recorded video, a folder of images or synthetic frames. Sources can
+be paced to a frame rate or run unthrottled.
+
+The synthetic source renders faces whose eyes are solid marker dots at a known
+distance, with optional motion and noise. Together with the "marker" distance
+backend this gives a fully deterministic pipeline with ground truth.
+"""
+
+import math
+import os
+import time
+
+import cv2
+import numpy as np
+
+from inputs.distance_backends import REAL_EYE_DISTANCE_CM
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+# BGR colour of the synthetic eye markers (found by the "marker" backend)
+MARKER_COLOR = (0, 255, 0)
+
+
+class FrameSource:
+    """Base class: grab() advances to the next frame, retrieve() decodes it."""
+
+    def __init__(self, fps=None):
+        """
+        Args:
+            fps (float): Pace frames to this rate (None or 0 = unthrottled)
+        """
+        self.fps = fps
+        self._next_time = None
+
+    def open(self):
+        """Open the source. Raises RuntimeError if it is unavailable."""
+        return self
+
+    def is_opened(self):
+        return True
+
+    def grab(self):
+        """
+        Advance to the next frame without decoding it.
+
+        Returns:
+            bool: False at the end of the source or on a read error
+        """
+        raise NotImplementedError
+
+    def retrieve(self):
+        """
+        Decode the grabbed frame.
+
+        Returns:
+            tuple: (ok, BGR frame)
+        """
+        raise NotImplementedError
+
+    def read(self):
+        """Grab and decode the next frame (same contract as cv2.VideoCapture.read)."""
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def close(self):
+        """Release the source."""
+
+    def _pace(self):
+        """Sleep until the next frame is due (no-op when unthrottled)."""
+        if not self.fps:
+            return
+        period = 1.0 / self.fps
+        now = time.monotonic()
+        if self._next_time is None or now - self._next_time > period:
+            # First frame, or we fell behind by more than a frame: restart the clock
+            self._next_time = now
+        elif self._next_time > now:
+            time.sleep(self._next_time - now)
+        self._next_time += period
+
+
+class CameraSource(FrameSource):
+    """Webcam through cv2.VideoCapture (paced by the device itself)."""
+
+    def __init__(self, device_index=0):
+        super().__init__(fps=None)
+        self.device_index = device_index
+        self._cap = None
+
+    def open(self):
+        self._cap = cv2.VideoCapture(self.device_index)
+        if not self._cap.isOpened():
+            self._cap.release()
+            self._cap = None
+            raise RuntimeError("Could not open webcam")
+        return self
+
+    def is_opened(self):
+        return self._cap is not None and self._cap.isOpened()
+
+    def grab(self):
+        return self._cap is not None and self._cap.grab()
+
+    def retrieve(self):
+        return self._cap.retrieve()
+
+    def close(self):
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+
+class VideoFileSource(FrameSource):
+    """Recorded video file, optionally looped."""
+
+    def __init__(self, path, fps=None, loop=True):
+        """
+        Args:
+            path (str): Video file
+            fps (float): Playback rate (None = unthrottled, "native" = the file's frame rate)
+            loop (bool): Restart at the end of the file
+        """
+        super().__init__(fps=None if fps == "native" else fps)
+        self.path = path
+        self.loop = loop
+        self._native_fps = fps == "native"
+        self._cap = None
+
+    def open(self):
+        self._cap = cv2.VideoCapture(self.path)
+        if not self._cap.isOpened():
+            self._cap.release()
+            self._cap = None
+            raise RuntimeError(f"Could not open video: {self.path}")
+        if self._native_fps:
+            self.fps = self._cap.get(cv2.CAP_PROP_FPS) or 30.0
+        return self
+
+    def is_opened(self):
+        return self._cap is not None and self._cap.isOpened()
+
+    def grab(self):
+        if self._cap is None:
+            return False
+        self._pace()
+        if self._cap.grab():
+            return True
+        if not self.loop:
+            return False
+        self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        return self._cap.grab()
+
+    def retrieve(self):
+        return self._cap.retrieve()
+
+    def close(self):
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+
+class ImageFolderSource(FrameSource):
+    """Folder of images played as a sequence in file name order."""
+
+    def __init__(self, folder, fps=None, loop=True, preload=False):
+        """
+        Args:
+            folder (str): Directory with .jpg/.png/.bmp images
+            fps (float): Frame rate (None = unthrottled)
+            loop (bool): Restart after the last image
+            preload (bool): Decode all images up front (measures the pipeline without JPEG decoding)
+        """
+        super().__init__(fps)
+        self.folder = folder
+        self.loop = loop
+        self.preload = preload
+        self.paths = []
+        self._images = None
+        self._index = -1
+
+    def open(self):
+        if not os.path.isdir(self.folder):
+            raise RuntimeError(f"Image folder not found: {self.folder}")
+        self.paths = [
+            os.path.join(self.folder, name)
+            for name in sorted(os.listdir(self.folder))
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        ]
+        if not self.paths:
+            raise RuntimeError(f"No images in {self.folder}")
+        if self.preload:
+            self._images = [cv2.imread(path) for path in self.paths]
+        self._index = -1
+        return self
+
+    def grab(self):
+        if not self.paths:
+            return False
+        if self._index + 1 >= len(self.paths) and not self.loop:
+            return False
+        self._pace()
+        self._index = (self._index + 1) % len(self.paths)
+        return True
+
+    def retrieve(self):
+        if self._images is not None:
+            frame = self._images[self._index]
+        else:
+            frame = cv2.imread(self.paths[self._index])
+        return frame is not None, frame
+
+
+class SyntheticFaceSource(FrameSource):
+    """
+    Renders faces with marker-coloured eyes at controlled distances.
+
+    Frame content depends only on the frame index, so a run is reproducible
+    whatever the frame rate.
+    """
+
+    def __init__(self, width=640, height=480, distance_cm=60.0, faces=1, fps=30,
+                 distance_amplitude=0.0, distance_period=10.0, sway_px=0.0, sway_period=4.0,
+                 noise=0.0, seed=0, focal_length=650, frame_count=None):
+        """
+        Args:
+            width (int): Frame width in pixels
+            height (int): Frame height in pixels
+            distance_cm (float or callable): Distance of the first face, or f(t) -> cm
+            faces (int): Number of faces (each further face is 25% further away)
+            fps (float): Frame rate (None or 0 = unthrottled); also the time base of the motion
+            distance_amplitude (float): Sinusoidal distance change in cm
+            distance_period (float): Period of the distance change in seconds
+            sway_px (float): Sideways sway amplitude in pixels
+            sway_period (float): Period of the sway in seconds
+            noise (float): Standard deviation of Gaussian pixel noise (0 = clean frames)
+            seed (int): Noise seed (combined with the frame index, so every frame's
+                noise is fixed whichever frames are retrieved)
+            focal_length (float): Focal length (pixels) used to place the eyes
+            frame_count (int): Stop after this many frames (None = endless)
+        """
+        super().__init__(fps)
+        self.width = width
+        self.height = height
+        self.distance_cm = distance_cm
+        self.faces = max(1, int(faces))
+        self.distance_amplitude = distance_amplitude
+        self.distance_period = distance_period
+        self.sway_px = sway_px
+        self.sway_period = sway_period
+        self.noise = noise
+        self.seed = seed
+        self.focal_length = focal_length
+        self.frame_count = frame_count
+
+        self.frame_index = -1
+        self.last_truth = []
+        self._background = np.full((height, width, 3), (70, 60, 50), dtype=np.uint8)
+
+    def truth(self, frame_index):
+        """
+        Ground truth of a frame.
+
+        Returns:
+            list: {"distance", "eyes": ((x1, y1), (x2, y2))} per face (float pixel positions)
+        """
+        t = frame_index / (self.fps or 30.0)
+        base = self.distance_cm(t) if callable(self.distance_cm) else self.distance_cm
+        if self.distance_amplitude:
+            base += self.distance_amplitude * math.sin(2 * math.pi * t / self.distance_period)
+        sway = self.sway_px * math.sin(2 * math.pi * t / self.sway_period) if self.sway_px else 0.0
+
+        result = []
+        for i in range(self.faces):
+            distance = max(1.0, base * (1 + 0.25 * i))
+            span = REAL_EYE_DISTANCE_CM * self.focal_length / distance
+            cx = self.width * (i + 1) / (self.faces + 1) + sway
+            cy = self.height * 0.45
+            result.append({
+                "distance": distance,
+                "eyes": ((cx - span / 2, cy), (cx + span / 2, cy))
+            })
+        return result
+
+    def grab(self):
+        if self.frame_count is not None and self.frame_index + 1 >= self.frame_count:
+            return False
+        self._pace()
+        self.frame_index += 1
+        return True
+
+    def retrieve(self):
+        frame = self._background.copy()
+        self.last_truth = self.truth(self.frame_index)
+        for face in self.last_truth:
+            (x1, y1), (x2, y2) = face["eyes"]
+            span = x2 - x1
+            center = (int(round((x1 + x2) / 2)), int(round(y1 + span * 0.35)))
+            axes = (max(2, int(span * 0.95)), max(3, int(span * 1.3)))
+            cv2.ellipse(frame, center, axes, 0, 0, 360, (150, 170, 205), -1)
+            radius = max(1, int(round(span * 0.08)))
+            for x, y in face["eyes"]:
+                # Sub-pixel centres keep the marker centroid on the true eye position
+                cv2.circle(frame, (int(round(x * 16)), int(round(y * 16))), radius * 16,
+                           MARKER_COLOR, -1, cv2.LINE_AA, 4)
+
+        if self.noise:
+            rng = np.random.default_rng((self.seed, self.frame_index))
+            noise = rng.normal(0.0, self.noise, frame.shape)
+            frame = np.clip(frame + noise, 0, 255).astype(np.uint8)
+        return True, frame
@@ -11,14 +11,33 @@ This system monitors:
 - Screen brightness (OS-level detection)
 - Blue light exposure score (research-based formula)
 - Thermal exposure score (proximity-based model)
+
+Usage:
+    python main.py                          # GUI dashboard
+    python main.py --headless [--port 8765] # no GUI, metrics on http://127.0.0.1:8765
 """
 
-import tkinter as tk
+# Imported first: startup times are measured from here
+from core.startup import mark, report_startup_times
+
+import argparse
 import sys
 import traceback
-from ui.dashboard import Dashboard
 from core.controller import monitor, initialize_session, shutdown
 
+# Run monitoring cycles on a background worker thread (False = run them
+# inline from Tk after() callbacks, the original single-threaded mode)
+USE_WORKER_THREAD = True
+
+# How often the UI drains worker results (milliseconds)
+RESULT_POLL_MS = 100
+
+# Face detection rate for the camera preview (per second). Detection runs on a
+# background thread and the preview shows the filtered distance predicted for
+# every frame. Off by default (0 = detect only once per monitoring cycle): any
+# rate above 1 / MONITORING_INTERVAL runs the face model more often, not less
+PREVIEW_DETECTION_HZ = 0
+
 
 def update_system(dashboard):
     """
@@ -34,7 +53,7 @@ def update_system(dashboard):
         data = monitor()
         
         # Update dashboard with new data
-        dashboard.update_metrics(data)
+        show_data(dashboard, data)
         
         # Schedule next update using dynamic interval
         dashboard.after(interval_ms, update_system, dashboard)
@@ -48,24 +67,116 @@ def update_system(dashboard):
         dashboard.after(interval_ms, update_system, dashboard)
 
 
+def show_data(dashboard, data):
+    """Show a monitoring sample; the first one completes the startup timing."""
+    dashboard.update_metrics(data)
+    if mark("first_sample_shown"):
+        report_startup_times()
+
+
+def poll_worker_results(dashboard, worker):
+    """
+    Apply monitoring results produced by the worker thread to the dashboard.
+    Runs on the Tk main loop and never blocks on sensors.
+    """
+    from core.worker import drain_results
+
+    try:
+        drain_results(worker.results, lambda data: show_data(dashboard, data),
+                      on_alert=dashboard.alerts.notify, on_status=dashboard.show_startup_status)
+    except Exception as e:
+        print(f"Error applying monitoring results: {e}")
+        traceback.print_exc()
+
+    dashboard.after(RESULT_POLL_MS, poll_worker_results, dashboard, worker)
+
+
+def start_worker(dashboard):
+    """
+    Start the background monitoring worker and hook it into the dashboard.
+
+    Returns:
+        MonitorWorker: The running worker
+    """
+    from core.worker import MonitorWorker
+
+    # The sampling rate is set on the worker: inputs.distance imports OpenCV
+    worker = MonitorWorker(sample_rate_hz=PREVIEW_DETECTION_HZ)
+    worker.start()
+    poll_worker_results(dashboard, worker)
+
+    def on_closing():
+        # Stop sampling before the camera is released by the dashboard
+        worker.stop()
+        dashboard.on_closing()
+
+    dashboard.protocol("WM_DELETE_WINDOW", on_closing)
+    return worker
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Digital Skin Exposure Monitor")
+    parser.add_argument("--headless", action="store_true",
+                        help="Run without the GUI and serve metrics over HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="Metrics server address (headless mode)")
+    parser.add_argument("--port", type=int, default=8765, help="Metrics server port (headless mode)")
+    parser.add_argument("--interval", type=int, help="Monitoring interval in seconds")
+    parser.add_argument("--trace", metavar="FILE", help="Append per-stage timings to a JSON-lines trace file")
+    return parser.parse_args(argv)
+
+
 def main():
     """Main application entry point."""
+    args = parse_args()
+    if args.interval:
+        from core.controller import set_monitoring_interval
+        set_monitoring_interval(args.interval)
+    if args.trace:
+        from core.instrumentation import set_trace_file
+        set_trace_file(args.trace)
+
+    if args.headless:
+        # Tkinter and the dashboard are never imported in headless mode
+        from core.headless import run_headless
+        print("Initializing Digital Skin Exposure Monitor (headless)...")
+        run_headless(args.host, args.port)
+        return
+
+    from ui.dashboard import Dashboard
+
+    worker = None
     try:
-        # Initialize monitoring session
-        print("Initializing Digital Skin Exposure Monitor...")
-        initialize_session()
-        print("Session initialized successfully.")
-        
-        # Create and configure dashboard
+        # Draw the dashboard first; the camera and the face model are opened
+        # afterwards while the window shows progress
         print("Launching dashboard...")
         app = Dashboard()
         
         # Set up window close handler
         app.protocol("WM_DELETE_WINDOW", app.on_closing)
+        app.update()
+        mark("first_window")
+
+        # Initialize monitoring session
+        print("Initializing Digital Skin Exposure Monitor...")
+        initialize_session(open_camera=False)
+        print("Session initialized successfully.")
         
         # Start monitoring cycle
         print("Starting monitoring system...")
-        update_system(app)
+        if USE_WORKER_THREAD:
+            worker = start_worker(app)
+        else:
+            # Alerts become in-window toasts instead of modal popups
+            from core.controller import set_alert_handler
+            from core.startup import warm_up
+            set_alert_handler(app.alerts.notify)
+
+            def progress(text):
+                app.show_startup_status(text)
+                app.update_idletasks()
+
+            warm_up(progress, PREVIEW_DETECTION_HZ)
+            update_system(app)
         
         # Run GUI event loop
         print("System ready. Monitoring active.")
@@ -73,12 +184,16 @@ def main():
         
     except KeyboardInterrupt:
         print("\nShutting down...")
+        if worker is not None:
+            worker.stop()
         shutdown()
         sys.exit(0)
         
     except Exception as e:
         print(f"Fatal error: {e}")
         traceback.print_exc()
+        if worker is not None:
+            worker.stop()
         shutdown()
         sys.exit(1)
 
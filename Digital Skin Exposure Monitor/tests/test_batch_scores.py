@@ -0,0 +1,37 @@
+"""
+Batch scoring must give the same results as the scalar scoring functions,
+including values that round on a .xx5 boundary.
+"""
+
+import numpy as np
+import pytest
+
+from exposure.blue_light import blue_light_score, blue_light_score_batch
+from exposure.thermal import thermal_score, thermal_score_batch
+
+
+# (brightness, duration, distance) with scores on or next to a .xx5 tie
+BLUE_CASES = [(47, 1, 10), (60, 5, 50), (100, 30, 45), (33.3, 12.5, 70)]
+# (duration, distance)
+THERMAL_CASES = [(292.0, 160.0), (10, 50), (45, 33), (120.5, 61.0)]
+
+
+@pytest.mark.parametrize("brightness, duration, distance", BLUE_CASES)
+def test_blue_light_scalar_input(brightness, duration, distance):
+    assert float(blue_light_score_batch(brightness, duration, distance)) == \
+        blue_light_score(brightness, duration, distance)
+
+
+@pytest.mark.parametrize("duration, distance", THERMAL_CASES)
+def test_thermal_scalar_input(duration, distance):
+    assert float(thermal_score_batch(duration, distance)) == thermal_score(duration, distance)
+
+
+def test_array_input_matches_scalar():
+    brightness, duration, distance = (np.array(column, dtype=float) for column in zip(*BLUE_CASES))
+    assert blue_light_score_batch(brightness, duration, distance).tolist() == \
+        [blue_light_score(*case) for case in BLUE_CASES]
+
+    duration, distance = (np.array(column, dtype=float) for column in zip(*THERMAL_CASES))
+    assert thermal_score_batch(duration, distance).tolist() == \
+        [thermal_score(*case) for case in THERMAL_CASES]
@@ -0,0 +1,67 @@
+"""
+Brightness reader tests against a fake sysfs backlight tree.
+"""
+
+import threading
+
+from inputs.brightness import BrightnessReader
+
+
+def make_backlight(root, name, brightness, max_brightness):
+    device = root / name
+    device.mkdir(parents=True)
+    (device / "max_brightness").write_text(f"{max_brightness}\n")
+    (device / "brightness").write_text(f"{brightness}\n")
+    return device
+
+
+def test_sysfs_value_and_refresh(tmp_path):
+    device = make_backlight(tmp_path, "intel_backlight", 600, 1200)
+    reader = BrightnessReader(sysfs_root=str(tmp_path), os_name="Linux")
+    try:
+        assert reader.backend == "sysfs"
+        assert reader.max_brightness == 1200
+        assert reader.read() == 50
+
+        # The open file is re-read in place: a new value shows up on the next read
+        (device / "brightness").write_text("300\n")
+        assert reader.read() == 25
+    finally:
+        reader.close()
+
+
+def test_preferred_device_first(tmp_path):
+    make_backlight(tmp_path, "aaa_backlight", 10, 100)
+    make_backlight(tmp_path, "intel_backlight", 80, 100)
+    reader = BrightnessReader(sysfs_root=str(tmp_path), os_name="Linux")
+    try:
+        assert reader.device_path.endswith("intel_backlight")
+        assert reader.read() == 80
+    finally:
+        reader.close()
+
+
+def test_read_after_close_does_not_reopen(tmp_path):
+    make_backlight(tmp_path, "intel_backlight", 50, 100)
+    reader = BrightnessReader(sysfs_root=str(tmp_path), os_name="Linux")
+    reader.close()
+    assert reader.read() is None
+    assert reader._brightness_file is None
+
+
+def test_close_while_reading(tmp_path):
+    make_backlight(tmp_path, "intel_backlight", 50, 100)
+    reader = BrightnessReader(sysfs_root=str(tmp_path), os_name="Linux")
+    values = []
+
+    def read_loop():
+        for _ in range(2000):
+            values.append(reader.read())
+
+    worker = threading.Thread(target=read_loop)
+    worker.start()
+    reader.close()
+    worker.join()
+
+    assert set(values) <= {50, None}
+    assert reader._brightness_file is None
@@ -0,0 +1,62 @@
+"""
+Distance pipeline tests: every filter, with and without background sampling,
+on synthetic frames measured by the marker backend.
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from inputs import distance
+from inputs.camera import set_frame_source
+from inputs.distance_filter import available_filters
+from inputs.frame_sources import ImageFolderSource, SyntheticFaceSource
+
+
+@pytest.fixture
+def synthetic_camera():
+    backend, filter_name, max_hold = distance.DISTANCE_BACKEND, distance.DISTANCE_FILTER, distance.FILTER_MAX_HOLD
+
+    def use(source=None, rate_hz=0, filter_name="none"):
+        distance.set_distance_backend("marker")
+        distance.set_distance_filter(filter_name)
+        distance.set_distance_sampling(rate_hz)
+        set_frame_source(source or SyntheticFaceSource(distance_cm=60.0))
+
+    yield use
+
+    distance.release_camera()
+    set_frame_source(None)
+    distance.set_distance_sampling(0)
+    distance.set_distance_filter(filter_name, max_hold)
+    distance.set_distance_backend(backend)
+
+
+@pytest.mark.parametrize("rate_hz", [0, 20])
+@pytest.mark.parametrize("filter_name", available_filters())
+def test_distance_with_face(synthetic_camera, filter_name, rate_hz):
+    synthetic_camera(rate_hz=rate_hz, filter_name=filter_name)
+    readings = [distance.get_distance() for _ in range(3)]
+    assert all(reading == pytest.approx(60.0, abs=1.0) for reading in readings)
+    assert distance.get_predicted_distance() == pytest.approx(60.0, abs=1.0)
+
+
+@pytest.mark.parametrize("rate_hz", [0, 20])
+@pytest.mark.parametrize("filter_name", available_filters())
+def test_distance_without_face(synthetic_camera, tmp_path, filter_name, rate_hz):
+    cv2.imwrite(str(tmp_path / "empty.png"), np.zeros((480, 640, 3), dtype=np.uint8))
+    synthetic_camera(ImageFolderSource(str(tmp_path), fps=30), rate_hz, filter_name)
+    assert [distance.get_distance() for _ in range(3)] == [None, None, None]
+    assert distance.get_predicted_distance() is None
+
+
+def test_unfiltered_sample_expires(synthetic_camera):
+    synthetic_camera(rate_hz=20, filter_name="none")
+    measured = distance.get_distance()
+    assert measured == pytest.approx(60.0, abs=1.0)
+
+    # Without a filter there is no prediction: the raw sample is only held for FILTER_MAX_HOLD
+    distance.set_distance_sampling(0)
+    _, timestamp = distance._last_measurement
+    assert distance.get_predicted_distance(timestamp + distance.FILTER_MAX_HOLD / 2) == measured
+    assert distance.get_predicted_distance(timestamp + distance.FILTER_MAX_HOLD + 0.1) is None
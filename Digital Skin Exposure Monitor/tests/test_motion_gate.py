@@ -0,0 +1,58 @@
+"""
+Motion gate tests: results are reused on unchanged frames, but never across a
+backend switch.
+"""
+
+import pytest
+
+from inputs import distance
+from inputs.camera import set_frame_source
+from inputs.distance_backends import BACKENDS, MarkerBackend, register_backend
+from inputs.frame_sources import SyntheticFaceSource
+
+
+class WideMarkerBackend(MarkerBackend):
+    """Marker backend calibrated for markers twice as far apart."""
+
+    name = "marker_wide"
+    reference_span_cm = MarkerBackend.reference_span_cm * 2
+
+
+@pytest.fixture
+def still_camera():
+    settings = (distance.DISTANCE_BACKEND, distance.DISTANCE_FILTER, distance.MOTION_GATING)
+    register_backend("marker_wide", WideMarkerBackend)
+    distance.set_distance_backend("marker")
+    distance.set_distance_filter("none")
+    distance.set_motion_gating(True)
+    distance.reset_motion_gate_stats()
+    # A still face: every frame is the same, so the gate would always hit
+    set_frame_source(SyntheticFaceSource(distance_cm=60.0))
+
+    yield
+
+    distance.release_camera()
+    set_frame_source(None)
+    backend, filter_name, gating = settings
+    distance.set_distance_backend(backend)
+    distance.set_distance_filter(filter_name)
+    distance.set_motion_gating(gating)
+    del BACKENDS["marker_wide"]
+
+
+def test_unchanged_frames_reuse_result(still_camera):
+    readings = [distance.get_distance() for _ in range(3)]
+    assert readings[0] == pytest.approx(60.0, abs=1.0)
+    assert readings == [readings[0]] * 3
+    assert distance.get_motion_gate_stats()["hits"] == 2
+
+
+def test_backend_switch_is_a_miss(still_camera):
+    before = distance.get_distance()
+    distance.set_distance_backend("marker_wide")
+    after = [distance.get_distance() for _ in range(3)]
+
+    assert after[0] == pytest.approx(before * 2, abs=0.1)
+    assert after == [after[0]] * 3
+    stats = distance.get_motion_gate_stats()
+    assert (stats["hits"], stats["misses"]) == (2, 2)
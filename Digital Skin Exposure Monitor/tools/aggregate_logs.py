@@ -0,0 +1,506 @@
+"""
+Fleet Log Aggregation
+Merges exposure logs collected from many workstations into per-machine and
+fleet-wide rollups and risk distributions.
+
+Logs are expected one directory per machine, e.g. as copied from each
+workstation's data/ folder:
+
+    collected/
+        ws-001/exposure_log.csv
+        ws-001/segments/exposure_log-20250101-080000.csv.gz
+        ws-002/exposure_log.csv
+        ...
+
+Every subdirectory of an input directory is one machine (all logs below it,
+live or rotated, plain or compressed). Log files given directly are attributed
+to the directory they are in. Per-face logs and other CSV files are skipped.
+
+Machines are processed in parallel, one per worker process. Each log is read
+in column chunks (pyarrow's streaming CSV reader when installed, otherwise a
+chunked csv reader converted to numpy arrays) and folded into daily rollup
+buckets, so memory stays bounded by the chunk size and the number of days,
+not by the number or size of the logs. Per-machine results are written out as
+soon as each machine is done; only the fleet aggregates are kept.
+
+Outputs (in --output):
+    machines.csv      one row per machine: totals, averages and time in risk levels
+    machine_days.csv  one row per machine and day
+    fleet.json        fleet totals, daily rollups and risk distributions
+
+Usage:
+    python tools/aggregate_logs.py collected/ --output fleet_report
+    python tools/aggregate_logs.py collected/ --workers 8 --interval 5
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from itertools import islice
+
+import numpy as np
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Allow running from the project root or the tools folder
+sys.path.insert(0, PROJECT_DIR)
+
+from core.log_rotation import open_segment
+from core.log_writer import LOG_COLUMNS
+from core.rollups import RISK_LEVELS, new_bucket, merge_buckets, summarize
+
+try:
+    import pyarrow
+    import pyarrow.csv as pyarrow_csv
+except ImportError:
+    pyarrow = None
+
+# Rows per chunk of the csv fallback reader
+CHUNK_ROWS = 64 * 1024
+
+# Bytes per block of the pyarrow reader
+ARROW_BLOCK_SIZE = 4 * 1024 * 1024
+
+# Log file suffixes picked up in machine directories
+LOG_SUFFIXES = (".csv", ".csv.gz", ".csv.zst")
+
+# Numeric log columns -> rollup metric names (see core.rollups.METRICS)
+NUMERIC_COLUMNS = {
+    "Distance_cm": "distance",
+    "Brightness": "brightness",
+    "BlueLightScore": "blue_score",
+    "ThermalScore": "thermal_score"
+}
+
+RISK_COLUMNS = {"BlueRisk": "blue", "ThermalRisk": "thermal"}
+
+# Histogram bin edges of the time-weighted distributions (the last bin
+# includes its upper edge; values outside the edges are not counted)
+HISTOGRAM_BINS = {
+    "blue_score": [0, 10, 20, 30, 40, 50, 60, 70, 80, 90, 100],
+    "thermal_score": [0, 10, 20, 30, 40, 50, 60, 70, 80, 90, 100],
+    "distance": [0, 30, 40, 50, 60, 70, 80, 100, 1000]
+}
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def is_log_file(path):
+    """Check the header: only exposure logs (not per-face logs) are aggregated."""
+    try:
+        with open_segment(path) as f:
+            header = next(csv.reader(f), None)
+    except Exception as e:
+        print(f"Error reading {path}: {e}")
+        return False
+    return header == LOG_COLUMNS
+
+
+def discover_machines(inputs):
+    """
+    Group log files by machine.
+
+    Args:
+        inputs (list): Directories (one subdirectory per machine) and/or log files
+
+    Returns:
+        dict: Machine name -> list of log file paths
+    """
+    machines = {}
+    for entry in inputs:
+        if os.path.isfile(entry):
+            machine = os.path.basename(os.path.dirname(os.path.abspath(entry)))
+            machines.setdefault(machine, []).append(entry)
+            continue
+        for name in sorted(os.listdir(entry)):
+            path = os.path.join(entry, name)
+            if os.path.isfile(path):
+                if name.endswith(LOG_SUFFIXES):
+                    machines.setdefault(os.path.basename(os.path.abspath(entry)), []).append(path)
+                continue
+            for root, _, files in os.walk(path):
+                for file_name in files:
+                    if file_name.endswith(LOG_SUFFIXES):
+                        machines.setdefault(name, []).append(os.path.join(root, file_name))
+    return machines
+
+
+def _log_order(path):
+    """Rotated segments (named by start time) first, then the live log."""
+    name = os.path.basename(path)
+    return (name.endswith(".csv"), name, path)
+
+
+def _arrow_chunks(path):
+    """Column chunks read with pyarrow's streaming CSV reader."""
+    if path.endswith(".gz"):
+        source = pyarrow.input_stream(path, compression="gzip")
+    elif path.endswith(".zst"):
+        source = pyarrow.input_stream(path, compression="zstd")
+    else:
+        source = pyarrow.input_stream(path)
+
+    column_types = {"DateTime": pyarrow.timestamp("s")}
+    column_types.update({name: pyarrow.float64() for name in NUMERIC_COLUMNS})
+    column_types.update({name: pyarrow.string() for name in RISK_COLUMNS})
+    reader = pyarrow_csv.open_csv(
+        source,
+        read_options=pyarrow_csv.ReadOptions(block_size=ARROW_BLOCK_SIZE),
+        convert_options=pyarrow_csv.ConvertOptions(
+            column_types=column_types,
+            include_columns=LOG_COLUMNS,
+            null_values=["N/A", ""],
+            strings_can_be_null=True,
+            timestamp_parsers=[TIME_FORMAT]
+        )
+    )
+    try:
+        for batch in reader:
+            stamps = batch.column("DateTime")
+            if stamps.null_count:
+                batch = batch.filter(stamps.is_valid())
+            if not batch.num_rows:
+                continue
+            columns = {
+                "time": batch.column("DateTime").cast(pyarrow.int64()).to_numpy()
+            }
+            for name, metric in NUMERIC_COLUMNS.items():
+                columns[metric] = batch.column(name).to_numpy(zero_copy_only=False)
+            for name, kind in RISK_COLUMNS.items():
+                columns[kind] = batch.column(name).fill_null("").to_numpy(zero_copy_only=False).astype(str)
+            yield columns
+    finally:
+        source.close()
+
+
+def _csv_chunks(path, chunk_rows=CHUNK_ROWS):
+    """Column chunks read with the csv module and converted to numpy arrays."""
+    positions = {name: i for i, name in enumerate(LOG_COLUMNS)}
+    with open_segment(path) as f:
+        reader = csv.reader(f)
+        next(reader, None)  # header
+        while True:
+            block = list(islice(reader, chunk_rows))
+            if not block:
+                return
+            # Skip blank and truncated rows (e.g. a partial last line)
+            rows = [row for row in block if len(row) == len(LOG_COLUMNS) and row[0]]
+            if not rows:
+                continue
+            values = list(zip(*rows))
+            stamps = np.array(values[positions["DateTime"]]).astype("datetime64[s]")
+            columns = {"time": stamps.astype(np.int64)}
+            for name, metric in NUMERIC_COLUMNS.items():
+                column = np.array(values[positions[name]])
+                column = np.where((column == "N/A") | (column == ""), "nan", column)
+                columns[metric] = column.astype(np.float64)
+            for name, kind in RISK_COLUMNS.items():
+                columns[kind] = np.array(values[positions[name]])
+            yield columns
+
+
+def read_chunks(path, reader="auto", chunk_rows=CHUNK_ROWS):
+    """
+    Read an exposure log (plain, .gz or .zst) in column chunks.
+
+    Args:
+        path (str): Log file
+        reader (str): "arrow", "csv" or "auto" (arrow when pyarrow is installed)
+        chunk_rows (int): Rows per chunk of the csv reader
+
+    Yields:
+        dict: "time" (int64 seconds of the local time stamps, read as if UTC), one
+            float64 array per metric (NaN = N/A) and "blue"/"thermal" risk level arrays
+    """
+    if reader == "arrow" or (reader == "auto" and pyarrow is not None):
+        if pyarrow is None:
+            raise RuntimeError("pyarrow is required for --reader arrow")
+        return _arrow_chunks(path)
+    return _csv_chunks(path, chunk_rows)
+
+
+def _new_histograms():
+    return {name: [0.0] * (len(edges) - 1) for name, edges in HISTOGRAM_BINS.items()}
+
+
+def add_chunk(result, columns, previous_time, interval):
+    """
+    Fold one column chunk into a machine result.
+
+    A row stands for the time since the previous row, capped at two monitoring
+    intervals (the same rule the live rollups use for gaps).
+
+    Args:
+        result (dict): Machine result (see aggregate_machine)
+        columns (dict): Column chunk from read_chunks()
+        previous_time (int): Time of the row before this chunk (None at the start)
+        interval (float): Monitoring interval in seconds
+
+    Returns:
+        int: Time of the last row of the chunk
+    """
+    stamps = columns["time"]
+    if previous_time is None:
+        previous_time = stamps[0] - interval
+    previous = np.concatenate(([previous_time], stamps[:-1]))
+    seconds = np.clip(stamps - previous, 0, 2 * interval).astype(np.float64)
+
+    days, inverse = np.unique(stamps.astype("datetime64[s]").astype("datetime64[D]"), return_inverse=True)
+    inverse = inverse.ravel()
+    n = len(days)
+    samples = np.bincount(inverse, minlength=n)
+    day_seconds = np.bincount(inverse, weights=seconds, minlength=n)
+
+    metric_aggs = {}
+    for metric in NUMERIC_COLUMNS.values():
+        values = columns[metric]
+        valid = ~np.isnan(values)
+        index = inverse[valid]
+        values = values[valid]
+        mins = np.full(n, np.inf)
+        maxs = np.full(n, -np.inf)
+        np.minimum.at(mins, index, values)
+        np.maximum.at(maxs, index, values)
+        metric_aggs[metric] = (
+            np.bincount(index, minlength=n),
+            np.bincount(index, weights=values, minlength=n),
+            mins,
+            maxs
+        )
+
+    risk_seconds = {
+        kind: {level: np.bincount(inverse, weights=seconds * (columns[kind] == level), minlength=n)
+               for level in RISK_LEVELS}
+        for kind in RISK_COLUMNS.values()
+    }
+
+    for i, day in enumerate(days.astype(str)):
+        bucket = result["days"].get(day)
+        if bucket is None:
+            bucket = result["days"][day] = new_bucket()
+        bucket["samples"] += int(samples[i])
+        bucket["seconds"] += float(day_seconds[i])
+        for metric, (counts, sums, mins, maxs) in metric_aggs.items():
+            if not counts[i]:
+                continue
+            agg = bucket["metrics"][metric]
+            agg["count"] += int(counts[i])
+            agg["sum"] += float(sums[i])
+            agg["min"] = float(mins[i]) if agg["min"] is None else min(agg["min"], float(mins[i]))
+            agg["max"] = float(maxs[i]) if agg["max"] is None else max(agg["max"], float(maxs[i]))
+        for kind, levels in risk_seconds.items():
+            for level, level_seconds in levels.items():
+                bucket["risk_seconds"][kind][level] += float(level_seconds[i])
+
+    for name, edges in HISTOGRAM_BINS.items():
+        values = columns[name]
+        valid = ~np.isnan(values)
+        counts, _ = np.histogram(values[valid], bins=edges, weights=seconds[valid])
+        histogram = result["histograms"][name]
+        for i, value in enumerate(counts):
+            histogram[i] += float(value)
+
+    result["rows"] += len(stamps)
+    return int(stamps[-1])
+
+
+def aggregate_machine(task):
+    """
+    Aggregate all logs of one machine (runs in a worker process).
+
+    Args:
+        task (tuple): (machine name, log paths, monitoring interval, reader name)
+
+    Returns:
+        dict: machine, files, skipped, rows, days ({day: rollup bucket}),
+            histograms ({name: seconds per bin}) and errors
+    """
+    machine, paths, interval, reader = task
+    result = {
+        "machine": machine,
+        "files": 0,
+        "skipped": 0,
+        "rows": 0,
+        "days": {},
+        "histograms": _new_histograms(),
+        "errors": []
+    }
+    previous_time = None
+    for path in sorted(paths, key=_log_order):
+        if not is_log_file(path):
+            result["skipped"] += 1
+            continue
+        try:
+            for columns in read_chunks(path, reader):
+                previous_time = add_chunk(result, columns, previous_time, interval)
+            result["files"] += 1
+        except Exception as e:
+            result["errors"].append(f"{path}: {e}")
+    return result
+
+
+def _share(bucket, kind, level):
+    """Fraction of the monitored time spent in a risk level."""
+    if not bucket["seconds"]:
+        return None
+    return round(bucket["risk_seconds"][kind][level] / bucket["seconds"], 4)
+
+
+def _percentiles(values):
+    if not values:
+        return None
+    values = np.asarray(values)
+    return {
+        "p50": round(float(np.percentile(values, 50)), 4),
+        "p90": round(float(np.percentile(values, 90)), 4),
+        "max": round(float(values.max()), 4)
+    }
+
+
+def aggregate(inputs, output_dir, workers=None, interval=5.0, reader="auto"):
+    """
+    Aggregate the logs of a fleet of machines.
+
+    Args:
+        inputs (list): Directories (one subdirectory per machine) and/or log files
+        output_dir (str): Directory receiving machines.csv, machine_days.csv and fleet.json
+        workers (int): Worker processes (None = one per CPU core, 1 = in this process)
+        interval (float): Monitoring interval the logs were recorded with (seconds)
+        reader (str): "arrow", "csv" or "auto"
+
+    Returns:
+        dict: Fleet report (the content of fleet.json)
+    """
+    machines = discover_machines(inputs)
+    tasks = [(name, paths, interval, reader) for name, paths in sorted(machines.items())]
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(output_dir, exist_ok=True)
+
+    fleet_days = {}
+    fleet_total = new_bucket()
+    fleet_histograms = _new_histograms()
+    high_shares = {kind: [] for kind in RISK_COLUMNS.values()}
+    machines_by_risk = {kind: {level: 0 for level in RISK_LEVELS} for kind in RISK_COLUMNS.values()}
+    totals = {"machines": 0, "files": 0, "skipped_files": 0, "rows": 0, "errors": []}
+
+    summary_fields = list(summarize(new_bucket()))
+    machine_fields = ["machine", "files", "rows", "first_day", "last_day"] + summary_fields + [
+        "blue_high_share", "thermal_high_share"
+    ]
+
+    with open(os.path.join(output_dir, "machines.csv"), "w", newline="") as machines_file, \
+            open(os.path.join(output_dir, "machine_days.csv"), "w", newline="") as days_file:
+        machine_writer = csv.DictWriter(machines_file, fieldnames=machine_fields)
+        machine_writer.writeheader()
+        day_writer = csv.DictWriter(days_file, fieldnames=["machine", "day"] + summary_fields)
+        day_writer.writeheader()
+
+        if workers == 1 or len(tasks) <= 1:
+            results = map(aggregate_machine, tasks)
+            pool = None
+        else:
+            pool = multiprocessing.Pool(min(workers, len(tasks)))
+            # imap keeps machine order, so the output files are the same on every run
+            results = pool.imap(aggregate_machine, tasks)
+
+        try:
+            for result in results:
+                totals["files"] += result["files"]
+                totals["skipped_files"] += result["skipped"]
+                totals["errors"].extend(result["errors"])
+                if not result["rows"]:
+                    continue
+                totals["machines"] += 1
+                totals["rows"] += result["rows"]
+
+                machine_total = new_bucket()
+                for day, bucket in sorted(result["days"].items()):
+                    day_writer.writerow({"machine": result["machine"], "day": day, **summarize(bucket)})
+                    merge_buckets(machine_total, bucket)
+                    merge_buckets(fleet_days.setdefault(day, new_bucket()), bucket)
+                merge_buckets(fleet_total, machine_total)
+                for name, histogram in result["histograms"].items():
+                    for i, value in enumerate(histogram):
+                        fleet_histograms[name][i] += value
+
+                row = {
+                    "machine": result["machine"],
+                    "files": result["files"],
+                    "rows": result["rows"],
+                    "first_day": min(result["days"]),
+                    "last_day": max(result["days"]),
+                    **summarize(machine_total)
+                }
+                for kind in RISK_COLUMNS.values():
+                    share = _share(machine_total, kind, "HIGH")
+                    row[f"{kind}_high_share"] = share
+                    if share is not None:
+                        high_shares[kind].append(share)
+                    # Machine's dominant risk level by time
+                    levels = machine_total["risk_seconds"][kind]
+                    if any(levels.values()):
+                        machines_by_risk[kind][max(levels, key=levels.get)] += 1
+                machine_writer.writerow(row)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+    report = dict(totals)
+    report["total"] = summarize(fleet_total)
+    report["days"] = {day: summarize(bucket) for day, bucket in sorted(fleet_days.items())}
+    report["distributions"] = {
+        "risk_share": {
+            kind: {level: _share(fleet_total, kind, level) for level in RISK_LEVELS}
+            for kind in RISK_COLUMNS.values()
+        },
+        "histograms": {
+            name: {"edges": edges, "seconds": [round(value, 1) for value in fleet_histograms[name]]}
+            for name, edges in HISTOGRAM_BINS.items()
+        },
+        "machines_by_dominant_risk": machines_by_risk,
+        "machine_high_share": {kind: _percentiles(values) for kind, values in high_shares.items()}
+    }
+    with open(os.path.join(output_dir, "fleet.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Aggregate exposure logs from many machines")
+    parser.add_argument("inputs", nargs="+", help="Directories with one subdirectory per machine, or log files")
+    parser.add_argument("--output", default="fleet_report", help="Output directory")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU core)")
+    parser.add_argument("--interval", type=float, default=5.0,
+                        help="Monitoring interval the logs were recorded with (seconds)")
+    parser.add_argument("--reader", choices=("auto", "arrow", "csv"), default="auto",
+                        help="Log reader (auto = pyarrow when installed)")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    start = time.perf_counter()
+    report = aggregate(args.inputs, args.output, args.workers, args.interval, args.reader)
+    elapsed = time.perf_counter() - start
+
+    for error in report["errors"]:
+        print(f"Error: {error}")
+    total = report["total"]
+    print(f"{report['machines']} machines, {report['files']} logs, {report['rows']} rows "
+          f"({report['skipped_files']} other files skipped) in {elapsed:.1f} s")
+    print(f"Monitored {total['seconds'] / 3600:.1f} h; average distance {total['distance_avg']} cm, "
+          f"blue light {total['blue_score_avg']}, thermal {total['thermal_score_avg']}")
+    for kind, shares in report["distributions"]["risk_share"].items():
+        print(f"{kind.capitalize()} risk: " + ", ".join(
+            f"{level} {share * 100:.1f}%" for level, share in shares.items() if share is not None
+        ))
+    print(f"Report written to {args.output}/")
+
+
+if __name__ == "__main__":
+    main()
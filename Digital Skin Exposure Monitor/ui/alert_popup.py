@@ -1,15 +1,168 @@
 """
 Alert Popup Module
 Displays alert notifications when high exposure is detected.
+Alerts raised while monitoring go through an AlertManager, which queues them
+and shows non-modal toasts inside the dashboard window that dismiss themselves,
+so the monitoring loop never waits for the user.
 """
 
+import queue
 import tkinter as tk
 from tkinter import messagebox
 
+# Toast colours per alert level
+LEVEL_COLORS = {
+    "info": "#3498db",
+    "warning": "#e67e22",
+    "error": "#c0392b"
+}
+
+
+class AlertManager:
+    """Queue of alerts shown as stacked, auto-dismissing toasts in a Tk window."""
+
+    def __init__(self, root, display_ms=8000, max_visible=3, poll_ms=100):
+        """
+        Args:
+            root (tk.Tk): Window the toasts are shown in
+            display_ms (int): Time before a toast is dismissed automatically
+            max_visible (int): Maximum toasts on screen (oldest are dropped first)
+            poll_ms (int): How often queued alerts are picked up
+        """
+        self.root = root
+        self.display_ms = display_ms
+        self.max_visible = max_visible
+        self.poll_ms = poll_ms
+
+        self._queue = queue.Queue()
+        self._toasts = []
+        self._poll_id = None
+        self._poll()
+
+    def notify(self, title, message, level="warning"):
+        """
+        Queue an alert. Safe to call from any thread; never blocks.
+
+        Args:
+            title (str): Alert title
+            message (str): Alert message
+            level (str): "info", "warning" or "error"
+        """
+        self._queue.put((title, message, level))
+
+    def _poll(self):
+        """Show queued alerts (runs on the Tk main loop)."""
+        try:
+            while True:
+                try:
+                    title, message, level = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                self._show(title, message, level)
+            self._poll_id = self.root.after(self.poll_ms, self._poll)
+        except tk.TclError:
+            # Window destroyed
+            self._poll_id = None
+
+    def _show(self, title, message, level):
+        """Create a toast for one alert."""
+        # A repeated alert replaces the visible one instead of stacking up
+        for toast in list(self._toasts):
+            if toast["title"] == title and toast["message"] == message:
+                self.dismiss(toast)
+        while len(self._toasts) >= self.max_visible:
+            self.dismiss(self._toasts[0])
+
+        color = LEVEL_COLORS.get(level, LEVEL_COLORS["warning"])
+        frame = tk.Frame(self.root, bg=color, bd=0, padx=2, pady=2)
+        body = tk.Frame(frame, bg="#ffffff", padx=10, pady=6)
+        body.pack(fill=tk.BOTH, expand=True)
+
+        header = tk.Frame(body, bg="#ffffff")
+        header.pack(fill=tk.X)
+        tk.Label(
+            header,
+            text=title,
+            font=("Arial", 10, "bold"),
+            bg="#ffffff",
+            fg=color
+        ).pack(side=tk.LEFT)
+
+        toast = {"frame": frame, "title": title, "message": message, "after_id": None}
+        tk.Button(
+            header,
+            text="×",
+            command=lambda: self.dismiss(toast),
+            font=("Arial", 10, "bold"),
+            bg="#ffffff",
+            fg="#7f8c8d",
+            relief=tk.FLAT,
+            bd=0,
+            cursor="hand2"
+        ).pack(side=tk.RIGHT)
+
+        tk.Label(
+            body,
+            text=message,
+            font=("Arial", 9),
+            bg="#ffffff",
+            fg="#2c3e50",
+            justify=tk.LEFT,
+            wraplength=320
+        ).pack(anchor=tk.W, pady=(4, 0))
+
+        toast["after_id"] = self.root.after(self.display_ms, self.dismiss, toast)
+        self._toasts.append(toast)
+        self._layout()
+
+    def dismiss(self, toast):
+        """Remove a toast (no-op if it is already gone)."""
+        if toast not in self._toasts:
+            return
+        self._toasts.remove(toast)
+        try:
+            if toast["after_id"] is not None:
+                self.root.after_cancel(toast["after_id"])
+            toast["frame"].destroy()
+            self._layout()
+        except tk.TclError:
+            pass
+
+    def _layout(self):
+        """Stack toasts in the bottom-right corner, newest at the bottom."""
+        offset = 50  # clear of the status bar
+        for toast in reversed(self._toasts):
+            frame = toast["frame"]
+            frame.update_idletasks()
+            frame.place(relx=1.0, rely=1.0, anchor="se", x=-20, y=-offset)
+            frame.lift()
+            offset += frame.winfo_reqheight() + 8
+
+    def clear(self):
+        """Dismiss all toasts and drop queued alerts."""
+        while not self._queue.empty():
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        for toast in list(self._toasts):
+            self.dismiss(toast)
+
+    def close(self):
+        """Stop polling and remove all toasts."""
+        if self._poll_id is not None:
+            try:
+                self.root.after_cancel(self._poll_id)
+            except tk.TclError:
+                pass
+            self._poll_id = None
+        self.clear()
+
 
 def show_alert(title, message):
     """
-    Display an alert popup.
+    Display a modal alert popup (blocks until dismissed).
+    Monitoring alerts use AlertManager instead.
     
     Args:
         title (str): Alert title
@@ -34,4 +187,3 @@ def show_info(title, message):
     root.withdraw()
     messagebox.showinfo(title, message)
     root.destroy()
-
@@ -3,12 +3,19 @@ Dashboard UI Module
 Main GUI dashboard for displaying real-time monitoring metrics.
 """
 
+import sys
 import tkinter as tk
 from tkinter import ttk
 from datetime import datetime
-import cv2
-from PIL import Image, ImageTk
-import numpy as np
+
+from ui.alert_popup import AlertManager
+
+# Preview poll period in ms (redraws happen only when a new frame is captured)
+PREVIEW_POLL_MS = 15
+
+# Quarter-second polls spent waiting for the background camera start before
+# the preview reports the camera as unavailable
+CAMERA_WAIT_POLLS = 40
 
 
 class Dashboard(tk.Tk):
@@ -23,6 +30,9 @@ class Dashboard(tk.Tk):
         
         # Initialize UI components
         self.create_widgets()
+
+        # Non-modal alert toasts shown inside this window
+        self.alerts = AlertManager(self)
         
         # Current metrics storage
         self.current_data = {}
@@ -31,6 +41,8 @@ class Dashboard(tk.Tk):
         self.camera_cap = None
         self.camera_updating = False
         self._camera_error_shown = False
+        self._last_preview_frame_id = 0
+        self._camera_wait_polls = 0
 
     def create_widgets(self):
         """Create and layout all UI widgets."""
@@ -170,8 +182,8 @@ class Dashboard(tk.Tk):
         )
         self.camera_label.pack(fill=tk.BOTH, expand=True)
 
-        # Start camera feed after a short delay to ensure camera is initialized
-        self.after(500, self.start_camera_feed)
+        # Start the camera feed once the background startup has opened the camera
+        self.after(250, self.start_camera_feed)
 
         # Exposure scores section
         scores_frame = tk.LabelFrame(
@@ -258,6 +270,16 @@ class Dashboard(tk.Tk):
         )
         self.time_label.pack(side=tk.RIGHT, padx=15, pady=10)
 
+        # Today's aggregates (from the rollups, no log scan)
+        self.today_label = tk.Label(
+            status_frame,
+            text="",
+            font=("Arial", 9),
+            bg="#34495e",
+            fg="#ecf0f1"
+        )
+        self.today_label.pack(side=tk.RIGHT, padx=15, pady=10)
+
         # Update time label
         self.update_time()
 
@@ -405,8 +427,26 @@ class Dashboard(tk.Tk):
         risk_type_bg = {"LOW": "#d5f4e6", "MODERATE": "#fef5e7", "HIGH": "#fadbd8"}.get(overall_risk, "#ecf0f1")
         self.risk_type_display.config(text=overall_risk, fg=risk_type_color, bg=risk_type_bg)
 
+        # Update today's summary
+        today = data.get("today")
+        if today:
+            avg_distance = today.get("distance_avg")
+            avg_text = f"{avg_distance:.1f} cm" if avg_distance is not None else "--"
+            self.today_label.config(
+                text=f"Today: avg distance {avg_text} | "
+                     f"blue HIGH {today.get('blue_high_s', 0) / 60:.0f} min | "
+                     f"thermal HIGH {today.get('thermal_high_s', 0) / 60:.0f} min | "
+                     f"peak blue {today.get('blue_score_max') or 0:.1f}"
+            )
+
         # Update status
-        if distance and brightness:
+        faces = data.get("faces")
+        if faces and len(faces) > 1:
+            nearest = min(faces, key=lambda face: face["distance"])
+            self.status_label.config(
+                text=f"✓ Monitoring {len(faces)} faces (nearest: #{nearest['track_id']})"
+            )
+        elif distance and brightness:
             self.status_label.config(text="✓ Monitoring Active")
         elif not distance:
             self.status_label.config(text="⚠ Face not detected - Position yourself in front of camera")
@@ -429,50 +469,70 @@ class Dashboard(tk.Tk):
         else:
             return "UNKNOWN"
 
+    def show_startup_status(self, text):
+        """Show startup progress (camera open, model loading) in the status bar."""
+        self.status_label.config(text=text)
+
     def start_camera_feed(self):
         """Start the camera feed update loop."""
-        try:
-            from inputs.distance import initialize_camera
-            # Ensure camera is initialized
-            cap = initialize_camera()
-            if cap is None or not cap.isOpened():
-                self.camera_label.config(text="Camera not available", fg="white", bg="#2c3e50")
-                # Retry after 2 seconds
-                self.after(2000, self.start_camera_feed)
-                return
-            # Reset error flag
-            self._camera_error_shown = False
-            self.update_camera_feed()
-        except Exception as e:
-            self.camera_label.config(text=f"Camera error: {str(e)[:50]}", fg="white", bg="#2c3e50")
+        # The camera is opened in the background (core.startup.warm_up); wait
+        # for it here instead of blocking the window. inputs.camera is only
+        # looked up once loaded, so OpenCV is never imported on the UI thread.
+        camera = None
+        if "inputs.camera" in sys.modules:
+            from inputs.camera import get_camera
+            camera = get_camera()
+        if camera is None and self._camera_wait_polls < CAMERA_WAIT_POLLS:
+            self._camera_wait_polls += 1
+            self.camera_label.config(text="Starting camera...", fg="white", bg="#2c3e50")
+            self.after(250, self.start_camera_feed)
+            return
+        if camera is None or not camera.is_opened():
+            self.camera_label.config(text="Camera not available", fg="white", bg="#2c3e50")
             # Retry after 2 seconds
             self.after(2000, self.start_camera_feed)
+            return
+        # Reset error flag
+        self._camera_error_shown = False
+        self.update_camera_feed()
 
     def update_camera_feed(self):
         """Update the camera feed display - called continuously."""
         try:
-            # Import here to avoid circular imports - access the global cap variable
-            import inputs.distance as distance_module
+            import cv2
+            from PIL import Image, ImageTk
+            from inputs.camera import get_camera
+
+            # The capture thread owns the device; we only read its latest frame
+            camera = get_camera()
 
-            # Get the camera instance
-            cap = distance_module.cap
+            if camera is not None and camera.is_opened():
+                frame_id, timestamp, frame = camera.read_latest()
 
-            if cap is not None and cap.isOpened():
-                # Read a fresh frame from the camera
-                ret, frame = cap.read()
+                if frame_id == self._last_preview_frame_id:
+                    # No new frame since the last redraw
+                    pass
+                elif frame is not None and frame.size > 0:
+                    self._last_preview_frame_id = frame_id
 
-                if ret and frame is not None and frame.size > 0:
-                    # Resize frame to fit display (maintain aspect ratio)
-                    height, width = frame.shape[:2]
+                    # Resize frame to fit display
                     display_width = 320
                     display_height = 240
-
-                    # Resize maintaining aspect ratio
                     frame = cv2.resize(frame, (display_width, display_height))
 
                     # Mirror the image horizontally (like a mirror)
                     frame = cv2.flip(frame, 1)
 
+                    # Filtered distance at this frame's capture time (detection
+                    # runs less often; the filter predicts in between)
+                    from inputs.distance import get_predicted_distance
+                    distance = get_predicted_distance(timestamp)
+                    if distance is not None:
+                        # BGR: red when too close, like the distance metric
+                        color = (60, 76, 231) if distance < 50 else (113, 204, 46)
+                        cv2.putText(frame, f"{distance:.0f} cm", (10, 28), cv2.FONT_HERSHEY_SIMPLEX,
+                                    0.8, color, 2, cv2.LINE_AA)
+
                     # Convert BGR to RGB for display
                     rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
 
@@ -491,16 +551,10 @@ class Dashboard(tk.Tk):
                         self.camera_label.config(text="Camera read failed", fg="white", bg="#2c3e50")
                         self._camera_error_shown = True
             else:
-                # Camera not initialized - try to reinitialize
+                # Camera stopped - the monitoring cycle reopens it
                 if not self._camera_error_shown:
                     self.camera_label.config(text="Initializing camera...", fg="white", bg="#2c3e50")
                     self._camera_error_shown = True
-                # Try to initialize camera
-                try:
-                    from inputs.distance import initialize_camera
-                    initialize_camera()
-                except:
-                    pass
         except Exception as e:
             # Only show error once
             if not self._camera_error_shown:
@@ -511,8 +565,9 @@ class Dashboard(tk.Tk):
                     pass
 
         # Always schedule next update - continue updating even if there's an error
-        # This ensures the feed keeps trying to update
-        self.after(50, self.update_camera_feed)  # Update every 50ms for smoother feed (20 fps)
+        # Polling is cheap now (no camera read here), so poll faster than the
+        # camera frame rate and only redraw when a new frame has arrived
+        self.after(PREVIEW_POLL_MS, self.update_camera_feed)
     
     def update_time(self):
         """Update the time label in status bar."""
@@ -533,7 +588,9 @@ class Dashboard(tk.Tk):
     def on_closing(self):
         """Handle window closing event."""
         self.camera_updating = False
-        from core.controller import shutdown
+        self.alerts.close()
+        from core.controller import shutdown, set_alert_handler
+        set_alert_handler(None)
         shutdown()
         self.destroy()
 
@@ -1,14 +1,23 @@
 """
 History View Module
 Displays historical exposure data from CSV logs.
+The table is virtualized: only the rows visible in the window exist as
+Treeview items, and pages are read through an offset index over the log,
+so opening and scrolling cost the same for any log size. Rows rotated into
+compressed segments come first in the table, followed by the live log.
 """
 
 import tkinter as tk
 from tkinter import ttk
-import csv
 import os
 from datetime import datetime
 
+# Treeview row height in pixels (also used to work out how many rows fit)
+ROW_HEIGHT = 25
+
+# Live-tail refresh period in milliseconds
+LIVE_REFRESH_MS = 2000
+
 
 class HistoryView(tk.Toplevel):
     """Window for viewing historical exposure data."""
@@ -21,8 +30,20 @@ class HistoryView(tk.Toplevel):
         self.configure(bg="#f0f0f0")
         
         self.log_file = "data/exposure_log.csv"
+        
+        # Virtual table state: offset index and first visible row
+        self.index = None
+        self.first_row = 0
+        self.visible_rows = 20
+        
+        # Live tail: periodically append new rows
+        self.live_var = tk.BooleanVar(value=True)
+        self._live_job = None
+        
         self.create_widgets()
         self.load_data()
+        self.schedule_live_refresh()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
         
     def create_widgets(self):
         """Create UI widgets for history view."""
@@ -52,7 +73,7 @@ class HistoryView(tk.Toplevel):
         refresh_btn = tk.Button(
             toolbar,
             text="Refresh",
-            command=self.load_data,
+            command=self.refresh_data,
             bg="#3498db",
             # fg="white",
             fg="#2c3e50",
@@ -83,13 +104,47 @@ class HistoryView(tk.Toplevel):
 
         clear_btn.pack(side=tk.LEFT)
         
+        live_check = tk.Checkbutton(
+            toolbar,
+            text="Live",
+            variable=self.live_var,
+            command=self.schedule_live_refresh,
+            font=("Arial", 10),
+            bg="#f0f0f0",
+            fg="#2c3e50",
+            activebackground="#f0f0f0"
+        )
+        live_check.pack(side=tk.LEFT, padx=(10, 0))
+        
+        # Position indicator
+        self.position_label = tk.Label(
+            toolbar,
+            text="",
+            font=("Arial", 10),
+            bg="#f0f0f0",
+            fg="#7f8c8d"
+        )
+        self.position_label.pack(side=tk.RIGHT)
+        
+        # Aggregated summary (served from the rollups, not the raw log)
+        self.summary_label = tk.Label(
+            content_frame,
+            text="",
+            font=("Arial", 10),
+            bg="#f0f0f0",
+            fg="#2c3e50",
+            anchor="w",
+            justify=tk.LEFT
+        )
+        self.summary_label.pack(fill=tk.X, pady=(0, 10))
+        
         # Treeview for data table
         tree_frame = tk.Frame(content_frame)
         tree_frame.pack(fill=tk.BOTH, expand=True)
         
-        # Scrollbars
-        v_scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL)
-        v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        # Scrollbars (the vertical one scrolls the virtual row window, not the tree)
+        self.v_scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.on_scroll)
+        self.v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
         h_scrollbar = ttk.Scrollbar(tree_frame, orient=tk.HORIZONTAL)
         h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
@@ -100,11 +155,9 @@ class HistoryView(tk.Toplevel):
             tree_frame,
             columns=columns,
             show="headings",
-            yscrollcommand=v_scrollbar.set,
             xscrollcommand=h_scrollbar.set
         )
         
-        v_scrollbar.config(command=self.tree.yview)
         h_scrollbar.config(command=self.tree.xview)
         
         # Configure style
@@ -114,7 +167,7 @@ class HistoryView(tk.Toplevel):
                        background="#ffffff",
                        foreground="#2c3e50",
                        fieldbackground="#ffffff",
-                       rowheight=25,
+                       rowheight=ROW_HEIGHT,
                        font=("Arial", 10))
         style.configure("Treeview.Heading",
                        background="#34495e",
@@ -142,44 +195,205 @@ class HistoryView(tk.Toplevel):
         self.tree.column("BlueRisk", width=110, anchor=tk.CENTER)
         self.tree.column("ThermalRisk", width=110, anchor=tk.CENTER)
         
+        # Risk color coding
+        self.tree.tag_configure("high", background="#fadbd8")
+        self.tree.tag_configure("moderate", background="#fef5e7")
+        
         self.tree.pack(fill=tk.BOTH, expand=True)
         
+        # Resize and scroll events move the virtual window
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<MouseWheel>", self.on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll_to(self.first_row - 3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_to(self.first_row + 3))
+        self.tree.bind("<Prior>", lambda e: self.scroll_to(self.first_row - self.visible_rows))
+        self.tree.bind("<Next>", lambda e: self.scroll_to(self.first_row + self.visible_rows))
+        self.tree.bind("<Home>", lambda e: self.scroll_to(0))
+        self.tree.bind("<End>", lambda e: self.scroll_to(len(self.index or [])))
+        
+    def create_index(self):
+        """Create the row index for the active storage backend."""
+        from core.controller import get_storage_backend, DB_FILE, SEGMENT_DIR
+        from core.log_index import SegmentedLogIndex, SQLiteLogIndex
+
+        if get_storage_backend() == "sqlite":
+            return SQLiteLogIndex(DB_FILE)
+        return SegmentedLogIndex(self.log_file, SEGMENT_DIR)
+
     def load_data(self):
-        """Load data from CSV file into the treeview."""
-        # Clear existing data
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-            
-        # Load from CSV
-        if not os.path.exists(self.log_file):
-            return
+        """Index the exposure log and show the first page."""
+        # Make sure rows buffered by the log writer are on disk
+        from core.controller import flush_log
+        flush_log()
             
         try:
-            with open(self.log_file, 'r') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    values = (
-                        row.get("DateTime", "N/A"),
-                        row.get("Distance_cm", "N/A"),
-                        row.get("Brightness", "N/A"),
-                        row.get("BlueLightScore", "N/A"),
-                        row.get("ThermalScore", "N/A"),
-                        row.get("BlueRisk", "N/A"),
-                        row.get("ThermalRisk", "N/A")
+            self.index = self.create_index()
+            self.index.build()
+        except Exception as e:
+            print(f"Error loading history: {e}")
+            self.index = None
+        self.scroll_to(self.first_row)
+        self.update_summary()
+
+    def update_summary(self):
+        """Show today's and the last 7 days' aggregates from the rollups."""
+        from datetime import timedelta
+        from core.controller import get_rollup_store, get_storage_backend, SEGMENT_DIR
+        from core.log_rotation import load_manifest
+
+        try:
+            store = get_rollup_store()
+            today = datetime.now().strftime("%Y-%m-%d")
+            week_start = (datetime.now() - timedelta(days=6)).strftime("%Y-%m-%d")
+            parts = []
+            for label, summary in (("Today", store.total("day", start=today)),
+                                   ("Last 7 days", store.total("day", start=week_start))):
+                if not summary["samples"]:
+                    continue
+                avg_distance = summary["distance_avg"]
+                parts.append(
+                    f"{label}: {summary['seconds'] / 3600:.1f} h monitored, "
+                    f"avg distance {avg_distance if avg_distance is not None else '--'} cm, "
+                    f"blue HIGH {summary['blue_high_s'] / 60:.0f} min, "
+                    f"thermal HIGH {summary['thermal_high_s'] / 60:.0f} min, "
+                    f"peak blue {summary['blue_score_max'] or 0}"
+                )
+            if get_storage_backend() == "csv":
+                segments = load_manifest(SEGMENT_DIR)
+                if segments:
+                    parts.append(
+                        f"Including {sum(s['rows'] for s in segments)} archived rows in "
+                        f"{len(segments)} compressed segments ({segments[0]['start'][:10]} to "
+                        f"{segments[-1]['end'][:10]}) in {SEGMENT_DIR}"
                     )
-                    item = self.tree.insert("", tk.END, values=values)
-                    
-                    # Color code risk levels
-                    blue_risk = row.get("BlueRisk", "").upper()
-                    thermal_risk = row.get("ThermalRisk", "").upper()
-                    
-                    # Apply tags based on risk levels
-                    if blue_risk == "HIGH" or thermal_risk == "HIGH":
-                        self.tree.set(item, "#0", "")  # Apply color to first column
-                    elif blue_risk == "MODERATE" or thermal_risk == "MODERATE":
-                        self.tree.set(item, "#0", "")  # Apply color to first column
+            self.summary_label.config(text="\n".join(parts) or "No aggregated data yet")
+        except Exception as e:
+            print(f"Error loading rollups: {e}")
+
+    def refresh_data(self, flush=True):
+        """
+        Append rows logged since the last load/refresh.
+        Only the new part of the log is read; truncation or rotation of the
+        log triggers a full re-index. The view follows the tail when it was
+        already showing the last rows.
+
+        Args:
+            flush (bool): Write rows buffered by the log writer first. The live
+                tail passes False and shows rows as the writer flushes them.
+        """
+        if self.index is None:
+            self.load_data()
+            return
+
+        if flush:
+            from core.controller import flush_log
+            flush_log()
+
+        old_total = len(self.index)
+        at_end = self.first_row + self.visible_rows >= old_total
+
+        try:
+            new_rows, rebuilt = self.index.update()
+        except Exception as e:
+            print(f"Error refreshing history: {e}")
+            return
+
+        if rebuilt:
+            self.scroll_to(0 if not at_end else len(self.index))
+        elif new_rows:
+            self.scroll_to(len(self.index) if at_end else self.first_row)
+        if rebuilt or new_rows:
+            self.update_summary()
+
+    def schedule_live_refresh(self):
+        """Start or stop the live-tail timer according to the Live checkbox."""
+        if self._live_job is not None:
+            self.after_cancel(self._live_job)
+            self._live_job = None
+        if self.live_var.get():
+            self._live_job = self.after(LIVE_REFRESH_MS, self._live_refresh)
+
+    def _live_refresh(self):
+        """Timer callback for the live tail."""
+        self._live_job = None
+        # No flush: forcing writes (and fsyncs) every LIVE_REFRESH_MS would
+        # defeat the writer's batching and stall the UI on slow disks
+        self.refresh_data(flush=False)
+        self.schedule_live_refresh()
+
+    def on_close(self):
+        """Stop the live-tail timer and close the window."""
+        self.live_var.set(False)
+        self.schedule_live_refresh()
+        self.destroy()
+
+    def scroll_to(self, first_row):
+        """
+        Show the rows starting at ``first_row`` (clamped to the log size).
+        Only the visible rows are read and materialized as Treeview items.
+        """
+        total = len(self.index) if self.index is not None else 0
+        self.first_row = max(0, min(first_row, total - self.visible_rows))
+
+        try:
+            rows = self.index.read_rows(self.first_row, self.visible_rows) if total else []
         except Exception as e:
             print(f"Error loading history: {e}")
+            rows = []
+
+        # Reuse existing items instead of deleting and inserting
+        items = self.tree.get_children()
+        for i, values in enumerate(rows):
+            tags = self.risk_tags(values)
+            if i < len(items):
+                self.tree.item(items[i], values=values, tags=tags)
+            else:
+                self.tree.insert("", tk.END, values=values, tags=tags)
+        if len(items) > len(rows):
+            self.tree.delete(*items[len(rows):])
+
+        # Position the scrollbar thumb over the visible window
+        if total:
+            self.v_scrollbar.set(self.first_row / total, min(1.0, (self.first_row + len(rows)) / total))
+            self.position_label.config(
+                text=f"Rows {self.first_row + 1:,}-{self.first_row + len(rows):,} of {total:,}"
+            )
+        else:
+            self.v_scrollbar.set(0.0, 1.0)
+            self.position_label.config(text="No data")
+
+    def risk_tags(self, values):
+        """Treeview tags for color coding a row by its highest risk level."""
+        blue_risk = str(values[5] if len(values) > 5 else "").upper()
+        thermal_risk = str(values[6] if len(values) > 6 else "").upper()
+        if blue_risk == "HIGH" or thermal_risk == "HIGH":
+            return ("high",)
+        if blue_risk == "MODERATE" or thermal_risk == "MODERATE":
+            return ("moderate",)
+        return ()
+
+    def on_scroll(self, *args):
+        """Scrollbar command: ("moveto", fraction) or ("scroll", n, "units"/"pages")."""
+        total = len(self.index) if self.index is not None else 0
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * total))
+        elif args[0] == "scroll":
+            step = self.visible_rows if args[2] == "pages" else 1
+            self.scroll_to(self.first_row + int(args[1]) * step)
+
+    def on_mousewheel(self, event):
+        """Scroll the virtual window with the mouse wheel."""
+        steps = -int(event.delta / 120) if abs(event.delta) >= 120 else (-1 if event.delta > 0 else 1)
+        self.scroll_to(self.first_row + steps * 3)
+        return "break"
+
+    def on_resize(self, event):
+        """Recompute how many rows fit and refill the window."""
+        # One row's worth of height is taken by the column headings
+        visible = max(1, event.height // ROW_HEIGHT - 1)
+        if visible != self.visible_rows:
+            self.visible_rows = visible
+            self.scroll_to(self.first_row)
     
     def clear_all_data(self):
         """Clear all historical data from the CSV file."""
@@ -194,23 +408,12 @@ class HistoryView(tk.Toplevel):
         
         if result:
             try:
-                # Clear the treeview
-                for item in self.tree.get_children():
-                    self.tree.delete(item)
-                
-                # Clear the CSV file but keep the header
-                if os.path.exists(self.log_file):
-                    with open(self.log_file, 'w', newline="") as f:
-                        writer = csv.writer(f)
-                        writer.writerow([
-                            "DateTime",
-                            "Distance_cm",
-                            "Brightness",
-                            "BlueLightScore",
-                            "ThermalScore",
-                            "BlueRisk",
-                            "ThermalRisk"
-                        ])
+                # Clear the CSV file but keep the header (also drops rows
+                # still buffered by the log writer)
+                from core.controller import clear_log
+                clear_log()
+                self.first_row = 0
+                self.load_data()
                 
                 messagebox.showinfo("Success", "All historical data has been cleared.")
             except Exception as e:
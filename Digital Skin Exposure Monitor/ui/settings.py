@@ -21,6 +21,13 @@ class SettingsWindow(tk.Toplevel):
         from core.controller import get_monitoring_interval, get_alert_cooldown
         self.current_interval = get_monitoring_interval()
         self.current_cooldown = get_alert_cooldown()
+        from inputs.distance import get_distance_backend_name, get_distance_filter_name
+        from inputs.distance_backends import available_backends
+        from inputs.distance_filter import available_filters
+        self.current_backend = get_distance_backend_name()
+        self.backend_names = available_backends()
+        self.current_filter = get_distance_filter_name()
+        self.filter_names = available_filters()
         
         self.create_widgets()
         
@@ -97,6 +104,52 @@ class SettingsWindow(tk.Toplevel):
         )
         cooldown_entry.pack(side=tk.RIGHT)
         
+        # Distance detection backend
+        backend_frame = tk.Frame(content_frame, bg="#f0f0f0")
+        backend_frame.pack(fill=tk.X, pady=15)
+        
+        tk.Label(
+            backend_frame,
+            text="Distance Detection Backend:",
+            font=("Arial", 11),
+            bg="#f0f0f0",
+            fg="#2c3e50",
+        ).pack(side=tk.LEFT)
+        
+        self.backend_var = tk.StringVar(value=self.current_backend)
+        backend_combo = ttk.Combobox(
+            backend_frame,
+            textvariable=self.backend_var,
+            values=self.backend_names,
+            state="readonly",
+            width=18,
+            font=("Arial", 11)
+        )
+        backend_combo.pack(side=tk.RIGHT)
+        
+        # Temporal distance filter
+        filter_frame = tk.Frame(content_frame, bg="#f0f0f0")
+        filter_frame.pack(fill=tk.X, pady=15)
+        
+        tk.Label(
+            filter_frame,
+            text="Distance Smoothing Filter:",
+            font=("Arial", 11),
+            bg="#f0f0f0",
+            fg="#2c3e50",
+        ).pack(side=tk.LEFT)
+        
+        self.filter_var = tk.StringVar(value=self.current_filter)
+        filter_combo = ttk.Combobox(
+            filter_frame,
+            textvariable=self.filter_var,
+            values=self.filter_names,
+            state="readonly",
+            width=18,
+            font=("Arial", 11)
+        )
+        filter_combo.pack(side=tk.RIGHT)
+        
         # Info section
         info_frame = tk.LabelFrame(
             content_frame,
@@ -207,7 +260,17 @@ class SettingsWindow(tk.Toplevel):
             set_monitoring_interval(interval)
             set_alert_cooldown(cooldown)
             
-            messagebox.showinfo("Success", f"Settings saved successfully!\n\nMonitoring Interval: {interval} seconds\nAlert Cooldown: {cooldown} seconds")
+            # Save distance backend
+            from inputs.distance import set_distance_backend
+            backend = self.backend_var.get()
+            set_distance_backend(backend)
+            
+            # Save distance filter
+            from inputs.distance import set_distance_filter
+            distance_filter = self.filter_var.get()
+            set_distance_filter(distance_filter)
+            
+            messagebox.showinfo("Success", f"Settings saved successfully!\n\nMonitoring Interval: {interval} seconds\nAlert Cooldown: {cooldown} seconds\nDistance Backend: {backend}\nDistance Filter: {distance_filter}")
             self.destroy()
             
         except ValueError as e:
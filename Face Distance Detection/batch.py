@@ -0,0 +1,220 @@
+# batch.py
+# Headless distance estimation over recorded video files and image folders
+
+import argparse
+import csv
+import gzip
+import multiprocessing
+import os
+import time
+
+import cv2
+from distance_estimator import estimate_distance, reset_tracking
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp")
+
+OUTPUT_COLUMNS = ["source", "frame", "distance_cm", "pixel_distance"]
+
+# Frames per work unit when processing with several worker processes
+CHUNK_FRAMES = 300
+
+
+def collect_sources(paths):
+    """Expand input paths into (kind, path) pairs: video files or image folders."""
+    sources = []
+    for path in paths:
+        if os.path.isdir(path):
+            names = sorted(os.listdir(path))
+            if any(name.lower().endswith(IMAGE_EXTENSIONS) for name in names):
+                sources.append(("images", path))
+            for name in names:
+                if name.lower().endswith(VIDEO_EXTENSIONS):
+                    sources.append(("video", os.path.join(path, name)))
+        elif path.lower().endswith(VIDEO_EXTENSIONS):
+            sources.append(("video", path))
+        else:
+            print(f"Skipping unsupported input: {path}")
+    return sources
+
+
+def iter_video_frames(path, stride=1, start=0, end=None):
+    """
+    Yield (frame_index, frame) from a video, decoding only every `stride`-th frame.
+    `start`/`end` limit the frame range (end exclusive, None = to the end of the video).
+    """
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        print(f"Could not open video: {path}")
+        return
+
+    if start:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    index = start
+    try:
+        while end is None or index < end:
+            if index % stride:
+                # grab() skips the frame without the cost of decoding it
+                if not cap.grab():
+                    break
+            else:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                yield index, frame
+            index += 1
+    finally:
+        cap.release()
+
+
+def list_images(folder):
+    """Image file names of a folder in name order."""
+    return [name for name in sorted(os.listdir(folder)) if name.lower().endswith(IMAGE_EXTENSIONS)]
+
+
+def iter_image_frames(folder, stride=1, start=0, end=None):
+    """Yield (frame_index, frame) for the images of a folder in name order (optionally a range)."""
+    names = list_images(folder)
+    end = len(names) if end is None else min(end, len(names))
+    # Keep the stride aligned to the whole folder, not to the range
+    first = start + (-start % stride)
+    for index in range(first, end, stride):
+        frame = cv2.imread(os.path.join(folder, names[index]))
+        if frame is not None:
+            yield index, frame
+
+
+def iter_frames(kind, path, stride=1, start=0, end=None):
+    """Yield (frame_index, frame) from a video or an image folder."""
+    if kind == "video":
+        return iter_video_frames(path, stride, start, end)
+    return iter_image_frames(path, stride, start, end)
+
+
+def split_source(kind, path, chunk_frames=CHUNK_FRAMES):
+    """
+    Split a source into (kind, path, start, end) frame ranges for the worker pool.
+    Videos without a frame count are processed as a single range. The frame count
+    of a video is only an estimate for many containers, so its last range is
+    open-ended (end=None) and reads up to the real end of the file.
+    """
+    if kind == "video":
+        cap = cv2.VideoCapture(path)
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) if cap.isOpened() else 0
+        cap.release()
+    else:
+        total = len(list_images(path))
+
+    if total <= 0:
+        return [(kind, path, 0, None)]
+    ranges = [(kind, path, start, min(start + chunk_frames, total))
+              for start in range(0, total, chunk_frames)]
+    if kind == "video":
+        ranges[-1] = (kind, path, ranges[-1][2], None)
+    return ranges
+
+
+def process_chunk(task):
+    """
+    Estimate distance for one frame range (runs in a worker process).
+
+    Every worker imports distance_estimator itself and so owns its FaceMesh;
+    frames are decoded in the worker, only the result rows are sent back.
+
+    Returns:
+        list: Output rows of the range, in frame order
+    """
+    import distance_estimator
+
+    kind, path, start, end, stride = task
+    # The face track of the previous range (possibly another video) does not apply here;
+    # this also resets MediaPipe's own tracking, so the result does not depend on which
+    # ranges this worker happened to process before
+    distance_estimator.reset_tracking()
+
+    rows = []
+    for index, frame in iter_frames(kind, path, stride, start, end):
+        distance, pixel_dist = distance_estimator.estimate_distance(frame)
+        # Empty fields for frames without a face keep the file compact
+        rows.append([path, index, distance or "", pixel_dist or ""])
+    return rows
+
+
+def open_output(path):
+    """Open the results file; a .gz suffix writes gzip-compressed CSV."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "wt", newline="")
+    return open(path, "w", newline="")
+
+
+def run_batch(paths, output_path, stride=1, workers=1, chunk_frames=CHUNK_FRAMES):
+    """
+    Estimate distance for every frame of the given inputs without any GUI.
+
+    With workers > 1 the sources are split into frame ranges that are processed
+    by a pool of worker processes, each with its own FaceMesh. Results are
+    written in the same order as a single-process run.
+
+    Returns:
+        tuple: (frames processed, frames with a detected face)
+    """
+    frames = 0
+    detected = 0
+    start = time.perf_counter()
+
+    with open_output(output_path) as f:
+        writer = csv.writer(f)
+        writer.writerow(OUTPUT_COLUMNS)
+
+        if workers > 1:
+            tasks = [chunk + (stride,)
+                     for kind, path in collect_sources(paths)
+                     for chunk in split_source(kind, path, chunk_frames)]
+            # "spawn" gives every worker a fresh interpreter and FaceMesh; a forked
+            # copy of this process's MediaPipe graph would not work
+            with multiprocessing.get_context("spawn").Pool(workers) as pool:
+                # imap returns the ranges in submission order, i.e. frame order
+                for rows in pool.imap(process_chunk, tasks):
+                    for row in rows:
+                        frames += 1
+                        if row[2]:
+                            detected += 1
+                        writer.writerow(row)
+        else:
+            for kind, path in collect_sources(paths):
+                # Like a worker range: tracking from the previous source does not apply
+                reset_tracking()
+                for index, frame in iter_frames(kind, path, stride):
+                    distance, pixel_dist = estimate_distance(frame)
+                    frames += 1
+                    if distance:
+                        detected += 1
+                    # Empty fields for frames without a face keep the file compact
+                    writer.writerow([path, index, distance or "", pixel_dist or ""])
+
+    elapsed = time.perf_counter() - start
+    fps = frames / elapsed if elapsed > 0 else 0.0
+    print(f"Processed {frames} frames ({detected} with a face) in {elapsed:.1f}s - {fps:.1f} frames/s")
+    print(f"Results written to {output_path}")
+    return frames, detected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless face distance estimation over recorded data")
+    parser.add_argument("inputs", nargs="+", help="Video files and/or image folders")
+    parser.add_argument("-o", "--output", default="distances.csv",
+                        help="Output CSV file (use .csv.gz for compressed output)")
+    parser.add_argument("--stride", type=int, default=1,
+                        help="Process every N-th frame (default: every frame)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes, each with its own FaceMesh (0 = one per CPU core)")
+    parser.add_argument("--chunk-frames", type=int, default=CHUNK_FRAMES,
+                        help="Frames per work unit with several workers")
+    args = parser.parse_args()
+
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    run_batch(args.inputs, args.output, max(1, args.stride), workers, max(1, args.chunk_frames))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,8 @@ import cv2
 import mediapipe as mp
 import math
 
+from face_roi import crop_region, to_frame_points, padded_box
+
 # ====== CONSTANTS ======
 REAL_EYE_DISTANCE_CM = 6.3   # Average IPD
 FOCAL_LENGTH = 650           # 🔴 Replace after calibration
@@ -9,25 +11,89 @@ FOCAL_LENGTH = 650           # 🔴 Replace after calibration
 LEFT_EYE_INDEX = 133
 RIGHT_EYE_INDEX = 362
 
+# ====== ROI TRACKING ======
+# Opt-in: crops use a static-image graph, which runs the face detector on every crop,
+# while the full-frame video graph tracks without it. Measure before enabling.
+ROI_TRACKING = False     # Run FaceMesh on a crop around the last detected face
+ROI_PADDING = 0.4        # Margin added on each side of the face box (fraction of box size)
+ROI_TARGET_SIZE = 256    # Downscale crops so the longer side is at most this (None = keep size)
+
 mp_face_mesh = mp.solutions.face_mesh
 face_mesh = mp_face_mesh.FaceMesh(refine_landmarks=True)
 
+# Crops move with the face, so they get their own static-image graph:
+# MediaPipe's internal tracking in face_mesh only ever sees full frames
+crop_face_mesh = None
 
-def estimate_distance(frame):
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = face_mesh.process(rgb)
+_last_face_box = None    # (x0, y0, x1, y1) of the last face, in full-frame pixels
+
+
+def _run_face_mesh(frame, box=None):
+    """Run FaceMesh on the full frame or a ROI crop; return the landmarks in full-frame pixels (or None)."""
+    global crop_face_mesh
+    if box is None:
+        h, w = frame.shape[:2]
+        box = (0, 0, w, h)
+        image = frame
+        mesh = face_mesh
+    else:
+        image = crop_region(frame, box, ROI_TARGET_SIZE)
+        if crop_face_mesh is None:
+            crop_face_mesh = mp_face_mesh.FaceMesh(static_image_mode=True, refine_landmarks=True)
+        mesh = crop_face_mesh
+
+    rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    results = mesh.process(rgb)
 
     if not results.multi_face_landmarks:
-        return None, None
+        return None
+    return to_frame_points(results.multi_face_landmarks[0].landmark, box)
+
+
+def reset_tracking():
+    """
+    Forget the face track: clears the ROI box and recreates the FaceMesh graphs,
+    whose internal tracking state would otherwise carry over to the next frames.
+    """
+    global face_mesh, crop_face_mesh, _last_face_box
+    face_mesh.close()
+    face_mesh = mp_face_mesh.FaceMesh(refine_landmarks=True)
+    if crop_face_mesh is not None:
+        crop_face_mesh.close()
+        crop_face_mesh = None
+    _last_face_box = None
 
-    landmarks = results.multi_face_landmarks[0].landmark
+
+def detect_landmarks(frame):
+    """
+    Detect face landmarks, cropping to the previous face when tracking.
+    Falls back to the full frame when there is no track or the face left the crop.
+    """
+    global _last_face_box
     h, w, _ = frame.shape
 
+    points = None
+    if ROI_TRACKING and _last_face_box is not None:
+        points = _run_face_mesh(frame, _last_face_box)
+    if points is None:
+        # Tracking lost (or not started): full-resolution detection
+        points = _run_face_mesh(frame)
+
+    _last_face_box = padded_box(points, w, h, ROI_PADDING) if (points and ROI_TRACKING) else None
+    return points
+
+
+def estimate_distance(frame):
+    landmarks = detect_landmarks(frame)
+
+    if not landmarks:
+        return None, None
+
     left_eye = landmarks[LEFT_EYE_INDEX]
     right_eye = landmarks[RIGHT_EYE_INDEX]
 
-    x1, y1 = int(left_eye.x * w), int(left_eye.y * h)
-    x2, y2 = int(right_eye.x * w), int(right_eye.y * h)
+    x1, y1 = int(left_eye[0]), int(left_eye[1])
+    x2, y2 = int(right_eye[0]), int(right_eye[1])
 
     pixel_distance = math.dist((x1, y1), (x2, y2))
 